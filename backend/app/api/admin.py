@@ -5,8 +5,9 @@ Protected by JWT authentication.
 """
 
 from fastapi import APIRouter, UploadFile, File, Form, BackgroundTasks, HTTPException, Depends
-from typing import Optional
+from typing import Dict, List, Optional
 from enum import Enum
+from pydantic import BaseModel, Field
 import pandas as pd
 import numpy as np
 import io
@@ -17,6 +18,10 @@ from datetime import datetime, timezone
 
 from app.auth import require_admin
 from app.database import get_db, execute_query, execute_insert
+from app.pipelines.scam_classifier import SCAM_TYPES
+from app.pipelines.online_trainer import add_labels, retrain_now, trainer_status
+from app.pipelines.risk_rescore import rescore_corpus, list_runs, load_run
+from app.services.chainlog import chain_log
 
 router = APIRouter(tags=["Admin – Data Ingestion"])
 
@@ -34,6 +39,7 @@ class DataType(str, Enum):
 FISCAL_REQUIRED_COLS = {"transaction_id", "amount"}
 WELFARE_REQUIRED_COLS = {"district_name", "population_bpl", "active_beneficiaries"}
 PROCUREMENT_REQUIRED_COLS = {"contract_title", "final_price"}
+TRAINING_REQUIRED_COLS = {"text", "label"}
 
 
 # ──────────────────────────────────────────────
@@ -74,6 +80,7 @@ def _validate_columns(df: pd.DataFrame, required: set, label: str):
 # ──────────────────────────────────────────────
 @router.post("/admin/ingest")
 async def ingest_data(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     data_type: str = Form(...),
     uploader_name: str = Form("Admin"),
@@ -84,7 +91,8 @@ async def ingest_data(
     📥 Ingest uploaded data into PostgreSQL database.
     Protected by JWT authentication.
     
-    **data_type** must be one of: `fiscal`, `welfare`, `procurement`.
+    **data_type** must be one of: `training`, `fiscal`, `welfare`, `procurement`.
+    Training files carry `text` and `label` (a scam category) columns.
     """
     timestamp = datetime.now(timezone.utc).isoformat()
     batch_id = f"BATCH-{uuid.uuid4().hex[:8].upper()}"
@@ -283,13 +291,44 @@ async def ingest_data(
             "uploaded_by": uploader,
         }
 
-    # ── Training Data (kept as stub) ──────────
+    # ── Training Data ─────────────────────────
     elif data_type == DataType.training:
+        if "category" in df.columns and "label" not in df.columns:
+            df = df.rename(columns={"category": "label"})
+        _validate_columns(df, TRAINING_REQUIRED_COLS, "classifier training data")
+        df = df.dropna(subset=["text", "label"])
+
+        unknown = sorted(set(df["label"].astype(str)) - set(SCAM_TYPES))
+        if unknown:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Unknown labels {unknown}. Must be one of: {SCAM_TYPES}"
+            )
+
+        stored = add_labels(
+            [{"text": str(row["text"]), "label": str(row["label"])} for _, row in df.iterrows()],
+            source="admin_upload",
+            analyst=uploader,
+        )
+
+        with get_db() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """INSERT INTO upload_logs (batch_id, data_type, filename, rows_count, uploaded_by, department)
+                       VALUES (%s, %s, %s, %s, %s, %s)""",
+                    (batch_id, "training", file.filename, stored, uploader, department)
+                )
+
+        # Incremental update runs after the response; workers hot-swap to the new version
+        background_tasks.add_task(retrain_now)
         return {
             "status": "accepted",
-            "message": "Training data received. Model retraining queued.",
+            "message": f"✅ {stored} labeled examples stored. Classifier update queued.",
             "rows_received": rows,
+            "rows_inserted": stored,
             "batch_id": batch_id,
+            "uploaded_by": uploader,
+            "classifier": trainer_status(),
         }
 
 
@@ -333,3 +372,54 @@ async def get_admin_stats():
         "welfare_districts": total_welfare["count"] if total_welfare else 0,
         "last_updated": datetime.now(timezone.utc).isoformat(),
     }
+
+
+# ──────────────────────────────────────────────
+# Risk Re-scoring – New Weight Profiles
+# ──────────────────────────────────────────────
+class RescoreRequest(BaseModel):
+    """Weight profile to re-score every cached case under"""
+    weights: Dict[str, float] = Field(default_factory=dict, description="Overrides for RISK_WEIGHTS")
+    boosts: Optional[List[List]] = Field(None, description="[scam-type substring, factor, boost]; omit to keep current")
+    apply: bool = Field(False, description="Write new score / risk_level into the cached cases")
+    label: Optional[str] = Field(None, description="Free-text name for this profile")
+
+
+@router.post("/admin/rescore")
+def rescore_cases(body: RescoreRequest, admin: dict = Depends(require_admin)):
+    """
+    ⚖️ Recompute score / risk_level for all cached cases from their stored factors.
+    Returns the versioned run summary and the cases whose risk level changed.
+    """
+    try:
+        report = rescore_corpus(body.weights, body.boosts, apply=body.apply, label=body.label)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    chain_log(
+        action="RISK_RESCORE",
+        actor=admin.get("sub", "admin"),
+        target=report["version"],
+        meta={
+            "timestamp": report["created_at"],
+            "applied": body.apply,
+            "profile": report["profile"],
+            "summary": report["summary"],
+        },
+    )
+    return {k: v for k, v in report.items() if k != "results"}
+
+
+@router.get("/admin/rescore")
+def get_rescore_runs(admin: dict = Depends(require_admin)):
+    """📋 Previous re-scoring runs, newest first."""
+    return {"runs": list_runs()}
+
+
+@router.get("/admin/rescore/{version}")
+def get_rescore_run(version: str, admin: dict = Depends(require_admin)):
+    """🔎 Full result set (per-case scores and level diff) of one re-scoring run."""
+    report = load_run(version)
+    if report is None:
+        raise HTTPException(status_code=404, detail=f"Re-scoring run not found: {version}")
+    return report
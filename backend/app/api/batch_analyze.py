@@ -5,6 +5,7 @@ import os, shutil, json, traceback, uuid
 from datetime import datetime
 
 from app.pipelines.batch_analyzer import analyze_batch
+from app.pipelines.osint_ratelimit import BATCH, osint_priority
 from app.reports.unified_report_generator import generate_unified_report  # ✅ Correct import
 from app.services.chainlog import chain_log
 
@@ -56,7 +57,9 @@ async def batch_analyze(files: list[UploadFile] = File(...)):
         )
 
         # 🧠 Run batch analysis pipeline (your existing analyzer)
-        batch_results = analyze_batch(file_paths)
+        # OSINT lookups go in the low-priority lane so single-case analysts keep their quota
+        with osint_priority(BATCH):
+            batch_results = analyze_batch(file_paths)
 
         # 🗂 Save each file’s analysis result to cache
         for result in batch_results:
@@ -0,0 +1,88 @@
+# app/api/feedback.py
+from fastapi import APIRouter, BackgroundTasks, Depends, Form, HTTPException
+import os, json
+from datetime import datetime
+
+from app.auth import get_current_user, require_admin
+from app.pipelines.scam_classifier import SCAM_TYPES
+from app.pipelines.online_trainer import add_labels, maybe_retrain, trainer_status, train_incremental
+from app.services.chainlog import chain_log
+
+router = APIRouter(tags=["Analyst Feedback – Classifier Training"])
+
+CACHE_DIR = "app/data/analysis_cache"
+
+
+@router.post("/feedback")
+def submit_feedback(
+    background_tasks: BackgroundTasks,
+    file_id: str = Form(...),
+    category: str = Form(...),
+    user: dict = Depends(get_current_user),
+):
+    """
+    🏷️ Confirm or correct the scam category of an analyzed case.
+    The label is stored for the online classifier; enough pending labels trigger an update.
+    """
+    if category not in SCAM_TYPES:
+        raise HTTPException(status_code=422, detail=f"category must be one of: {SCAM_TYPES}")
+
+    cache_path = os.path.join(CACHE_DIR, f"{file_id}.json")
+    if not os.path.exists(cache_path):
+        raise HTTPException(status_code=404, detail=f"Cached analysis not found for file_id: {file_id}")
+    with open(cache_path, "r", encoding="utf-8") as f:
+        case = json.load(f)
+
+    scam_class = case.get("scam_class", {})
+    predicted = scam_class.get("category")
+    analyst = user.get("sub")
+    stored = add_labels(
+        [{
+            "file_id": file_id,
+            "text": case.get("raw_text", ""),
+            "label": category,
+            "predicted": predicted,
+            "model_version": scam_class.get("model_version"),
+        }],
+        source="feedback",
+        analyst=analyst,
+    )
+    if not stored:
+        raise HTTPException(status_code=422, detail="Case has no extracted text to learn from.")
+
+    verdict = "confirmed" if category == predicted else "corrected"
+    chain_log(
+        action="CLASSIFIER_FEEDBACK",
+        actor=analyst or "analyst",
+        target=file_id,
+        meta={
+            "timestamp": datetime.now().isoformat(),
+            "verdict": verdict,
+            "predicted": predicted,
+            "label": category,
+            "model_version": scam_class.get("model_version"),
+        },
+    )
+
+    background_tasks.add_task(maybe_retrain)
+    return {
+        "status": "success",
+        "message": f"✅ Category {verdict} for {file_id}.",
+        "verdict": verdict,
+        **trainer_status(),
+    }
+
+
+@router.get("/feedback/status")
+def feedback_status(user: dict = Depends(get_current_user)):
+    """📈 Current classifier version and labels waiting for the next update."""
+    return trainer_status()
+
+
+@router.post("/feedback/retrain")
+def force_retrain(admin: dict = Depends(require_admin)):
+    """⚙️ Fold every pending label into a new classifier version now."""
+    pointer = train_incremental(force=True)
+    if pointer is None:
+        return {"status": "noop", "message": "No pending labels.", **trainer_status()}
+    return {"status": "success", "message": f"✅ Published {pointer['version']}.", **trainer_status()}
@@ -0,0 +1,62 @@
+# app/api/system.py
+import os
+from fastapi import APIRouter
+
+from app.pipelines.model_registry import registry
+from app.pipelines.inference_batcher import batcher_stats
+from app.pipelines.ocr_engines import engine_stats
+from app.pipelines.scam_classifier import cascade_stats
+from app.pipelines.osint_async import fanout_stats
+from app.pipelines.openphish_feed import feed_status
+from app.pipelines.osint_cache import osint_cache
+from app.pipelines.osint_breaker import breaker_status
+from app.preload import memory_report, request_memory_history
+
+router = APIRouter(tags=["System – Runtime Metrics"])
+
+
+@router.get("/system/models")
+def model_status():
+    """📦 Resident model registry: load times, hit/miss counts and resident bytes."""
+    return registry.stats()
+
+
+@router.get("/system/inference")
+def inference_status():
+    """🧮 Micro-batcher queue depth and batch-size histograms (OCR / NER / embeddings)."""
+    return batcher_stats()
+
+
+@router.get("/system/ocr")
+def ocr_status():
+    """🔍 OCR engine policies, per-engine latency and sampled cross-engine agreement."""
+    return engine_stats()
+
+
+@router.get("/system/classifier")
+def classifier_status():
+    """🧭 Classifier cascade thresholds, exit rate and sampled agreement with full fusion."""
+    return cascade_stats()
+
+
+@router.get("/system/osint")
+def osint_status():
+    """🌐 OSINT fan-out (per-provider requests, errors, deadline misses, latency), cache tiers and OpenPhish feed."""
+    return {**fanout_stats(), "cache": osint_cache.stats(), "openphish_feed": feed_status()}
+
+
+@router.get("/system/osint/breakers")
+def osint_breaker_status():
+    """🧯 Per-provider circuit breakers: state, consecutive failures, trips and short-circuited lookups."""
+    return breaker_status()
+
+
+@router.get("/system/memory")
+def memory_status():
+    """🧠 Unique vs shared memory of this worker and its master (preload-and-fork mode),
+    now and at the MEMORY_REPORT_AT_REQUESTS checkpoints."""
+    return {
+        "worker": memory_report(os.getpid()),
+        "master": memory_report(os.getppid()),
+        **request_memory_history(),
+    }
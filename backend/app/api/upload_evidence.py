@@ -1,9 +1,10 @@
 # app/api/upload_evidence.py
-import hashlib, os, uuid, json
+import os, uuid, json
 from datetime import datetime
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from app.services.chainlog import chain_log
 from app.pipelines.url_qr_scanner import scan_urls_and_qr
+from app.pipelines.result_store import sha256_file
 
 router = APIRouter()
 
@@ -13,17 +14,6 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 os.makedirs(META_DIR, exist_ok=True)
 
 
-# -------------------------------------------------------
-# 🧠 Utility: Compute SHA-256 for file integrity
-# -------------------------------------------------------
-def sha256_file(file_path: str) -> str:
-    sha = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            sha.update(chunk)
-    return sha.hexdigest()
-
-
 # -------------------------------------------------------
 # 🚀 Upload Route
 # -------------------------------------------------------
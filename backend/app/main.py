@@ -13,9 +13,13 @@ from app.api.admin import router as admin_router                      # Step 7:
 from app.api.auth_routes import router as auth_router                 # 🔐 Authentication
 from app.api.dashboards import router as dashboard_router             # 📊 Dashboard APIs
 from app.api.copilot import router as copilot_router                   # 🤖 AI Copilot
+from app.api.system import router as system_router                     # 📦 Runtime Metrics
+from app.api.feedback import router as feedback_router                 # 🏷️ Analyst Feedback
 
 # --- Initialize Auth ---
 from app.auth import init_default_admin
+from app.pipelines.openphish_feed import openphish_feed
+from app.preload import note_request
 
 # --- App Config ---
 app = FastAPI(
@@ -59,6 +63,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --- Worker memory after N requests (copy-on-write sharing, see app/preload.py) ---
+@app.middleware("http")
+async def count_requests(request, call_next):
+    response = await call_next(request)
+    note_request()
+    return response
+
 # --- Register API Routers ---
 app.include_router(auth_router, prefix="/api")            # 🔐 /api/auth/login
 app.include_router(dashboard_router, prefix="/api")       # 📊 /api/fiscal/dashboard, etc.
@@ -71,12 +82,15 @@ app.include_router(unified_router, prefix="/api")         # 📊 /api/unified-re
 app.include_router(fraud_predict_router, prefix="/api")   # 🚨 /api/fraud-predict
 app.include_router(admin_router, prefix="/api")           # 🛡️ /api/admin/ingest
 app.include_router(copilot_router, prefix="/api")         # 🤖 /api/copilot/chat
+app.include_router(system_router, prefix="/api")          # 📦 /api/system/models
+app.include_router(feedback_router, prefix="/api")        # 🏷️ /api/feedback
 
 
 # --- Startup Event ---
 @app.on_event("startup")
 async def startup():
     init_default_admin()
+    openphish_feed.start()  # last snapshot now, fresh feed in the background
     print("🚀 SatyaSetu.AI v2.0 — All systems operational")
 
 
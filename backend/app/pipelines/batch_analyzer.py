@@ -4,13 +4,16 @@ from statistics import mean
 from datetime import datetime
 
 # ✅ Import all intelligence modules
-from app.pipelines.ocr import extract_text_from_image
+from app.pipelines.ocr import extract_document
+from app.pipelines.ocr_engines import OCR_BATCH_POLICY
 from app.pipelines.regex_extract import extract_entities
-from app.pipelines.ner import extract_named_entities
-from app.pipelines.osint_engine import enrich_entity_osint
-from app.pipelines.risk_assessor import assess_risk
-from app.pipelines.scam_classifier import classify_scam
+from app.pipelines.ner import extract_named_entities_batch, merge_page_entities
+from app.pipelines.osint_async import enrich_entities_osint
+from app.pipelines.risk_assessor import assess_risk, assess_risk_batch
+from app.pipelines.scam_classifier import classify_scam, classify_scam_batch
 from app.pipelines.url_qr_scanner import scan_urls_and_qr
+from app.pipelines.document_features import DocumentFeatures
+from app.pipelines import result_store
 from app.services.chainlog import chain_log
 
 UPLOAD_DIR = "app/data/uploads"
@@ -19,37 +22,102 @@ os.makedirs(CACHE_DIR, exist_ok=True)
 
 
 # -------------------------------------------------------
-# 🧩 Process a Single File
+# ♻️ Replay a Stored Analysis
 # -------------------------------------------------------
-def process_single_file(file_path: str):
-    """Run full intelligence pipeline on a single file with timestamps."""
+def _replay_cached(file_id: str, sha256: str, entry: dict, start_time: float):
+    """Reuse the stored analysis for identical bytes; only the custody entry is new."""
+    result = {
+        "file_id": file_id,
+        **entry["result"],
+        "cache": {
+            "hit": True,
+            "sha256": sha256,
+            "source_file_id": entry.get("source_file_id"),
+            "pipeline_version": entry.get("pipeline_version"),
+        },
+        "analyzed_at": datetime.now().isoformat(),
+        "processing_time_sec": round(time.time() - start_time, 2),
+    }
+
+    cache_path = os.path.join(CACHE_DIR, f"{file_id}.json")
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+
+    chain_log(
+        action="BATCH_ANALYZE_ITEM",
+        actor="system",
+        target=file_id,
+        sha256=sha256,
+        meta={
+            "cache_hit": True,
+            "source_file_id": entry.get("source_file_id"),
+            "risk_score": result.get("risk", {}).get("score", 0),
+            "risk_level": result.get("risk", {}).get("risk_level", "Unknown"),
+            "processing_time_sec": result["processing_time_sec"],
+        },
+    )
+
+    return result
+
+
+# -------------------------------------------------------
+# 🧩 Process a Single File (in stages, so NER + classification can be batched)
+# -------------------------------------------------------
+def _prepare_file(file_path: str):
+    """Stage 1: cache lookup, then text extraction. Returns a replayed result or a work item."""
     file_id = os.path.basename(file_path)
     start_time = time.time()
 
-    # 1️⃣ OCR Extraction
-    raw_text = extract_text_from_image(file_path)
+    # 0️⃣ Content-addressed cache (same bytes + same pipeline version → reuse)
+    sha256 = result_store.sha256_file(file_path)
+    stored = result_store.lookup(sha256, OCR_BATCH_POLICY)
+    if stored:
+        return {"result": _replay_cached(file_id, sha256, stored, start_time)}
+
+    # 1️⃣ Text Extraction (OCR / PDF / plain text) — fast OCR tier for batch triage
+    document = extract_document(file_path, OCR_BATCH_POLICY)
+    return {
+        "file_path": file_path,
+        "file_id": file_id,
+        "sha256": sha256,
+        "start_time": start_time,
+        "document": document,
+        # Shared text features for classification, entities, risk and URL scanning
+        "features": DocumentFeatures(document["text"]),
+    }
+
 
-    # 2️⃣ Entity Recognition
-    regex_hits = extract_entities(raw_text)
-    ner_hits = extract_named_entities(raw_text)
+def _entities_and_osint(item: dict, ner_hits: list):
+    """Stage 3: regex entities + OSINT for one file."""
+    # 2️⃣ Entity Recognition (NER hits come from the batch-wide nlp.pipe pass)
+    regex_hits = extract_entities(item["document"]["text"], item["features"])
     all_entities = regex_hits + ner_hits
 
-    # 3️⃣ Scam Classification
-    scam_class = classify_scam(raw_text)
+    # 4️⃣ OSINT Cross-Check (one record per entity, looked up concurrently)
+    osint_hits = enrich_entities_osint(all_entities)
 
-    # 4️⃣ OSINT Cross-Check
-    osint_hits = []
-    for e in all_entities:
-        try:
-            osint_hits.extend(enrich_entity_osint(e["value"]))
-        except Exception as e:
-            print(f"⚠️ OSINT lookup failed for {e['value']}: {e}")
+    return all_entities, osint_hits
+
+
+def _batch_risk(items: List[dict], entities: List[list], scam_classes: List[dict], osint: List[list]):
+    """Stage 4: risk fusion for every pending file in one vectorized pass."""
+    return assess_risk_batch(
+        [item["document"]["text"] for item in items], entities, scam_classes, osint,
+        features=[item["features"] for item in items],
+    )
 
-    # 5️⃣ Risk Assessment
-    risk_result = assess_risk(raw_text, all_entities, scam_class, osint_hits)
+
+def _finish_file(item: dict, all_entities: list, scam_class: dict, osint_hits: list, risk_result: dict):
+    """Stage 5: URL scan, caching and custody logging for one file."""
+    file_path, file_id, sha256 = item["file_path"], item["file_id"], item["sha256"]
+    document, features = item["document"], item["features"]
+    raw_text = document["text"]
+
+    # 3️⃣ Scam Classification comes from the batch-wide classify_scam_batch pass
+    # 5️⃣ Risk Assessment comes from the batch-wide assess_risk_batch pass
 
     # 6️⃣ URL + QR Scan
-    url_qr_findings = scan_urls_and_qr(raw_text, file_path)
+    url_qr_findings = scan_urls_and_qr(raw_text, file_path, features=features)
 
     # 7️⃣ Cache individual result
     result = {
@@ -60,20 +128,29 @@ def process_single_file(file_path: str):
         "osint_hits": osint_hits,
         "risk": risk_result,
         "url_qr_findings": url_qr_findings,
+        "extraction": document["stats"],
+        "feature_timings": features.timing_report(),
         "analyzed_at": datetime.now().isoformat(),
-        "processing_time_sec": round(time.time() - start_time, 2),
+        "processing_time_sec": round(time.time() - item["start_time"], 2),
     }
 
     cache_path = os.path.join(CACHE_DIR, f"{file_id}.json")
     with open(cache_path, "w", encoding="utf-8") as f:
         json.dump(result, f, indent=2)
 
+    # Empty text usually means extraction failed — don't pin that result
+    # (partial extraction, with failed OCR pages, is rejected by the store itself)
+    if raw_text:
+        result_store.save(sha256, file_id, result_store.strip_volatile(result), OCR_BATCH_POLICY)
+
     # 8️⃣ Log each file in chain-of-custody
     chain_log(
         action="BATCH_ANALYZE_ITEM",
         actor="system",
         target=file_id,
+        sha256=sha256,
         meta={
+            "cache_hit": False,
             "risk_score": risk_result.get("score", 0),
             "risk_level": risk_result.get("risk_level", "Unknown"),
             "urls_detected": len(url_qr_findings),
@@ -85,6 +162,59 @@ def process_single_file(file_path: str):
     return result
 
 
+def _batch_ner(items: List[dict]) -> List[list]:
+    """Stage 2: NER for every page of every pending file in one nlp.pipe stream."""
+    all_pages, spans = [], []
+    for item in items:
+        pages = item["document"]["pages"]
+        spans.append((len(all_pages), len(pages)))
+        all_pages.extend(pages)
+
+    page_entities = extract_named_entities_batch(all_pages)
+    return [
+        merge_page_entities(all_pages[start:start + n], page_entities[start:start + n])
+        for start, n in spans
+    ]
+
+
+def _batch_classify(items: List[dict]) -> List[dict]:
+    """Stage 2b: scam classification for every pending file in one batched call."""
+    return classify_scam_batch(
+        [item["document"]["text"] for item in items],
+        features=[item["features"] for item in items],
+    )
+
+
+def _batch_or_each(stage: str, items: List[dict], batch_call, item_call) -> list:
+    """
+    Run a batch-wide stage; if it raises, fall back to one call per file so a single
+    bad document only skips itself. Returns one result per item, None for files that failed.
+    """
+    try:
+        return batch_call()
+    except Exception as e:
+        print(f"⚠️ Batched {stage} failed ({e}); retrying file by file")
+    results = []
+    for i, item in enumerate(items):
+        try:
+            results.append(item_call(i))
+        except Exception as e:
+            print(f"⚠️ Skipped {item['file_path']}: {e}")
+            results.append(None)
+    return results
+
+
+def process_single_file(file_path: str):
+    """Run full intelligence pipeline on a single file with timestamps."""
+    item = _prepare_file(file_path)
+    if "result" in item:
+        return item["result"]
+    scam_class = _batch_classify([item])[0]
+    all_entities, osint_hits = _entities_and_osint(item, _batch_ner([item])[0])
+    risk_result = _batch_risk([item], [all_entities], [scam_class], [osint_hits])[0]
+    return _finish_file(item, all_entities, scam_class, osint_hits, risk_result)
+
+
 # -------------------------------------------------------
 # 📊 Aggregate Batch Summary
 # -------------------------------------------------------
@@ -122,12 +252,52 @@ def analyze_batch(file_paths: List[str]):
     batch_id = str(uuid.uuid4())[:8]
     print(f"🚀 Starting batch analysis {batch_id} on {len(file_paths)} files...")
 
-    results = []
+    results, pending = [], []
     for fp in file_paths:
         try:
-            results.append(process_single_file(fp))
+            item = _prepare_file(fp)
         except Exception as e:
             print(f"⚠️ Skipped {fp}: {e}")
+            continue
+        if "result" in item:
+            results.append(item["result"])
+        else:
+            pending.append(item)
+
+    # One NER pass and one classifier pass for the whole batch instead of one per file
+    ner_hits = _batch_ner(pending) if pending else []
+    scam_classes = _batch_or_each(
+        "classification", pending,
+        lambda: _batch_classify(pending),
+        lambda i: classify_scam(pending[i]["document"]["text"], features=pending[i]["features"]),
+    ) if pending else []
+
+    ready = []
+    for item, hits, scam_class in zip(pending, ner_hits, scam_classes):
+        if scam_class is None:
+            continue
+        try:
+            all_entities, osint_hits = _entities_and_osint(item, hits)
+        except Exception as e:
+            print(f"⚠️ Skipped {item['file_path']}: {e}")
+            continue
+        ready.append((item, all_entities, scam_class, osint_hits))
+
+    # One vectorized risk fusion over every file that got this far
+    risks = _batch_or_each(
+        "risk fusion", [r[0] for r in ready],
+        lambda: _batch_risk(*(list(col) for col in zip(*ready))),
+        lambda i: assess_risk(ready[i][0]["document"]["text"], ready[i][1], ready[i][2], ready[i][3],
+                              features=ready[i][0]["features"]),
+    ) if ready else []
+
+    for (item, all_entities, scam_class, osint_hits), risk_result in zip(ready, risks):
+        if risk_result is None:
+            continue
+        try:
+            results.append(_finish_file(item, all_entities, scam_class, osint_hits, risk_result))
+        except Exception as e:
+            print(f"⚠️ Skipped {item['file_path']}: {e}")
 
     if not results:
         return {"error": "No valid results generated."}
@@ -0,0 +1,73 @@
+"""
+SatyaSetu.AI Document Feature Bundle
+-----------------------------------
+✅ One DocumentFeatures per analysis, shared by classifier, risk, entity and URL stages
+✅ Cleaned text, tokens, keyword-engine hits and sentiment computed once, on first use
+✅ Stages can memoize their own per-document features (regex matches, URLs) on the bundle
+✅ Per-feature compute time recorded in `timings`
+
+    features = DocumentFeatures(raw_text)
+    classify_scam(raw_text, features=features)
+    assess_risk(raw_text, entities, scam_class, osint_hits, features=features)
+    features.timings   # {"clean": 0.0004, "keyword_hits": 0.002, "sentiment": 0.03, ...}
+"""
+
+import re
+import time
+from typing import Any, Callable, Dict
+
+from textblob import TextBlob
+from app.pipelines.keyword_engine import keyword_engine
+
+
+def clean_text(text: str):
+    text = text.lower()
+    text = re.sub(r"[^a-z0-9\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class DocumentFeatures:
+    """Lazily computed, memoized text features of one document."""
+
+    def __init__(self, text: str):
+        self.text = text or ""
+        self.timings: Dict[str, float] = {}
+        self._values: Dict[str, Any] = {}
+
+    def feature(self, name: str, compute: Callable[[], Any]):
+        """Value of `name`, computing (and timing) it on first request."""
+        if name not in self._values:
+            t0 = time.perf_counter()
+            self._values[name] = compute()
+            self.timings[name] = round(time.perf_counter() - t0, 6)
+        return self._values[name]
+
+    # -------------------------------
+    # 🧩 Shared features
+    # -------------------------------
+    @property
+    def clean(self) -> str:
+        """Lowercased, punctuation-free, single-spaced text (classifier input)."""
+        return self.feature("clean", lambda: clean_text(self.text))
+
+    @property
+    def tokens(self):
+        return self.feature("tokens", lambda: self.clean.split())
+
+    @property
+    def keyword_hits(self):
+        """Every registered keyword list (risk, tone, classifier) from one engine pass."""
+        return self.feature("keyword_hits", lambda: keyword_engine.scan(self.text))
+
+    @property
+    def sentiment(self) -> float:
+        """TextBlob polarity of the raw text (risk fusion)."""
+        return self.feature("sentiment", lambda: TextBlob(self.text).sentiment.polarity)
+
+    @property
+    def clean_sentiment(self) -> float:
+        """TextBlob polarity of the cleaned text (the classifier's sentiment_polarity)."""
+        return self.feature("clean_sentiment", lambda: TextBlob(self.clean).sentiment.polarity)
+
+    def timing_report(self) -> Dict[str, float]:
+        return {**self.timings, "total": round(sum(self.timings.values()), 6)}
@@ -0,0 +1,157 @@
+"""
+SatyaSetu.AI Embedding Runtime
+-----------------------------------
+✅ Selectable backend for the MiniLM semantic stage (EMBEDDING_BACKEND)
+✅ "torch": full-precision sentence-transformers (default)
+✅ "onnx-int8": dynamically int8-quantized ONNX export run by onnxruntime on CPU
+✅ Same encode() contract either way: unit-length float32 rows
+
+The int8 backend needs the optional packages in requirements-onnx.txt.
+Export the quantized model once (it is also exported lazily on first use):
+    python -m app.pipelines.embedding_runtime export
+"""
+
+import os
+import sys
+import time
+import numpy as np
+
+# =========================
+# ⚙️ CONFIGURATION
+# =========================
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# "torch" or "onnx-int8"
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+ONNX_EMBEDDING_DIR = "app/models/minilm-onnx-int8"
+# ONNX Runtime intra-op threads (0 = runtime default)
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", "0"))
+
+BACKENDS = ("torch", "onnx-int8")
+# Resident size per backend, for the model registry's budget
+EMBEDDER_SIZE_MB = {"torch": 300, "onnx-int8": 60}
+_QUANTIZED_FILE = "model_quantized.onnx"
+# all-MiniLM-L6-v2's sentence-transformers max_seq_length
+_MAX_SEQ_LENGTH = 256
+
+
+# -------------------------------
+# 📦 Export (int8 dynamic quantization)
+# -------------------------------
+def export_int8(out_dir: str = ONNX_EMBEDDING_DIR) -> str:
+    """Export EMBEDDING_MODEL to ONNX and quantize weights to int8. Returns the model path."""
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    print(f"⚙️ Exporting {EMBEDDING_MODEL} to int8 ONNX in {out_dir}...")
+    t0 = time.perf_counter()
+    fp32_dir = out_dir + ".fp32"
+    ORTModelForFeatureExtraction.from_pretrained(EMBEDDING_MODEL, export=True).save_pretrained(fp32_dir)
+
+    # Dynamic quantization: int8 weights, activations quantized on the fly (no calibration set)
+    quantizer = ORTQuantizer.from_pretrained(fp32_dir)
+    qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+    quantizer.quantize(save_dir=out_dir, quantization_config=qconfig)
+    AutoTokenizer.from_pretrained(EMBEDDING_MODEL).save_pretrained(out_dir)
+
+    print(f"✅ Quantized embedding model ready ({time.perf_counter() - t0:.1f}s)")
+    return os.path.join(out_dir, _QUANTIZED_FILE)
+
+
+class OnnxEmbedder:
+    """
+    int8 MiniLM on onnxruntime. Mirrors the sentence-transformers pipeline for
+    all-MiniLM-L6-v2: tokenize (truncate at 256) → transformer → mean pooling → L2 norm.
+    """
+
+    def __init__(self, model_dir: str = ONNX_EMBEDDING_DIR):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_path = os.path.join(model_dir, _QUANTIZED_FILE)
+        if not os.path.exists(model_path):
+            model_path = export_int8(model_dir)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if ONNX_INTRA_OP_THREADS:
+            options.intra_op_num_threads = ONNX_INTRA_OP_THREADS
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, texts, convert_to_numpy=True, normalize_embeddings=True, batch_size=32, **_):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        out = []
+        for start in range(0, len(texts), batch_size):
+            batch = self.tokenizer(
+                texts[start:start + batch_size], padding=True, truncation=True,
+                max_length=_MAX_SEQ_LENGTH, return_tensors="np",
+            )
+            feeds = {k: v.astype(np.int64) for k, v in batch.items() if k in self._input_names}
+            token_embeddings = self.session.run(None, feeds)[0]
+
+            # Mean pooling over real (non-padding) tokens
+            mask = batch["attention_mask"][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if normalize_embeddings:
+                pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            out.append(pooled.astype(np.float32))
+
+        embeddings = np.concatenate(out) if out else np.zeros((0, 384), dtype=np.float32)
+        return embeddings[0] if single else embeddings
+
+
+# -------------------------------
+# 🧠 Loader
+# -------------------------------
+def load_embedder(backend: str = EMBEDDING_BACKEND):
+    """
+    Embedder for the configured backend; falls back to torch if the int8 runtime is
+    missing or its export / load fails (see embedder_backend for what actually loaded).
+    """
+    if backend not in BACKENDS:
+        print(f"⚠️ Unknown EMBEDDING_BACKEND '{backend}', using torch.")
+        backend = "torch"
+
+    if backend == "onnx-int8":
+        try:
+            return OnnxEmbedder()
+        except Exception as e:
+            # ImportError, export / download failures (OSError, hub errors), onnxruntime errors
+            print(f"⚠️ onnx-int8 embedding backend unavailable ({e}); falling back to torch.")
+
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(EMBEDDING_MODEL)
+
+
+def embedder_backend(embedder) -> str:
+    """The backend an embedder really runs on, which may differ from EMBEDDING_BACKEND after a fallback."""
+    return "onnx-int8" if isinstance(embedder, OnnxEmbedder) else "torch"
+
+
+# Backend of the classifier's resident embedder, recorded by its registry loader
+_active_backend = None
+
+
+def load_pipeline_embedder():
+    """load_embedder() for the classifier, remembering which backend actually loaded."""
+    global _active_backend
+    embedder = load_embedder()
+    _active_backend = embedder_backend(embedder)
+    return embedder
+
+
+def active_backend() -> str:
+    """The classifier's embedding backend: the loaded one, or the configured one before the first load."""
+    if _active_backend is not None:
+        return _active_backend
+    return EMBEDDING_BACKEND if EMBEDDING_BACKEND in BACKENDS else "torch"
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["export"]:
+        export_int8()
+    else:
+        print("usage: python -m app.pipelines.embedding_runtime export")
@@ -0,0 +1,262 @@
+"""
+SatyaSetu.AI In-Process Inference Batcher
+-----------------------------------
+✅ Collects OCR / NER / embedding requests from concurrent /analyze and /batch-analyze calls
+✅ Runs everything that arrives within a short window as ONE model call
+✅ Hands each caller back its own result (via a Future)
+✅ A failing batch is retried item by item, so one bad input only fails its own caller
+✅ Callers never hang on a lost worker: a dead worker is restarted, and a caller whose result
+   doesn't arrive in time runs its item directly
+✅ Exposes queue depth and batch-size histograms
+"""
+
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future, InvalidStateError, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, List
+
+# =========================
+# ⚙️ CONFIGURATION
+# =========================
+INFERENCE_BATCHING = os.getenv("INFERENCE_BATCHING", "1") == "1"
+INFERENCE_MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "16"))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "10"))
+# Longest a caller waits for its batched result before running the item itself
+INFERENCE_RESULT_TIMEOUT_SEC = float(os.getenv("INFERENCE_RESULT_TIMEOUT_SEC", "120"))
+
+# How often a waiting caller checks that the worker is still alive
+_WORKER_CHECK_SEC = 1.0
+
+_HIST_BUCKETS = [1, 2, 4, 8, 16, 32, 64]
+
+
+class MicroBatcher:
+    """
+    Gathers single-item requests into batches for a batch_fn(list) -> list.
+    The worker thread is started lazily (and restarted after a fork).
+    """
+
+    def __init__(self, name: str, batch_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = INFERENCE_MAX_BATCH_SIZE,
+                 max_wait_ms: float = INFERENCE_MAX_WAIT_MS):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._worker = None
+        self._pid = None
+
+        # 📊 Metrics
+        self.batches = 0
+        self.items = 0
+        self.failures = 0
+        self.item_failures = 0
+        self.direct_fallbacks = 0
+        self.max_queue_depth = 0
+        self.total_wait_sec = 0.0
+        self.histogram = {str(b): 0 for b in _HIST_BUCKETS}
+        self.histogram[f">{_HIST_BUCKETS[-1]}"] = 0
+
+    # -------------------------------
+    # 🚀 Public API
+    # -------------------------------
+    def submit(self, item: Any) -> Future:
+        self._ensure_worker()
+        fut: Future = Future()
+        self._queue.put((item, fut, time.perf_counter()))
+        depth = self._queue.qsize()
+        with self._stats_lock:
+            if depth > self.max_queue_depth:
+                self.max_queue_depth = depth
+        return fut
+
+    def __call__(self, item: Any) -> Any:
+        """
+        Submit one item and block until its result is ready. If the worker dies
+        (it is restarted for the queued items) or the result takes longer than
+        INFERENCE_RESULT_TIMEOUT_SEC, the item is run directly in this thread.
+        """
+        fut = self.submit(item)
+        deadline = time.perf_counter() + INFERENCE_RESULT_TIMEOUT_SEC
+        while True:
+            try:
+                return fut.result(timeout=_WORKER_CHECK_SEC)
+            except FutureTimeout:
+                pass
+            if not self._worker_alive():
+                reason = "worker died"
+                self._ensure_worker()
+            elif time.perf_counter() >= deadline:
+                reason = f"no result after {INFERENCE_RESULT_TIMEOUT_SEC:g}s"
+            else:
+                continue
+            if not fut.cancel():
+                return fut.result()  # finished in the meantime
+            with self._stats_lock:
+                self.direct_fallbacks += 1
+            print(f"⚠️ {self.name} batcher: {reason}; running the item directly")
+            return self._call([item])[0]
+
+    # -------------------------------
+    # ⚙️ Worker
+    # -------------------------------
+    def _worker_alive(self) -> bool:
+        return self._worker is not None and self._pid == os.getpid() and self._worker.is_alive()
+
+    def _ensure_worker(self):
+        if self._worker_alive():
+            return
+        pid = os.getpid()
+        with self._lock:
+            if self._worker_alive():
+                return
+            if self._pid != pid:
+                # Forked child: the parent's thread and queue did not survive
+                self._queue = queue.Queue()
+            self._pid = pid
+            self._worker = threading.Thread(
+                target=self._run, name=f"batcher-{self.name}", daemon=True
+            )
+            self._worker.start()
+
+    def _collect(self):
+        """Block for the first item, then gather more until the window closes."""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                self._process(batch)
+            except Exception as e:
+                # Keep the worker alive; whoever is still waiting gets the error
+                print(f"⚠️ {self.name} batcher error: {e}")
+                for _, fut, _ in batch:
+                    if not fut.done():
+                        self._fail(fut, e)
+
+    def _process(self, batch):
+        started = time.perf_counter()
+        items = [b[0] for b in batch]
+        futures = [b[1] for b in batch]
+        self._record(batch, started)
+        try:
+            results = self._call(items)
+        except Exception as e:
+            with self._stats_lock:
+                self.failures += 1
+            if len(items) == 1:
+                self._fail(futures[0], e)
+                return
+            # Isolate the bad input: re-run each item alone, fail only those that fail again
+            print(f"⚠️ {self.name} batch of {len(items)} failed ({e}); retrying items one by one")
+            for item, fut in zip(items, futures):
+                if fut.cancelled():
+                    continue  # the caller gave up and ran it directly
+                try:
+                    self._resolve(fut, self._call([item])[0])
+                except Exception as item_error:
+                    self._fail(fut, item_error)
+            return
+        for fut, res in zip(futures, results):
+            self._resolve(fut, res)
+
+    def _call(self, items: List[Any]) -> List[Any]:
+        results = self.batch_fn(items)
+        if len(results) != len(items):
+            raise RuntimeError(
+                f"{self.name} batch returned {len(results)} results for {len(items)} items"
+            )
+        return results
+
+    @staticmethod
+    def _resolve(fut: Future, result: Any):
+        try:
+            fut.set_result(result)
+        except InvalidStateError:
+            pass  # cancelled by a caller that timed out and ran the item itself
+
+    def _fail(self, fut: Future, error: Exception):
+        with self._stats_lock:
+            self.item_failures += 1
+        try:
+            fut.set_exception(error)
+        except InvalidStateError:
+            pass
+
+    # -------------------------------
+    # 📊 Metrics
+    # -------------------------------
+    def _record(self, batch, started: float):
+        size = len(batch)
+        wait = sum(started - b[2] for b in batch)
+        with self._stats_lock:
+            self.batches += 1
+            self.items += size
+            self.total_wait_sec += wait
+            for bucket in _HIST_BUCKETS:
+                if size <= bucket:
+                    self.histogram[str(bucket)] += 1
+                    break
+            else:
+                self.histogram[f">{_HIST_BUCKETS[-1]}"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return self._stats()
+
+    def _stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": self._queue.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "batches": self.batches,
+            "items": self.items,
+            "failures": self.failures,
+            "item_failures": self.item_failures,
+            "direct_fallbacks": self.direct_fallbacks,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0,
+            "avg_queue_wait_ms": round(self.total_wait_sec / self.items * 1000, 2) if self.items else 0,
+            "batch_size_histogram": dict(self.histogram),
+        }
+
+
+# -------------------------------
+# 🧩 Named batchers (one per model)
+# -------------------------------
+_batchers: Dict[str, MicroBatcher] = {}
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(name: str, batch_fn: Callable[[List[Any]], List[Any]], **kwargs) -> MicroBatcher:
+    """Return the shared batcher for `name`, creating it on first use."""
+    b = _batchers.get(name)
+    if b is None:
+        with _batchers_lock:
+            b = _batchers.get(name)
+            if b is None:
+                b = _batchers[name] = MicroBatcher(name, batch_fn, **kwargs)
+    return b
+
+
+def batcher_stats() -> Dict[str, Any]:
+    return {
+        "enabled": INFERENCE_BATCHING,
+        "batchers": {name: b.stats() for name, b in _batchers.items()},
+    }
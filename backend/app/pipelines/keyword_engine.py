@@ -0,0 +1,228 @@
+"""
+SatyaSetu.AI Keyword Feature Engine
+-----------------------------------
+✅ One compiled automaton over every scam / phishing / tone keyword list
+✅ One pass per document yields all keyword counts (classifier, risk, URL scanner)
+✅ Aho-Corasick via pyahocorasick when installed, compiled-regex fallback otherwise
+
+Lists stay in their owning modules and are registered here at import time:
+
+    keyword_engine.register("risk.high", HIGH_RISK_KEYWORDS)
+    hits = keyword_engine.scan(text)
+    hits.n_present("risk.high")   # == sum(1 for kw in HIGH_RISK_KEYWORDS if kw in text.lower())
+
+Match modes (keywords are lowercase [a-z0-9] words separated by single spaces):
+    "substring"  `kw in text.lower()`; multi-word keywords also match across
+                 punctuation, like `kw in clean_text(text)` does
+    "phrase"     words separated by whitespace only (the old r"act\\s+now" regexes)
+    "token"      whole-token occurrence counts, like Counter(clean_text(text).split())
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+MODES = ("substring", "phrase", "token")
+
+_KEYWORD_RE = re.compile(r"[a-z0-9]+(?: [a-z0-9]+)*")
+
+# Normalized view: lowercase, every gap between [a-z0-9] runs becomes one char —
+# " " when the gap is pure whitespace, "\x00" when it holds anything else.
+_PUNCT_RE = re.compile(r"[^a-z0-9 ]+")
+_NUL_RUN_RE = re.compile(r"\x00\x00+")
+
+_SCAN_MEMO_SIZE = 16
+
+
+def normalize(text: str) -> str:
+    """Gap-normalized, lowercased text padded with a separator on both sides."""
+    # str.split() and re's \s agree on what counts as whitespace
+    text = _PUNCT_RE.sub("\x00", " ".join((text or "").lower().split()))
+    text = text.replace(" \x00", "\x00").replace("\x00 ", "\x00")
+    return " " + _NUL_RUN_RE.sub("\x00", text) + " "
+
+
+def _variants(keyword: str, mode: str) -> List[str]:
+    """Patterns (in normalized-text space) that count as one hit of keyword."""
+    if mode == "phrase":
+        return [keyword]
+    if mode == "token":
+        return [a + keyword + b for a in (" ", "\x00") for b in (" ", "\x00")]
+    words = keyword.split(" ")
+    variants = [words[0]]
+    for w in words[1:]:
+        variants = [v + gap + w for v in variants for gap in (" ", "\x00")]
+    return variants
+
+
+class KeywordHits:
+    """Keyword occurrence counts for one document, grouped by list."""
+
+    def __init__(self, lists: Dict[str, Tuple[str, ...]], counts: Dict[Tuple[str, str], int]):
+        self._lists = lists
+        self._counts = counts
+
+    def count(self, list_name: str, keyword: str) -> int:
+        return self._counts.get((list_name, keyword), 0)
+
+    def counts(self, list_name: str) -> Dict[str, int]:
+        """{keyword: occurrences} for keywords of this list found in the text."""
+        return {kw: self._counts[(list_name, kw)]
+                for kw in self._lists[list_name] if (list_name, kw) in self._counts}
+
+    def present(self, list_name: str) -> List[str]:
+        """Keywords of this list found in the text, in list order."""
+        return [kw for kw in self._lists[list_name] if (list_name, kw) in self._counts]
+
+    def n_present(self, list_name: str) -> int:
+        return len(self.present(list_name))
+
+    def any(self, list_name: str) -> bool:
+        return any((list_name, kw) in self._counts for kw in self._lists[list_name])
+
+
+class KeywordEngine:
+    def __init__(self):
+        self._lists: Dict[str, Tuple[str, ...]] = {}
+        self._modes: Dict[str, str] = {}
+        self._matcher = None
+        self._memo: "OrderedDict[str, KeywordHits]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.backend = None
+
+    # -------------------------------
+    # 🧩 Registration
+    # -------------------------------
+    def register(self, list_name: str, keywords, mode: str = "substring"):
+        """Register (or replace) a keyword list. The automaton is rebuilt on next scan."""
+        if mode not in MODES:
+            raise ValueError(f"Unknown keyword match mode '{mode}'")
+        for kw in keywords:
+            if not _KEYWORD_RE.fullmatch(kw):
+                raise ValueError(f"Keyword {kw!r} in '{list_name}' must be lowercase [a-z0-9] words")
+        with self._lock:
+            self._lists[list_name] = tuple(keywords)
+            self._modes[list_name] = mode
+            self._matcher = None
+            self._memo.clear()
+
+    def keywords(self, list_name: str) -> Tuple[str, ...]:
+        return self._lists[list_name]
+
+    def _patterns(self) -> Dict[str, Tuple[Tuple[str, str], ...]]:
+        """Normalized pattern → features (list, keyword) it counts towards."""
+        patterns: Dict[str, list] = {}
+        for list_name, keywords in self._lists.items():
+            for kw in dict.fromkeys(keywords):
+                for p in _variants(kw, self._modes[list_name]):
+                    patterns.setdefault(p, []).append((list_name, kw))
+        return {p: tuple(features) for p, features in patterns.items()}
+
+    def _build(self):
+        patterns = self._patterns()
+        try:
+            import ahocorasick
+            automaton = ahocorasick.Automaton()
+            for p, features in patterns.items():
+                automaton.add_word(p, features)
+            if patterns:
+                automaton.make_automaton()
+            self.backend = "pyahocorasick"
+            return _AhoMatcher(automaton, bool(patterns))
+        except ImportError:
+            self.backend = "regex"
+            return _RegexMatcher(patterns)
+
+    # -------------------------------
+    # ⚡ Scanning
+    # -------------------------------
+    def scan(self, text: str, memo: bool = True) -> KeywordHits:
+        """
+        All registered keyword counts for text, in one pass.
+        Documents are memoized so the classifier and risk assessor share one scan;
+        pass memo=False for short per-entity / per-URL strings.
+        """
+        text = text or ""
+        with self._lock:
+            hits = self._memo.get(text) if memo else None
+            if hits is not None:
+                self._memo.move_to_end(text)
+                return hits
+            if self._matcher is None:
+                self._matcher = self._build()
+            matcher, lists = self._matcher, dict(self._lists)
+
+        counts: Dict[Tuple[str, str], int] = {}
+        for features in matcher.iter(normalize(text)):
+            for f in features:
+                counts[f] = counts.get(f, 0) + 1
+        hits = KeywordHits(lists, counts)
+
+        with self._lock:
+            if memo and self._matcher is matcher:
+                self._memo[text] = hits
+                if len(self._memo) > _SCAN_MEMO_SIZE:
+                    self._memo.popitem(last=False)
+        return hits
+
+
+class _AhoMatcher:
+    def __init__(self, automaton, has_patterns: bool):
+        self._automaton = automaton
+        self._has_patterns = has_patterns
+
+    def iter(self, text: str):
+        if not self._has_patterns:
+            return
+        for _, features in self._automaton.iter(text):
+            yield features
+
+
+def _trie_regex(patterns) -> str:
+    """Patterns as a prefix-trie regex; at each node the longest branch wins."""
+    trie: dict = {}
+    for p in patterns:
+        node = trie
+        for ch in p:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def emit(node):
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return emit(trie)
+
+
+class _RegexMatcher:
+    """
+    Fallback: a trie-shaped regex inside a lookahead finds, at each start
+    position, the longest pattern there; every shorter pattern starting at the
+    same position is a prefix of it, so the precomputed prefix closure yields
+    the full (overlapping) Aho-Corasick match set.
+    """
+
+    def __init__(self, patterns: Dict[str, tuple]):
+        self._regex = None
+        if patterns:
+            first_chars = "".join(sorted({re.escape(p[0]) for p in patterns}))
+            # The leading class lets the regex engine skip positions cheaply
+            self._regex = re.compile(f"(?=[{first_chars}])(?=({_trie_regex(patterns)}))")
+        self._closure = {
+            p: tuple(f for q in patterns if p.startswith(q) for f in patterns[q])
+            for p in patterns
+        }
+
+    def iter(self, text: str):
+        if self._regex is None:
+            return
+        for m in self._regex.finditer(text):
+            yield self._closure[m.group(1)]
+
+
+# Shared engine used by all pipelines
+keyword_engine = KeywordEngine()
@@ -0,0 +1,220 @@
+"""
+SatyaSetu.AI Resident Model Registry
+-----------------------------------
+✅ Lazy-loads OCR / NER / classifier models on first use
+✅ Keeps them resident between requests (no reload per call)
+✅ Evicts least-recently-used models only when the model memory budget would be exceeded
+   (budget = sum of per-model sizes, not process RSS: RSS also counts the interpreter,
+   torch runtime and pages shared copy-on-write with a preload master)
+✅ Per-model load time, hit/miss counts and resident bytes
+"""
+
+import os
+import gc
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+# =========================
+# ⚙️ CONFIGURATION
+# =========================
+# Total size of resident models (size hints, else measured load cost) before evicting.
+# 0 disables the budget (keep everything resident); preload-and-fork turns it off
+# unless set explicitly (app/preload.py).
+MODEL_RSS_BUDGET_MB = int(os.getenv("MODEL_RSS_BUDGET_MB", "1024"))
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_bytes() -> int:
+    """Current resident set size of this process (0 if unavailable)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except Exception:
+        pass
+    try:
+        import resource
+        # ru_maxrss is the peak, in KB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if peak > 1 << 32 else peak * 1024
+    except Exception:
+        return 0
+
+
+class _ModelEntry:
+    def __init__(self, name: str, loader: Callable[[], Any], size_hint_mb: float,
+                 size_of: Optional[Callable[[Any], float]] = None):
+        self.name = name
+        self.loader = loader
+        self.size_hint = int(size_hint_mb * 1024 * 1024)
+        self.size_of = size_of
+        self.model = None
+        self.resident_bytes = 0
+        self.load_time_sec = 0.0
+        self.loads = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.model is not None
+
+    def expected_bytes(self) -> int:
+        """Best estimate of what a (re)load will cost."""
+        return self.resident_bytes or self.size_hint
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of heavy models.
+    Models are registered with a zero-arg loader and fetched with get(name).
+    """
+
+    def __init__(self, budget_mb: int = MODEL_RSS_BUDGET_MB):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self._entries: Dict[str, _ModelEntry] = {}
+        self._lru: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    # -------------------------------
+    # 🧩 Registration
+    # -------------------------------
+    def register(self, name: str, loader: Callable[[], Any], size_hint_mb: float = 0,
+                 size_of: Optional[Callable[[Any], float]] = None):
+        """
+        Register a loader. Re-registering replaces the loader and drops the old model.
+        `size_of(model)` (MB) re-sizes the entry after each load, for loaders whose
+        result can differ from what the hint assumed (e.g. a backend fallback).
+        """
+        with self._lock:
+            if name in self._entries:
+                self.unload(name)
+            self._entries[name] = _ModelEntry(name, loader, size_hint_mb, size_of)
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._entries
+
+    # -------------------------------
+    # ⚡ Access
+    # -------------------------------
+    def get(self, name: str) -> Any:
+        """Return the resident model, loading (and evicting others) if needed."""
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"Model '{name}' is not registered")
+
+        with self._lock:
+            if entry.loaded:
+                entry.hits += 1
+                self._lru.move_to_end(name)
+                return entry.model
+
+        # Per-model lock so two requests don't load the same model twice
+        with entry.lock:
+            with self._lock:
+                if entry.loaded:
+                    entry.hits += 1
+                    self._lru.move_to_end(name)
+                    return entry.model
+                entry.misses += 1
+                self._make_room(entry.expected_bytes(), exclude=name)
+
+            print(f"⏳ Loading model '{name}'...")
+            rss_before = current_rss_bytes()
+            t0 = time.perf_counter()
+            model = entry.loader()
+            entry.load_time_sec = round(time.perf_counter() - t0, 3)
+            rss_after = current_rss_bytes()
+
+            with self._lock:
+                entry.model = model
+                entry.loads += 1
+                if entry.size_of is not None:
+                    entry.size_hint = int(entry.size_of(model) * 1024 * 1024)
+                # The hint wins: a first load's RSS delta also includes shared runtimes (torch, CUDA libs)
+                measured = max(0, rss_after - rss_before)
+                entry.resident_bytes = entry.size_hint or measured
+                self._lru[name] = None
+                self._lru.move_to_end(name)
+                # First loads have no size estimate — re-check the budget now that we know
+                self._make_room(0, exclude=name)
+            print(f"✅ Model '{name}' resident ({entry.load_time_sec}s, "
+                  f"{entry.resident_bytes / 1e6:.1f} MB)")
+            return model
+
+    def peek(self, name: str) -> Optional[Any]:
+        """Return the model only if it is already resident (no load, no stats)."""
+        entry = self._entries.get(name)
+        return entry.model if entry else None
+
+    # -------------------------------
+    # 🧹 Eviction
+    # -------------------------------
+    def models_bytes(self) -> int:
+        """Accounted size of every resident model."""
+        return sum(self._entries[name].resident_bytes for name in self._lru)
+
+    def _make_room(self, needed: int, exclude: str = None):
+        """Evict LRU models until resident model bytes + needed fits the budget."""
+        if self.budget_bytes <= 0:
+            return
+        for victim in list(self._lru.keys()):
+            if self.models_bytes() + needed <= self.budget_bytes:
+                return
+            if victim == exclude:
+                continue
+            self._evict(victim)
+
+    def _evict(self, name: str):
+        entry = self._entries[name]
+        entry.model = None
+        entry.evictions += 1
+        self._lru.pop(name, None)
+        gc.collect()  # Force RAM release
+        print(f"♻️ Evicted model '{name}' to stay within the model memory budget")
+
+    def unload(self, name: str):
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry and entry.loaded:
+                entry.model = None
+                self._lru.pop(name, None)
+                gc.collect()
+
+    def clear(self):
+        with self._lock:
+            for name in list(self._lru.keys()):
+                self.unload(name)
+
+    # -------------------------------
+    # 📊 Stats
+    # -------------------------------
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            models = {
+                name: {
+                    "loaded": e.loaded,
+                    "resident_bytes": e.resident_bytes if e.loaded else 0,
+                    "last_load_time_sec": e.load_time_sec,
+                    "loads": e.loads,
+                    "hits": e.hits,
+                    "misses": e.misses,
+                    "evictions": e.evictions,
+                }
+                for name, e in self._entries.items()
+            }
+            return {
+                "budget_bytes": self.budget_bytes,
+                "models_bytes": self.models_bytes(),
+                "process_rss_bytes": current_rss_bytes(),
+                "lru_order": list(self._lru.keys()),
+                "models": models,
+            }
+
+
+# Shared registry used by all pipelines
+registry = ModelRegistry()
@@ -1,40 +1,61 @@
-import spacy
-import gc # <--- Memory management
+import os
+from app.pipelines.model_registry import registry
+from app.pipelines.inference_batcher import INFERENCE_BATCHING, get_batcher
+
+# Extract specific entities relevant to scams
+TARGET_LABELS = ["ORG", "GPE", "DATE", "MONEY", "PERSON"]
+
+# Only tok2vec + ner are needed for doc.ents; everything else is dead weight
+NER_EXCLUDED_COMPONENTS = ["parser", "tagger", "attribute_ruler", "lemmatizer", "senter"]
+NER_BATCH_SIZE = int(os.getenv("NER_BATCH_SIZE", "64"))
+NER_N_PROCESS = int(os.getenv("NER_N_PROCESS", "1"))
+
+
+def _load_nlp():
+    import spacy
+    # Ensure you have 'en_core_web_sm' installed in your requirements.txt
+    return spacy.load("en_core_web_sm", exclude=NER_EXCLUDED_COMPONENTS)
+
+
+registry.register("spacy_ner", _load_nlp, size_hint_mb=45)
+
+
+def _doc_entities(doc):
+    return [
+        {
+            "value": ent.text,      # Changed from "text" to match risk_assessor.py
+            "type": ent.label_,     # Changed from "label" to match risk_assessor.py
+            "start": ent.start_char,
+            "end": ent.end_char
+        }
+        for ent in doc.ents
+        if ent.label_ in TARGET_LABELS
+    ]
+
+
+def _ner_batch(texts):
+    """Run all queued texts through one nlp.pipe call."""
+    nlp = registry.get("spacy_ner")
+    return [_doc_entities(doc) for doc in nlp.pipe(texts, batch_size=NER_BATCH_SIZE)]
+
 
 def extract_named_entities(text):
     """
     Extracts organizations, dates, and geopolitical entities using Spacy.
-    Optimized for low-RAM environments (Load -> Predict -> Unload).
+    The spaCy pipeline stays resident in the model registry between calls, and
+    concurrent calls are micro-batched when INFERENCE_BATCHING is on.
     """
     if not text:
         return []
 
-    nlp = None
-    doc = None
     entities = []
 
     try:
-        print("⏳ Loading NER Model...")
-        # Load the small English model. 
-        # Ensure you have 'en_core_web_sm' installed in your requirements.txt
-        nlp = spacy.load("en_core_web_sm")
-        
-        # Process text
-        doc = nlp(text)
-
-        # Extract specific entities relevant to scams
-        target_labels = ["ORG", "GPE", "DATE", "MONEY", "PERSON"]
-        
-        entities = [
-            {
-                "value": ent.text,      # Changed from "text" to match risk_assessor.py
-                "type": ent.label_,     # Changed from "label" to match risk_assessor.py
-                "start": ent.start_char, 
-                "end": ent.end_char
-            }
-            for ent in doc.ents
-            if ent.label_ in target_labels
-        ]
+        if INFERENCE_BATCHING:
+            entities = get_batcher("ner", _ner_batch)(text)
+        else:
+            nlp = registry.get("spacy_ner")
+            entities = _doc_entities(nlp(text))
 
         print(f"✅ NER Found {len(entities)} entities")
 
@@ -43,14 +64,46 @@ def extract_named_entities(text):
         # Return empty list instead of crashing
         return []
 
-    finally:
-        # --- AGGRESSIVE CLEANUP ---
-        if nlp:
-            del nlp
-        if doc:
-            del doc
-        
-        gc.collect() # Force RAM release
-        print("✅ NER Model Unloaded")
-
-    return entities
\ No newline at end of file
+    return entities
+
+
+def extract_named_entities_batch(texts, batch_size=NER_BATCH_SIZE, n_process=NER_N_PROCESS):
+    """
+    NER over many texts in one nlp.pipe stream.
+    Returns one entity list per input text (empty texts → []).
+    """
+    results = [[] for _ in texts]
+    todo = [(i, t) for i, t in enumerate(texts) if t]
+    if not todo:
+        return results
+
+    try:
+        nlp = registry.get("spacy_ner")
+        docs = nlp.pipe((t for _, t in todo), batch_size=batch_size, n_process=n_process)
+        for (i, _), doc in zip(todo, docs):
+            results[i] = _doc_entities(doc)
+        print(f"✅ NER processed {len(todo)} texts in one batch")
+    except Exception as e:
+        print(f"⚠️ Batch NER Extraction Failed: {e}")
+
+    return results
+
+
+def extract_named_entities_pages(pages, batch_size=NER_BATCH_SIZE, n_process=NER_N_PROCESS):
+    """
+    NER over multi-page evidence in one batch.
+    Offsets are shifted to the joined document text ("\\n".join of non-empty pages).
+    """
+    return merge_page_entities(pages, extract_named_entities_batch(pages, batch_size, n_process))
+
+
+def merge_page_entities(pages, page_entities):
+    """Flatten per-page entity lists into document offsets."""
+    merged, offset = [], 0
+    for page, ents in zip(pages, page_entities):
+        if not page:
+            continue
+        for e in ents:
+            merged.append({**e, "start": e["start"] + offset, "end": e["end"] + offset})
+        offset += len(page) + 1  # "\n" separator
+    return merged
@@ -1,42 +1,307 @@
-import easyocr
-import gc # <--- Memory management
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from app.pipelines.ocr_engines import (
+    OCR_INTERACTIVE_POLICY,
+    select_engine,
+    timed_read,
+    timed_recognize,
+    maybe_sample_agreement,
+)
+
+# PDF evidence: pages without a text layer are rasterized at this DPI and OCR'd
+OCR_PDF_DPI = int(os.getenv("OCR_PDF_DPI", "200"))
+OCR_PDF_WORKERS = int(os.getenv("OCR_PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Minimum characters in a page's text layer before we trust it over OCR
+PDF_TEXT_LAYER_MIN_CHARS = int(os.getenv("PDF_TEXT_LAYER_MIN_CHARS", "20"))
+
+# Adaptive OCR: first pass on a grayscale copy whose long side is at most OCR_MAX_SIDE;
+# regions below OCR_ESCALATE_CONF are re-read at OCR_ESCALATE_FACTOR x resolution, up to the
+# source resolution (upscaling past it adds no detail), weakest first, at most
+# OCR_ESCALATE_MAX_REGIONS per image.
+OCR_MAX_SIDE = int(os.getenv("OCR_MAX_SIDE", "1280"))
+OCR_ESCALATE_CONF = float(os.getenv("OCR_ESCALATE_CONF", "0.5"))
+OCR_ESCALATE_FACTOR = float(os.getenv("OCR_ESCALATE_FACTOR", "2.0"))
+OCR_ESCALATE_MAX_SIDE = int(os.getenv("OCR_ESCALATE_MAX_SIDE", "2048"))
+OCR_ESCALATE_PADDING = int(os.getenv("OCR_ESCALATE_PADDING", "4"))
+OCR_ESCALATE_MAX_REGIONS = int(os.getenv("OCR_ESCALATE_MAX_REGIONS", "8"))
+
+TEXT_EXTS = {".txt"}
+PDF_EXTS = {".pdf"}
+
+
+# -------------------------------
+# 🔎 Adaptive-Resolution OCR
+# -------------------------------
+def _to_gray(img):
+    import cv2
+    if img.ndim == 3:
+        return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    return img
+
+
+def _resize(img, scale):
+    import cv2
+    if abs(scale - 1.0) < 1e-3:
+        return img
+    h, w = img.shape[:2]
+    interp = cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC
+    return cv2.resize(img, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=interp)
+
+
+def _escalation_crop(gray, bbox, first_scale):
+    """
+    Crop of one low-confidence region from the full-resolution image at
+    OCR_ESCALATE_FACTOR x the first-pass resolution, capped by the source resolution
+    and OCR_ESCALATE_MAX_SIDE. None if no higher resolution is possible.
+    """
+    h, w = gray.shape[:2]
+    xs = [p[0] / first_scale for p in bbox]
+    ys = [p[1] / first_scale for p in bbox]
+    pad = OCR_ESCALATE_PADDING
+    x0, x1 = max(0, int(min(xs)) - pad), min(w, int(max(xs)) + pad)
+    y0, y1 = max(0, int(min(ys)) - pad), min(h, int(max(ys)) + pad)
+    if x1 <= x0 or y1 <= y0:
+        return None
+
+    crop = gray[y0:y1, x0:x1]
+    scale = min(first_scale * OCR_ESCALATE_FACTOR, 1.0, OCR_ESCALATE_MAX_SIDE / max(crop.shape[:2]))
+    if scale <= first_scale:
+        return None
+    return _resize(crop, scale)
+
+
+def _escalate_regions(engine, gray, bboxes, first_scale):
+    """
+    Re-OCR low-confidence regions, all crops in one recognition call.
+    Returns {index in bboxes: (text, confidence, pixels)}.
+    """
+    crops = {}
+    for i, bbox in enumerate(bboxes):
+        crop = _escalation_crop(gray, bbox, first_scale)
+        if crop is not None:
+            crops[i] = crop
+    if not crops:
+        return {}
+
+    retries = {}
+    for i, regions in zip(crops, timed_recognize(engine, list(crops.values()))):
+        if regions:
+            text = " ".join(r[1] for r in regions)
+            conf = sum(float(r[2]) for r in regions) / len(regions)
+            retries[i] = (text, conf, crops[i].shape[0] * crops[i].shape[1])
+    return retries
+
+
+def ocr_image(image, policy=OCR_INTERACTIVE_POLICY):
+    """
+    Adaptive OCR of one image (path or decoded array).
+    The engine is chosen by `policy` (fast / accurate / auto). Pass 1 runs on a
+    grayscale copy bounded to OCR_MAX_SIDE; only regions whose confidence is
+    below OCR_ESCALATE_CONF are re-read at higher resolution (never above the
+    source's own, so an image read at full size in pass 1 is not escalated).
+    Returns (text, stats).
+    """
+    import cv2
+    img = cv2.imread(image) if isinstance(image, str) else image
+    if img is None:
+        return "", {"ocr_pixels": 0, "regions": 0, "escalated": 0, "escalation_rate": 0.0}
+
+    gray = _to_gray(img)
+    engine, reason = select_engine(gray, policy)
+    first_scale = min(1.0, OCR_MAX_SIDE / max(gray.shape[:2]))
+    small = _resize(gray, first_scale)
+    pixels = small.shape[0] * small.shape[1]
+
+    regions = timed_read(engine, small)
+    maybe_sample_agreement(engine, small, regions)
+    weak = sorted((i for i, r in enumerate(regions) if float(r[2]) < OCR_ESCALATE_CONF),
+                  key=lambda i: float(regions[i][2]))
+    escalate = weak[:OCR_ESCALATE_MAX_REGIONS] if first_scale < 1.0 else []
+    retries = _escalate_regions(engine, gray, [regions[i][0] for i in escalate], first_scale)
+    retries = {escalate[j]: retry for j, retry in retries.items()}
+
+    lines, improved, confs = [], 0, []
+    for i, (bbox, text, conf) in enumerate(regions):
+        conf = float(conf)
+        retry = retries.get(i)
+        if retry:
+            pixels += retry[2]
+            if retry[1] > conf:
+                text, conf = retry[0], retry[1]
+                improved += 1
+        lines.append(text)
+        confs.append(conf)
+    escalated = len(escalate)
+
+    stats = {
+        "engine": engine.name,
+        "engine_reason": reason,
+        "ocr_pixels": pixels,
+        "source_pixels": gray.shape[0] * gray.shape[1],
+        "first_pass_scale": round(first_scale, 3),
+        "regions": len(regions),
+        "escalated": escalated,
+        "escalation_skipped": len(weak) - escalated,
+        "escalation_improved": improved,
+        "escalation_rate": round(escalated / len(regions), 3) if regions else 0.0,
+        "mean_confidence": round(sum(confs) / len(confs), 3) if confs else 0.0,
+    }
+    return " ".join(lines), stats
+
 
 def extract_text_from_image(image_path):
     """
     Extracts text from an image using EasyOCR.
-    Optimized for low-RAM environments.
+    The reader stays resident in the model registry between calls, and
+    concurrent calls are micro-batched when INFERENCE_BATCHING is on.
     """
     if not os.path.exists(image_path):
         return ""
+    return _ocr_image_safe(image_path)[0]
 
-    reader = None
-    text = ""
 
+def _ocr_image_safe(image, policy=OCR_INTERACTIVE_POLICY):
     try:
-        print("⏳ Loading OCR Engine...")
-        
-        # Initialize EasyOCR reader for English
-        # gpu=False is CRITICAL for Render free tier (no GPU available)
-        reader = easyocr.Reader(['en'], gpu=False, verbose=False)
-        
         print("🔍 Scanning Image...")
-        result = reader.readtext(image_path, detail=0) # detail=0 returns just the text list
-        
-        # Join extracted lines into a single string
-        text = " ".join(result)
-        print("✅ OCR Extraction Complete")
-
+        text, stats = ocr_image(image, policy)
+        print(f"✅ OCR Extraction Complete ({stats['engine']}, "
+              f"escalation rate {stats['escalation_rate']:.0%})")
+        return text, stats
     except Exception as e:
         print(f"⚠️ OCR Failed: {e}")
-        return ""
+        return "", {"error": str(e)}
+
+
+# -------------------------------
+# 📄 Format Dispatcher (TXT / PDF / Image)
+# -------------------------------
+def _read_text_file(path):
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def _pixmap_to_array(pix):
+    import numpy as np
+    arr = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.h, pix.w, pix.n)
+    if pix.n == 1:
+        return arr[:, :, 0].copy()
+    if pix.n == 4:
+        arr = arr[:, :, :3]
+    # PyMuPDF gives RGB; OpenCV / EasyOCR arrays are BGR
+    return arr[:, :, ::-1].copy()
+
+
+def _merge_ocr_stats(all_stats):
+    """Per-file OCR stats from per-image / per-page stats."""
+    regions = sum(st.get("regions", 0) for st in all_stats)
+    escalated = sum(st.get("escalated", 0) for st in all_stats)
+    engines = {}
+    for st in all_stats:
+        if st.get("engine"):
+            engines[st["engine"]] = engines.get(st["engine"], 0) + 1
+    return {
+        "engines": engines,
+        "ocr_pixels": sum(st.get("ocr_pixels", 0) for st in all_stats),
+        "source_pixels": sum(st.get("source_pixels", 0) for st in all_stats),
+        "regions": regions,
+        "escalated": escalated,
+        "escalation_skipped": sum(st.get("escalation_skipped", 0) for st in all_stats),
+        "escalation_improved": sum(st.get("escalation_improved", 0) for st in all_stats),
+        "escalation_rate": round(escalated / regions, 3) if regions else 0.0,
+        "failed_pages": [st["page"] for st in all_stats if st.get("error") and "page" in st],
+    }
+
+
+def extract_text_from_pdf(pdf_path, policy=OCR_INTERACTIVE_POLICY):
+    """
+    Streams a PDF page by page.
+    Pages with an embedded text layer are read directly; image-only pages are
+    rasterized (grayscale) and OCR'd in parallel, with at most a few pages in
+    flight so memory stays bounded on multi-hundred-page evidence.
+    Returns (pages, ocr_stats) where ocr_stats has one entry per OCR'd page;
+    a page whose OCR failed is left empty and its entry carries the error.
+    """
+    import fitz  # PyMuPDF
+
+    ocr_stats = []
+    in_flight = {}
+    max_in_flight = OCR_PDF_WORKERS * 2
+
+    def _collect(fut):
+        page_no = in_flight.pop(fut)
+        try:
+            text, stats = fut.result()
+        except Exception as e:
+            # One unreadable page shouldn't cost the rest of the document
+            print(f"⚠️ OCR failed on page {page_no + 1}: {e}")
+            text, stats = "", {"error": str(e)}
+        pages[page_no] = text
+        ocr_stats.append({"page": page_no + 1, **stats})
+
+    with fitz.open(pdf_path) as doc, ThreadPoolExecutor(max_workers=OCR_PDF_WORKERS) as pool:
+        pages = [""] * doc.page_count
+        for page_no in range(doc.page_count):
+            page = doc.load_page(page_no)
+            layer = page.get_text("text").strip()
+            if len(layer) >= PDF_TEXT_LAYER_MIN_CHARS:
+                pages[page_no] = layer
+                continue
+
+            # Image-only page → rasterize here (PyMuPDF isn't thread-safe), OCR in the pool
+            if len(in_flight) >= max_in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    _collect(fut)
+            pix = page.get_pixmap(dpi=OCR_PDF_DPI, colorspace=fitz.csGRAY)
+            in_flight[pool.submit(ocr_image, _pixmap_to_array(pix), policy)] = page_no
+
+        for fut in list(in_flight):
+            _collect(fut)
+
+    return pages, ocr_stats
+
+
+def extract_document(file_path, policy=OCR_INTERACTIVE_POLICY):
+    """
+    Dispatches evidence to the right extractor by file type.
+    `policy` picks the OCR tier for images / image-only pages (fast, accurate, auto).
+    Returns {"text", "pages", "stats"}; "pages" has one entry per PDF page
+    (a single entry for images and text files).
+    """
+    empty = {"text": "", "pages": [], "stats": {"format": None}}
+    if not os.path.exists(file_path):
+        return empty
+
+    ext = os.path.splitext(file_path)[1].lower()
+    t0 = time.perf_counter()
+    try:
+        if ext in TEXT_EXTS:
+            pages, fmt, ocr_stats = [_read_text_file(file_path)], "text", []
+        elif ext in PDF_EXTS:
+            pages, ocr_stats = extract_text_from_pdf(file_path, policy)
+            fmt = "pdf"
+        else:
+            text, stats = _ocr_image_safe(file_path, policy)
+            pages, fmt, ocr_stats = [text], "image", [stats]
+    except Exception as e:
+        print(f"⚠️ Text extraction failed for {file_path}: {e}")
+        return empty
+
+    text = "\n".join(p for p in pages if p)
+    return {
+        "text": text,
+        "pages": pages,
+        "stats": {
+            "format": fmt,
+            "pages": len(pages),
+            "ocr_pages": len(ocr_stats),
+            "ocr": _merge_ocr_stats(ocr_stats),
+            "extraction_time_sec": round(time.perf_counter() - t0, 3),
+        },
+    }
 
-    finally:
-        # --- AGGRESSIVE CLEANUP ---
-        if reader:
-            del reader
-        
-        gc.collect() # Force RAM release
-        print("✅ OCR Engine Unloaded")
 
-    return text
\ No newline at end of file
+def extract_text(file_path, policy=OCR_INTERACTIVE_POLICY):
+    """Plain-text view of any supported evidence file (image, PDF or .txt)."""
+    return extract_document(file_path, policy)["text"]
@@ -0,0 +1,331 @@
+"""
+SatyaSetu.AI OCR Engines
+-----------------------------------
+✅ One interface, two engines: EasyOCR (accurate) and Tesseract (fast)
+✅ Tier policy: fast (triage / batch), accurate (final report), auto (size + text-density probe)
+✅ Per-engine latency and sampled cross-engine agreement metrics (sampled reads run
+   on a background worker, never on the request path)
+"""
+
+import os
+import re
+import time
+import random
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from app.pipelines.model_registry import registry
+from app.pipelines.inference_batcher import INFERENCE_BATCHING, get_batcher
+
+# =========================
+# ⚙️ CONFIGURATION
+# =========================
+# Policy per workload: "fast", "accurate" or "auto"
+OCR_INTERACTIVE_POLICY = os.getenv("OCR_INTERACTIVE_POLICY", "accurate")
+OCR_BATCH_POLICY = os.getenv("OCR_BATCH_POLICY", "fast")
+
+# auto: images at or below this many pixels always go to EasyOCR (small screenshots)
+OCR_AUTO_SMALL_PIXELS = int(os.getenv("OCR_AUTO_SMALL_PIXELS", str(800 * 800)))
+# auto: edge density on the probe thumbnail at/above which a page counts as dense text
+OCR_AUTO_DENSE_TEXT = float(os.getenv("OCR_AUTO_DENSE_TEXT", "0.08"))
+# Fraction of images also read by the other engine to measure agreement
+OCR_AGREEMENT_SAMPLE_RATE = float(os.getenv("OCR_AGREEMENT_SAMPLE_RATE", "0.05"))
+
+Region = Tuple[list, str, float]  # (bbox as 4 points, text, confidence 0–1)
+
+
+# -------------------------------
+# 🧩 Engine Interface
+# -------------------------------
+class OCREngine(ABC):
+    name = "base"
+    tier = None
+
+    def available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def read(self, img) -> List[Region]:
+        """OCR one decoded image array → [(bbox, text, confidence), ...]."""
+
+    def recognize(self, crops) -> List[List[Region]]:
+        """Re-read crops that each hold one known text region (no layout detection needed)."""
+        return [self.read(crop) for crop in crops]
+
+
+# -------------------------------
+# 🎯 EasyOCR (accurate tier)
+# -------------------------------
+def _load_reader():
+    import easyocr
+    # Initialize EasyOCR reader for English
+    # gpu=False is CRITICAL for Render free tier (no GPU available)
+    return easyocr.Reader(['en'], gpu=False, verbose=False)
+
+
+registry.register("easyocr", _load_reader, size_hint_mb=400)
+
+
+def _easyocr_batch(images):
+    """
+    OCR many decoded images with one resident reader (detail=1 output).
+    Same-sized images (e.g. screenshots from the same phone, PDF pages) share
+    one batched detection pass; odd sizes fall back to per-image readtext.
+    """
+    reader = registry.get("easyocr")
+    results = [None] * len(images)
+
+    groups = defaultdict(list)
+    for i, img in enumerate(images):
+        groups[img.shape].append((i, img))
+
+    for members in groups.values():
+        if len(members) == 1:
+            i, img = members[0]
+            results[i] = reader.readtext(img, detail=1)
+            continue
+        batched = reader.readtext_batched([img for _, img in members], detail=1)
+        for (i, _), regions in zip(members, batched):
+            results[i] = regions
+
+    return results
+
+
+class EasyOCREngine(OCREngine):
+    name = "easyocr"
+    tier = "accurate"
+
+    def read(self, img):
+        if INFERENCE_BATCHING:
+            regions = get_batcher("ocr", _easyocr_batch)(img)
+        else:
+            regions = registry.get("easyocr").readtext(img, detail=1)
+        return [(bbox, text, float(conf)) for bbox, text, conf in regions]
+
+    def recognize(self, crops):
+        # Recognition only, with the whole crop as the one text box: skips the detector,
+        # and the batcher's wait window (the crops are already one batch).
+        reader = registry.get("easyocr")
+        return [
+            [(bbox, text, float(conf)) for bbox, text, conf in reader.recognize(
+                crop, horizontal_list=[[0, crop.shape[1], 0, crop.shape[0]]], free_list=[], detail=1)]
+            for crop in crops
+        ]
+
+
+# -------------------------------
+# ⚡ Tesseract (fast tier)
+# -------------------------------
+class TesseractEngine(OCREngine):
+    name = "tesseract"
+    tier = "fast"
+
+    def __init__(self):
+        self._available = None
+
+    def available(self):
+        if self._available is None:
+            try:
+                import pytesseract
+                pytesseract.get_tesseract_version()
+                self._available = True
+            except Exception:
+                print("[OCR] Tesseract binary not found — fast tier falls back to EasyOCR.")
+                self._available = False
+        return self._available
+
+    def read(self, img, config: str = ""):
+        import pytesseract
+        data = pytesseract.image_to_data(img, config=config, output_type=pytesseract.Output.DICT)
+
+        # Group words into lines so regions look like EasyOCR's
+        lines = defaultdict(list)
+        for i, word in enumerate(data["text"]):
+            conf = float(data["conf"][i])
+            if not word.strip() or conf < 0:
+                continue
+            key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            lines[key].append((data["left"][i], data["top"][i], data["width"][i],
+                               data["height"][i], word, conf / 100.0))
+
+        regions = []
+        for words in lines.values():
+            x0 = min(w[0] for w in words)
+            y0 = min(w[1] for w in words)
+            x1 = max(w[0] + w[2] for w in words)
+            y1 = max(w[1] + w[3] for w in words)
+            bbox = [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
+            text = " ".join(w[4] for w in words)
+            conf = sum(w[5] for w in words) / len(words)
+            regions.append((bbox, text, conf))
+        return regions
+
+    def recognize(self, crops):
+        # --psm 7: each crop is a single text line, so page segmentation is skipped
+        return [self.read(crop, config="--psm 7") for crop in crops]
+
+
+ENGINES: Dict[str, OCREngine] = {
+    "easyocr": EasyOCREngine(),
+    "tesseract": TesseractEngine(),
+}
+TIERS = {"fast": "tesseract", "accurate": "easyocr"}
+
+
+# -------------------------------
+# 🧠 Selector Policy
+# -------------------------------
+def text_density(gray) -> float:
+    """Quick probe: fraction of edge pixels on a 256px thumbnail."""
+    import cv2
+    h, w = gray.shape[:2]
+    scale = min(1.0, 256 / max(h, w))
+    thumb = cv2.resize(gray, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+    edges = cv2.Canny(thumb, 100, 200)
+    return float((edges > 0).mean())
+
+
+def select_engine(gray, policy: str = OCR_INTERACTIVE_POLICY) -> Tuple[OCREngine, str]:
+    """
+    Pick an engine for one (grayscale) image. Returns (engine, reason).
+    auto: small images and sparse text (photos, chat screenshots) → EasyOCR;
+    large, text-dense pages (scanned notices, documents) → Tesseract.
+    """
+    if policy in TIERS:
+        engine = ENGINES[TIERS[policy]]
+        reason = f"policy:{policy}"
+    else:
+        pixels = gray.shape[0] * gray.shape[1]
+        if pixels <= OCR_AUTO_SMALL_PIXELS:
+            engine, reason = ENGINES["easyocr"], "auto:small_image"
+        else:
+            density = text_density(gray)
+            if density >= OCR_AUTO_DENSE_TEXT:
+                engine, reason = ENGINES["tesseract"], f"auto:dense_text({density:.3f})"
+            else:
+                engine, reason = ENGINES["easyocr"], f"auto:sparse_text({density:.3f})"
+
+    if not engine.available():
+        engine, reason = ENGINES["easyocr"], reason + "→fallback"
+    return engine, reason
+
+
+# -------------------------------
+# 📊 Metrics
+# -------------------------------
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_lock = threading.Lock()
+_metrics = {
+    name: {"calls": 0, "images": 0, "total_sec": 0.0, "failures": 0} for name in ENGINES
+}
+_agreement = defaultdict(lambda: {"samples": 0, "jaccard_sum": 0.0, "dropped": 0})
+
+# Agreement reads are a second full OCR pass: one background worker, a short queue
+_agreement_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr-agreement")
+_AGREEMENT_MAX_PENDING = 2
+_agreement_pending = 0
+
+
+def _timed(engine: OCREngine, call, images: int):
+    t0 = time.perf_counter()
+    try:
+        return call()
+    except Exception:
+        with _lock:
+            _metrics[engine.name]["failures"] += 1
+        raise
+    finally:
+        with _lock:
+            m = _metrics[engine.name]
+            m["calls"] += 1
+            m["images"] += images
+            m["total_sec"] += time.perf_counter() - t0
+
+
+def timed_read(engine: OCREngine, img, new_image: bool = True) -> List[Region]:
+    return _timed(engine, lambda: engine.read(img), int(new_image))
+
+
+def timed_recognize(engine: OCREngine, crops) -> List[List[Region]]:
+    """All escalation crops of one image in a single engine call."""
+    return _timed(engine, lambda: engine.recognize(crops), 0)
+
+
+def _tokens(regions: List[Region]) -> set:
+    return set(_TOKEN_RE.findall(" ".join(r[1] for r in regions).lower()))
+
+
+def maybe_sample_agreement(engine: OCREngine, img, regions: List[Region]):
+    """
+    On a sample of images, read with the other engine too and log token agreement.
+    Returns immediately: the second read runs on the background agreement worker,
+    and a sample is dropped when that worker is already behind.
+    """
+    global _agreement_pending
+    if OCR_AGREEMENT_SAMPLE_RATE <= 0 or random.random() >= OCR_AGREEMENT_SAMPLE_RATE:
+        return
+    other = next((e for e in ENGINES.values() if e is not engine and e.available()), None)
+    if other is None:
+        return
+    pair = "|".join(sorted([engine.name, other.name]))
+    with _lock:
+        if _agreement_pending >= _AGREEMENT_MAX_PENDING:
+            _agreement[pair]["dropped"] += 1
+            return
+        _agreement_pending += 1
+    _agreement_pool.submit(_sample_agreement, engine, other, img, regions)
+
+
+def _sample_agreement(engine: OCREngine, other: OCREngine, img, regions: List[Region]):
+    global _agreement_pending
+    try:
+        _record_agreement(engine, other, img, regions)
+    finally:
+        with _lock:
+            _agreement_pending -= 1
+
+
+def _record_agreement(engine: OCREngine, other: OCREngine, img, regions: List[Region]):
+    try:
+        other_regions = timed_read(other, img, new_image=False)
+    except Exception as e:
+        print(f"[OCR] Agreement sample failed on {other.name}: {e}")
+        return
+
+    a, b = _tokens(regions), _tokens(other_regions)
+    jaccard = len(a & b) / len(a | b) if (a | b) else 1.0
+    pair = "|".join(sorted([engine.name, other.name]))
+    with _lock:
+        _agreement[pair]["samples"] += 1
+        _agreement[pair]["jaccard_sum"] += jaccard
+    print(f"[OCR] Agreement {engine.name} vs {other.name}: jaccard={jaccard:.2f}")
+
+
+def engine_stats() -> dict:
+    with _lock:
+        engines = {
+            name: {
+                **m,
+                "total_sec": round(m["total_sec"], 3),
+                "avg_sec_per_call": round(m["total_sec"] / m["calls"], 3) if m["calls"] else 0,
+                "available": ENGINES[name].available(),
+            }
+            for name, m in _metrics.items()
+        }
+        agreement = {
+            pair: {
+                "samples": a["samples"],
+                "mean_token_jaccard": round(a["jaccard_sum"] / a["samples"], 3) if a["samples"] else None,
+                "dropped": a["dropped"],
+            }
+            for pair, a in _agreement.items()
+        }
+    return {
+        "policies": {"interactive": OCR_INTERACTIVE_POLICY, "batch": OCR_BATCH_POLICY},
+        "agreement_sample_rate": OCR_AGREEMENT_SAMPLE_RATE,
+        "engines": engines,
+        "agreement": agreement,
+    }
@@ -0,0 +1,243 @@
+"""
+SatyaSetu.AI Online Classifier Trainer
+-----------------------------------
+✅ Analyst feedback (confirmed / corrected case categories) appended to a JSONL label store
+✅ HashingVectorizer + SGD (log-loss) text model updated with partial_fit — no full refit
+✅ Each update is published as a new immutable version; the pointer file is swapped
+   with os.replace so every worker picks it up on its next classification
+✅ Cross-process training lock (gunicorn workers share the label store)
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+import joblib
+import numpy as np
+from datetime import datetime, timezone
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+
+from app.pipelines.scam_classifier import (
+    SCAM_TYPES,
+    TRAIN_DATA,
+    ONLINE_MODEL_DIR,
+    ONLINE_MODEL_POINTER,
+    clean_text,
+    read_model_pointer,
+)
+
+# =========================
+# ⚙️ CONFIGURATION
+# =========================
+LABEL_STORE_PATH = "app/data/feedback/labels.jsonl"
+LOCK_PATH = os.path.join(ONLINE_MODEL_DIR, ".train.lock")
+
+# Pending labels needed before feedback triggers an update (admin uploads always train)
+ONLINE_RETRAIN_MIN_LABELS = int(os.getenv("ONLINE_RETRAIN_MIN_LABELS", "10"))
+# partial_fit passes over each batch of new labels
+ONLINE_TRAIN_EPOCHS = int(os.getenv("ONLINE_TRAIN_EPOCHS", "5"))
+# Published versions kept on disk for rollback
+ONLINE_KEEP_VERSIONS = int(os.getenv("ONLINE_KEEP_VERSIONS", "5"))
+
+_HASH_FEATURES = 2 ** 16
+
+_store_lock = threading.Lock()
+_train_lock = threading.Lock()
+
+
+def _new_text_model():
+    # Stateless vectorizer: new vocabulary never requires a refit
+    vectorizer = HashingVectorizer(
+        n_features=_HASH_FEATURES, ngram_range=(1, 2), alternate_sign=False,
+        stop_words="english", norm="l2",
+    )
+    model = SGDClassifier(loss="log_loss", alpha=1e-4, random_state=42)
+    return model, vectorizer
+
+
+# -------------------------------
+# 🏷️ Label store
+# -------------------------------
+def add_labels(examples, source: str, analyst: str = None) -> int:
+    """
+    Append labeled texts to the store. `examples` are dicts with `text` and
+    `label` (one of SCAM_TYPES) plus optional `file_id`, `predicted`, `model_version`.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    lines = []
+    for ex in examples:
+        if ex["label"] not in SCAM_TYPES:
+            raise ValueError(f"Unknown category '{ex['label']}'")
+        if not clean_text(ex.get("text") or ""):
+            continue
+        lines.append(json.dumps({
+            "id": uuid.uuid4().hex[:12],
+            "file_id": ex.get("file_id"),
+            "text": ex["text"],
+            "label": ex["label"],
+            "predicted": ex.get("predicted"),
+            "model_version": ex.get("model_version"),
+            "source": source,
+            "analyst": analyst,
+            "created_at": now,
+        }, ensure_ascii=False))
+
+    if lines:
+        os.makedirs(os.path.dirname(LABEL_STORE_PATH), exist_ok=True)
+        with _store_lock, open(LABEL_STORE_PATH, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+    return len(lines)
+
+
+def _read_labels(skip: int = 0):
+    try:
+        with open(LABEL_STORE_PATH, "r", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+    return rows[skip:]
+
+
+def _consumed() -> int:
+    pointer = read_model_pointer()
+    return pointer.get("labels_consumed", 0) if pointer else 0
+
+
+def pending_labels() -> int:
+    return len(_read_labels(_consumed()))
+
+
+# -------------------------------
+# 🔒 Cross-process training lock
+# -------------------------------
+class _TrainingLock:
+    """flock on LOCK_PATH where available (POSIX), always a thread lock."""
+
+    def __enter__(self):
+        _train_lock.acquire()
+        self._f = None
+        try:
+            import fcntl
+            os.makedirs(ONLINE_MODEL_DIR, exist_ok=True)
+            self._f = open(LOCK_PATH, "w")
+            fcntl.flock(self._f, fcntl.LOCK_EX)
+        except ImportError:
+            pass
+        return self
+
+    def __exit__(self, *exc):
+        if self._f is not None:
+            self._f.close()  # releases the flock
+        _train_lock.release()
+
+
+# -------------------------------
+# 🧠 Incremental update + publish
+# -------------------------------
+def _atomic_dump(obj, path: str, as_json: bool = False):
+    tmp = path + f".{os.getpid()}.tmp"
+    try:
+        if as_json:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(obj, f, indent=2)
+        else:
+            joblib.dump(obj, tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _prune_versions(keep: int, current_path: str):
+    versions = sorted(
+        (os.path.join(ONLINE_MODEL_DIR, n) for n in os.listdir(ONLINE_MODEL_DIR)
+         if n.startswith("scam_sgd_v") and n.endswith(".pkl")),
+        key=os.path.getmtime,
+    )
+    for path in versions[:-keep] if keep > 0 else []:
+        if path != current_path:
+            os.remove(path)
+
+
+def train_incremental(force: bool = False):
+    """
+    Fold labels added since the current version into a new model version.
+    The first version is fit on the cold-start TRAIN_DATA plus every stored label;
+    later versions partial_fit the previous model on the new labels only
+    (with TRAIN_DATA replayed as an anchor). Returns the new pointer, or None.
+    """
+    with _TrainingLock():
+        pointer = read_model_pointer()
+        consumed = pointer.get("labels_consumed", 0) if pointer else 0
+        new_rows = _read_labels(consumed)
+        if not new_rows or (not force and len(new_rows) < ONLINE_RETRAIN_MIN_LABELS):
+            return None
+
+        t0 = time.perf_counter()
+        model = vectorizer = None
+        if pointer:
+            try:
+                model, vectorizer = joblib.load(pointer["path"])
+            except Exception as e:
+                print(f"⚠️ Could not load {pointer.get('version')} for update, starting fresh: {e}")
+        if model is None:
+            model, vectorizer = _new_text_model()
+
+        texts = [clean_text(r["text"]) for r in new_rows] + [clean_text(t) for t, _ in TRAIN_DATA]
+        labels = [r["label"] for r in new_rows] + [y for _, y in TRAIN_DATA]
+        X = vectorizer.transform(texts)
+        y = np.array(labels)
+        rng = np.random.default_rng(len(new_rows) + consumed)
+        for _ in range(ONLINE_TRAIN_EPOCHS):
+            order = rng.permutation(len(labels))
+            model.partial_fit(X[order], y[order], classes=SCAM_TYPES)
+
+        number = (pointer.get("number", 0) if pointer else 0) + 1
+        version = f"sgd-v{number}"
+        path = os.path.join(ONLINE_MODEL_DIR, f"scam_sgd_v{number}.pkl")
+        os.makedirs(ONLINE_MODEL_DIR, exist_ok=True)
+        _atomic_dump((model, vectorizer), path)
+
+        new_pointer = {
+            "version": version,
+            "number": number,
+            "path": path,
+            "previous": pointer.get("version") if pointer else "baseline",
+            "labels_consumed": consumed + len(new_rows),
+            "labels_in_update": len(new_rows),
+            "trained_at": datetime.now(timezone.utc).isoformat(),
+        }
+        # Workers compare the pointer's stat on every classification and reload
+        _atomic_dump(new_pointer, ONLINE_MODEL_POINTER, as_json=True)
+        _prune_versions(ONLINE_KEEP_VERSIONS, path)
+
+        print(f"✅ Published scam classifier {version} "
+              f"({len(new_rows)} new labels, {time.perf_counter() - t0:.2f}s)")
+        return new_pointer
+
+
+def maybe_retrain():
+    """Background hook: train once enough feedback is pending."""
+    try:
+        train_incremental(force=False)
+    except Exception as e:
+        print(f"❌ Online retraining failed: {e}")
+
+
+def retrain_now():
+    """Background hook for admin training uploads: train on whatever is pending."""
+    try:
+        train_incremental(force=True)
+    except Exception as e:
+        print(f"❌ Online retraining failed: {e}")
+
+
+def trainer_status() -> dict:
+    pointer = read_model_pointer()
+    return {
+        "current": pointer or {"version": "baseline"},
+        "pending_labels": pending_labels(),
+        "retrain_min_labels": ONLINE_RETRAIN_MIN_LABELS,
+    }
@@ -0,0 +1,280 @@
+"""
+SatyaSetu.AI OpenPhish Feed Index
+-----------------------------------
+✅ Feed downloaded on a TTL by a background thread, not per lookup
+✅ Whole feed indexed: full-URL set, hostname set and registered-domain index
+✅ Lookups are O(1) set / dict probes, no network
+✅ Last good snapshot kept on disk (app/data/openphish) for restarts and offline operation
+✅ Feed age, size and refresh errors reported by feed_status()
+
+    openphish_feed.start()                 # app startup: load snapshot, begin refreshing
+    openphish_feed.check("paypa1-login.xyz")
+    # {"source": "openphish", "listed": True, "match": "host", "feed_age_sec": 412}
+"""
+
+import os
+import json
+import time
+import threading
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from app.pipelines import osint_http
+
+# =========================
+# ⚙️ CONFIGURATION
+# =========================
+OPENPHISH_FEED_URL = os.getenv("OPENPHISH_FEED_URL", "https://openphish.com/feed.txt")
+OPENPHISH_REFRESH_SEC = float(os.getenv("OPENPHISH_REFRESH_SEC", "1800"))
+# How long the first lookup after a cold start (no snapshot) waits for the initial download
+OPENPHISH_INITIAL_WAIT_SEC = float(os.getenv("OPENPHISH_INITIAL_WAIT_SEC", "5"))
+
+SNAPSHOT_DIR = "app/data/openphish"
+SNAPSHOT_PATH = os.path.join(SNAPSHOT_DIR, "feed.txt")
+SNAPSHOT_META_PATH = os.path.join(SNAPSHOT_DIR, "feed_meta.json")
+
+# Public suffixes with two labels, so "x.co.in" registers as "x.co.in", not "co.in"
+MULTI_LABEL_SUFFIXES = {
+    "co.in", "org.in", "net.in", "gov.in", "ac.in", "firm.in", "gen.in", "ind.in", "nic.in",
+    "co.uk", "org.uk", "ac.uk", "gov.uk", "com.au", "net.au", "org.au", "co.nz", "co.jp",
+    "co.za", "com.br", "com.cn", "com.sg", "com.my", "com.pk", "com.bd", "com.ng", "com.tr",
+}
+
+# Hosts shared by many unrelated tenants: only an exact feed URL counts as listed
+SHARED_HOSTS = {
+    "sites.google.com", "docs.google.com", "drive.google.com", "forms.gle", "storage.googleapis.com",
+    "firebasestorage.googleapis.com", "dropbox.com", "www.dropbox.com", "onedrive.live.com",
+    "1drv.ms", "bit.ly", "tinyurl.com", "t.co", "ipfs.io", "cloudflare-ipfs.com",
+}
+# Platforms that hand out subdomains: a listed tenant subdomain doesn't list the platform itself
+PLATFORM_DOMAINS = {
+    "google.com", "googleapis.com", "github.io", "blogspot.com", "000webhostapp.com", "weebly.com",
+    "wixsite.com", "firebaseapp.com", "web.app", "netlify.app", "vercel.app", "pages.dev",
+    "glitch.me", "herokuapp.com", "azurewebsites.net", "windows.net", "amazonaws.com",
+    "dropbox.com", "live.com", "ipfs.io", "r2.dev", "workers.dev", "square.site", "webflow.io",
+}
+
+
+# -------------------------------
+# 🧩 URL / Domain Normalization
+# -------------------------------
+def _hostname(domain_or_url: str) -> str:
+    value = domain_or_url.strip()
+    if "://" not in value:
+        value = "http://" + value
+    try:
+        host = urlsplit(value).hostname or ""
+    except ValueError:
+        return ""
+    return host.rstrip(".")
+
+
+def registered_domain(host: str) -> str:
+    labels = host.lower().rstrip(".").split(".")
+    if len(labels) <= 2:
+        return ".".join(labels)
+    if ".".join(labels[-2:]) in MULTI_LABEL_SUFFIXES:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def normalize_url(url: str) -> str:
+    """Case-insensitive scheme/host, no fragment, no trailing slash."""
+    value = url.strip()
+    try:
+        parts = urlsplit(value)
+    except ValueError:
+        return value
+    path = parts.path.rstrip("/")
+    query = f"?{parts.query}" if parts.query else ""
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}{path}{query}"
+
+
+class FeedIndex:
+    """Index over one feed snapshot (replaced whole on refresh, never mutated in place)."""
+
+    def __init__(self, feed_text: str, fetched_at: float, origin: str):
+        self.urls = set()
+        self.hosts = set()
+        self.domains = {}
+        for line in feed_text.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            self.urls.add(normalize_url(line))
+            host = _hostname(line).lower()
+            if host:
+                self.hosts.add(host)
+                reg = registered_domain(host)
+                self.domains[reg] = self.domains.get(reg, 0) + 1
+        self.fetched_at = fetched_at
+        self.origin = origin
+
+    def lookup(self, domain_or_url: str):
+        """(listed, match) — match is "url", "host", "domain" or None."""
+        value = domain_or_url.strip()
+        if "://" in value and normalize_url(value) in self.urls:
+            return True, "url"
+        host = _hostname(value).lower()
+        if not host or host in SHARED_HOSTS:
+            return False, None
+        if host in self.hosts:
+            return True, "host"
+        if "://" not in value:
+            # A bare registered domain is listed if any feed URL sits under it
+            # (login.evil.xyz → evil.xyz), unless it is a hosting platform.
+            reg = registered_domain(host)
+            if reg == host and reg in self.domains and reg not in PLATFORM_DOMAINS:
+                return True, "domain"
+        return False, None
+
+
+# -------------------------------
+# 🔄 Feed Manager
+# -------------------------------
+class OpenPhishFeed:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._index = None
+        self._thread = None
+        self._etag = None
+        self._last_modified = None
+        self.refreshes = 0
+        self.not_modified = 0
+        self.last_error = None
+        self.last_attempt = None
+        self.lookups = 0
+
+    # ----- snapshot -----
+    def _load_snapshot(self):
+        if not os.path.exists(SNAPSHOT_PATH):
+            return
+        try:
+            meta = {}
+            if os.path.exists(SNAPSHOT_META_PATH):
+                with open(SNAPSHOT_META_PATH, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+            with open(SNAPSHOT_PATH, "r", encoding="utf-8") as f:
+                text = f.read()
+            fetched_at = meta.get("fetched_at", os.path.getmtime(SNAPSHOT_PATH))
+            self._etag, self._last_modified = meta.get("etag"), meta.get("last_modified")
+            self._index = FeedIndex(text, fetched_at, "snapshot")
+            self._ready.set()
+            print(f"📂 OpenPhish snapshot loaded: {len(self._index.urls)} URLs, "
+                  f"{int(time.time() - fetched_at)}s old")
+        except Exception as e:
+            print(f"⚠️ OpenPhish snapshot unreadable: {e}")
+
+    def _save_snapshot(self, text: str, fetched_at: float):
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        for path, body in (
+            (SNAPSHOT_PATH, text),
+            (SNAPSHOT_META_PATH, json.dumps({
+                "fetched_at": fetched_at, "etag": self._etag,
+                "last_modified": self._last_modified, "url": OPENPHISH_FEED_URL,
+            })),
+        ):
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(body)
+            os.replace(tmp, path)
+
+    # ----- refresh -----
+    def refresh(self) -> bool:
+        """Download the feed (conditional GET) and swap in a new index. False on failure."""
+        self.last_attempt = time.time()
+        headers = {}
+        if self._index is not None:
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+            if self._last_modified:
+                headers["If-Modified-Since"] = self._last_modified
+        try:
+            r = osint_http.get("openphish", OPENPHISH_FEED_URL, headers=headers)
+            if r.status_code == 304 and self._index is not None:
+                self.not_modified += 1
+                self._index.fetched_at = time.time()  # same content, fresh again
+                self.last_error = None
+                return True
+            if r.status_code != 200:
+                raise RuntimeError(f"status_{r.status_code}")
+            if not r.text.strip():
+                raise RuntimeError("empty feed")
+            fetched_at = time.time()
+            index = FeedIndex(r.text, fetched_at, "network")
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"⚠️ OpenPhish refresh failed (keeping last good snapshot): {e}")
+            return False
+
+        self._etag, self._last_modified = r.headers.get("ETag"), r.headers.get("Last-Modified")
+        self._index = index  # readers see either the old or the new index, never a partial one
+        self.refreshes += 1
+        self.last_error = None
+        self._ready.set()
+        try:
+            self._save_snapshot(r.text, fetched_at)
+        except Exception as e:
+            print(f"⚠️ OpenPhish snapshot not saved: {e}")
+        return True
+
+    def _run(self):
+        while True:
+            index = self._index
+            age = time.time() - index.fetched_at if index else None
+            if age is None or age >= OPENPHISH_REFRESH_SEC:
+                ok = self.refresh()
+                # Retry failures sooner than a full TTL, but don't hammer the feed
+                time.sleep(OPENPHISH_REFRESH_SEC if ok else min(300, OPENPHISH_REFRESH_SEC))
+            else:
+                time.sleep(OPENPHISH_REFRESH_SEC - age)
+
+    def start(self):
+        """Load the last snapshot and start the background refresher (idempotent)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._load_snapshot()
+            self._thread = threading.Thread(target=self._run, name="openphish-feed", daemon=True)
+            self._thread.start()
+
+    # ----- lookups -----
+    def check(self, domain_or_url: str) -> dict:
+        if self._thread is None:
+            self.start()
+        if self._index is None:
+            self._ready.wait(OPENPHISH_INITIAL_WAIT_SEC)
+        index = self._index
+        self.lookups += 1
+        if index is None:
+            return {"source": "openphish", "used_fallback": True,
+                    "error": self.last_error or "feed_unavailable"}
+        listed, match = index.lookup(domain_or_url or "")
+        return {"source": "openphish", "listed": listed, "match": match,
+                "feed_age_sec": int(time.time() - index.fetched_at)}
+
+    def status(self) -> dict:
+        index = self._index
+        return {
+            "feed_url": OPENPHISH_FEED_URL,
+            "refresh_sec": OPENPHISH_REFRESH_SEC,
+            "loaded": index is not None,
+            "origin": index.origin if index else None,
+            "fetched_at": datetime.fromtimestamp(index.fetched_at, timezone.utc).isoformat() if index else None,
+            "age_sec": int(time.time() - index.fetched_at) if index else None,
+            "urls": len(index.urls) if index else 0,
+            "hosts": len(index.hosts) if index else 0,
+            "registered_domains": len(index.domains) if index else 0,
+            "refreshes": self.refreshes,
+            "not_modified": self.not_modified,
+            "lookups": self.lookups,
+            "last_error": self.last_error,
+        }
+
+
+openphish_feed = OpenPhishFeed()
+
+
+def feed_status() -> dict:
+    return openphish_feed.status()
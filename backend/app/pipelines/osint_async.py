@@ -0,0 +1,252 @@
+"""
+SatyaSetu.AI Concurrent OSINT Fan-out
+-----------------------------------
+✅ All sources for all entities (or scanned links) of a case queried concurrently (aiohttp)
+✅ Per-provider concurrency limits (VirusTotal / WHOIS / AbuseIPDB), shared by every request
+✅ One overall deadline per fan-out; sources that miss it come back as fallbacks (partial results)
+✅ Identical (source, value) lookups are made once, within a fan-out and across concurrent fan-outs
+✅ Provider quotas enforced per lane (osint_ratelimit); the caller's lane is carried onto the loop
+✅ One keep-alive session per provider, with its pool size, timeouts and retries (osint_http)
+✅ Same request builders, parsers, disk cache and score fusion as osint_engine
+
+    osint_hits = enrich_entities_osint(all_entities)    # one record per entity, in order
+    results = lookup_many([("vt_domain", "example.com"), ("whois", "example.com")])
+"""
+
+import os
+import time
+import atexit
+import asyncio
+import threading
+import aiohttp
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from app.pipelines.osint_engine import (
+    SOURCES,
+    cached_or_precheck,
+    entity_lookup_plan,
+    failure_result,
+    fuse_entity_osint,
+    parse_and_cache,
+    rate_limited_result,
+    record_failure,
+)
+from app.pipelines.osint_http import get_json_async, http_stats, new_async_session
+from app.pipelines.osint_ratelimit import BATCH, INTERACTIVE, current_lane, limiter
+from app.pipelines.single_flight import AsyncSingleFlight, flight_stats
+
+# =========================
+# ⚙️ CONFIGURATION
+# =========================
+# Wall-clock budget for one fan-out (all lookups of one case)
+OSINT_DEADLINE_SEC = float(os.getenv("OSINT_DEADLINE_SEC", "20"))
+
+# Simultaneous in-flight requests per provider (OSINT_CONCURRENCY_VIRUSTOTAL=2, ...)
+DEFAULT_PROVIDER_CONCURRENCY = {"virustotal": 4, "whois": 4, "abuseipdb": 4}
+PROVIDER_CONCURRENCY = {
+    provider: max(1, int(os.getenv(f"OSINT_CONCURRENCY_{provider.upper()}", str(limit))))
+    for provider, limit in DEFAULT_PROVIDER_CONCURRENCY.items()
+}
+
+
+class _FanOutStats:
+    """Per-provider request counters and fan-out wall times."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.providers = defaultdict(lambda: {"requests": 0, "errors": 0, "deadline_exceeded": 0, "latency_sec": 0.0})
+        self.fan_outs = 0
+        self.lookups = 0
+        self.served_locally = 0
+        self.wall_sec = 0.0
+
+    def request(self, provider: str, latency: float, failed: bool):
+        with self._lock:
+            p = self.providers[provider]
+            p["requests"] += 1
+            p["errors"] += int(failed)
+            p["latency_sec"] += latency
+
+    def deadline(self, provider: str):
+        with self._lock:
+            self.providers[provider]["deadline_exceeded"] += 1
+
+    def fan_out(self, lookups: int, local: int, wall: float):
+        with self._lock:
+            self.fan_outs += 1
+            self.lookups += lookups
+            self.served_locally += local
+            self.wall_sec += wall
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            providers = {
+                name: {
+                    **{k: v for k, v in p.items() if k != "latency_sec"},
+                    "mean_latency_ms": round(1000 * p["latency_sec"] / p["requests"], 1) if p["requests"] else None,
+                    "concurrency_limit": PROVIDER_CONCURRENCY.get(name),
+                }
+                for name, p in self.providers.items()
+            }
+            return {
+                "deadline_sec": OSINT_DEADLINE_SEC,
+                "fan_outs": self.fan_outs,
+                "lookups": self.lookups,
+                "served_locally": self.served_locally,
+                "mean_fan_out_ms": round(1000 * self.wall_sec / self.fan_outs, 1) if self.fan_outs else None,
+                "providers": providers,
+            }
+
+
+class _OsintLoop:
+    """
+    One background event loop for all OSINT I/O. Endpoint threads submit
+    fan-outs to it, so the per-provider semaphores and keep-alive HTTP sessions
+    are shared across concurrent requests instead of being per-call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._sessions = {}
+        self._semaphores = {}
+        self._flights = AsyncSingleFlight()
+        self.stats = _FanOutStats()
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="osint-fanout", daemon=True).start()
+            return self._loop
+
+    def run(self, coro, timeout: float):
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result(timeout)
+
+    def close(self):
+        for session in list(self._sessions.values()):
+            if self._loop is not None and not session.closed:
+                try:
+                    self.run(session.close(), timeout=5)
+                except Exception:
+                    pass
+
+    # Only touched from the loop thread
+    def _get_session(self, provider: str) -> aiohttp.ClientSession:
+        session = self._sessions.get(provider)
+        if session is None or session.closed:
+            session = self._sessions[provider] = new_async_session(provider)
+        return session
+
+    def _semaphore(self, provider: str) -> asyncio.Semaphore:
+        if provider not in self._semaphores:
+            self._semaphores[provider] = asyncio.Semaphore(PROVIDER_CONCURRENCY.get(provider, 1))
+        return self._semaphores[provider]
+
+    async def _fetch(self, name: str, value: str, lane: str, deadline_at: float):
+        spec = SOURCES[name]
+        # Quota first: interactive waits up to the fan-out deadline, batch degrades sooner
+        denied = await limiter.acquire_async(spec["provider"], lane, timeout=max(0.0, deadline_at - time.perf_counter()))
+        if denied:
+            return rate_limited_result(name, denied, lane)
+        url, headers, params = spec["request"](value)
+        async with self._semaphore(spec["provider"]):
+            t0 = time.perf_counter()
+            try:
+                status, data = await get_json_async(self._get_session(spec["provider"]), spec["provider"], url,
+                                                    headers=headers, params=params, lane=lane)
+                if status != 200:
+                    self.stats.request(spec["provider"], time.perf_counter() - t0, True)
+                    return record_failure(name, value, {"error": f"status_{status}"})
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats.request(spec["provider"], time.perf_counter() - t0, True)
+                return record_failure(name, value, {"error": str(e) or type(e).__name__})
+            self.stats.request(spec["provider"], time.perf_counter() - t0, False)
+        return parse_and_cache(name, value, data)
+
+    async def _get(self, key: tuple, lane: str, deadline_at: float):
+        # Another request's fan-out may already be fetching a key: wait for its result
+        out = await self._flights.do(key[0], key, lambda: self._fetch(*key, lane, deadline_at))
+        if lane == INTERACTIVE and isinstance(out, dict) and out.get("lane") == BATCH:
+            out = await self._fetch(*key, lane, deadline_at)  # joined a degraded batch lookup
+        return out
+
+    async def fan_out(self, keys: List[tuple], deadline: float, lane: str = INTERACTIVE) -> Dict[tuple, Any]:
+        deadline_at = time.perf_counter() + deadline
+        tasks = {key: asyncio.ensure_future(self._get(key, lane, deadline_at)) for key in keys}
+        _, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+        for task in pending:
+            task.cancel()
+
+        results = {}
+        for key, task in tasks.items():
+            if task in pending:
+                self.stats.deadline(SOURCES[key[0]]["provider"])
+                results[key] = failure_result(key[0], {"error": "deadline_exceeded"})
+            elif task.exception() is not None:
+                results[key] = task.exception()  # parse error; the entity records it
+            else:
+                results[key] = task.result()
+        return results
+
+
+_runner = _OsintLoop()
+atexit.register(_runner.close)
+
+
+# -------------------------------
+# 🌐 Public API
+# -------------------------------
+def lookup_many(keys: List[tuple], deadline: float = None) -> Dict[tuple, Any]:
+    """
+    Results for (source name, value) lookups. Cached answers and no-API-key
+    fallbacks are served locally; the rest are requested concurrently within
+    `deadline` seconds. A result is an Exception if its response could not be parsed.
+    """
+    deadline = OSINT_DEADLINE_SEC if deadline is None else deadline
+    t0 = time.perf_counter()
+    results, remote = {}, []
+    for key in dict.fromkeys(keys):
+        early = cached_or_precheck(*key)
+        if early:
+            results[key] = early
+        else:
+            remote.append(key)
+
+    if remote:
+        try:
+            # The lane is read here: contextvars don't follow the coroutine onto the OSINT loop thread
+            results.update(_runner.run(_runner.fan_out(remote, deadline, current_lane()), timeout=deadline + 5))
+        except Exception as e:
+            print(f"⚠️ OSINT fan-out failed: {e}")
+            for key in remote:
+                results.setdefault(key, failure_result(key[0], {"error": str(e) or type(e).__name__}))
+
+    _runner.stats.fan_out(len(results), len(results) - len(remote), time.perf_counter() - t0)
+    return results
+
+
+def source_error(sources) -> str:
+    """First parse error among one entity's / link's source results, if any."""
+    return next((str(s) for s in sources if isinstance(s, Exception)), None)
+
+
+def enrich_entities_osint(entities: List[Dict[str, Any]], deadline: float = None) -> List[Dict[str, Any]]:
+    """enrich_entity_osint for every entity of a case, with all lookups in one concurrent fan-out."""
+    plans = [entity_lookup_plan(e) for e in entities]
+    results = lookup_many([key for _, _, plan in plans for key in plan], deadline)
+
+    osint_hits = []
+    for entity, (kind, domain, plan) in zip(entities, plans):
+        sources = [results[key] for key in plan]
+        error = source_error(sources)
+        osint_hits.append(fuse_entity_osint(entity, kind, domain, [] if error else sources, error=error))
+    return osint_hits
+
+
+def fanout_stats() -> Dict[str, Any]:
+    return {**_runner.stats.snapshot(), "single_flight": flight_stats.snapshot(), "rate_limits": limiter.status(),
+            "http": http_stats.snapshot()}
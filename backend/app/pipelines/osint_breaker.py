@@ -0,0 +1,123 @@
+"""
+SatyaSetu.AI OSINT Circuit Breakers
+-----------------------------------
+✅ One breaker per provider (VirusTotal domain + URL lookups share one)
+✅ Opens after N consecutive provider failures (timeouts, 5xx, 429, auth errors)
+✅ While open, lookups answer `used_fallback` immediately instead of waiting out a timeout
+✅ Half-opens after a cooldown: one trial request decides between closed and open again
+✅ State, failure counts and trips reported by breaker_status()
+"""
+
+import os
+import time
+import threading
+from typing import Any, Dict
+
+# =========================
+# ⚙️ CONFIGURATION
+# =========================
+OSINT_BREAKER_FAILURES = int(os.getenv("OSINT_BREAKER_FAILURES", "5"))
+OSINT_BREAKER_COOLDOWN_SEC = float(os.getenv("OSINT_BREAKER_COOLDOWN_SEC", "60"))
+# How long a failed answer (error status, timeout) is cached for its key
+OSINT_NEGATIVE_TTL_SEC = float(os.getenv("OSINT_NEGATIVE_TTL_SEC", "300"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+def is_provider_failure(error: str) -> bool:
+    """
+    Whether an error says the provider is unhealthy (counts toward opening its breaker).
+    A 4xx about the lookup itself (e.g. 404 unknown domain) does not; auth errors,
+    rate limiting, 5xx and transport errors do.
+    """
+    if error.startswith("status_"):
+        try:
+            code = int(error[len("status_"):])
+        except ValueError:
+            return True
+        return code in (401, 403, 429) or code >= 500
+    return True
+
+
+class CircuitBreaker:
+    def __init__(self, provider: str, failures: int = OSINT_BREAKER_FAILURES,
+                 cooldown_sec: float = OSINT_BREAKER_COOLDOWN_SEC):
+        self.provider = provider
+        self.threshold = failures
+        self.cooldown_sec = cooldown_sec
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_started_at = None
+        self.trips = 0
+        self.short_circuited = 0
+        self.last_error = None
+
+    def allow(self) -> bool:
+        """Whether a request may go out now. In half-open state only one trial at a time."""
+        now = time.time()
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and now - self.opened_at >= self.cooldown_sec:
+                self.state, self.trial_started_at = HALF_OPEN, now
+                return True
+            # A trial that never reported back (cancelled by a deadline) is retried after a cooldown
+            if self.state == HALF_OPEN and now - self.trial_started_at >= self.cooldown_sec:
+                self.trial_started_at = now
+                return True
+            self.short_circuited += 1
+            return False
+
+    def success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                print(f"✅ OSINT breaker for {self.provider} closed")
+            self.state, self.consecutive_failures, self.opened_at = CLOSED, 0, None
+
+    def failure(self, error: str):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_error = error
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.consecutive_failures >= self.threshold):
+                self.state, self.opened_at = OPEN, time.time()
+                self.trips += 1
+                print(f"⚠️ OSINT breaker for {self.provider} opened after "
+                      f"{self.consecutive_failures} failures ({error})")
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0.0, round(self.opened_at + self.cooldown_sec - time.time(), 1))
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "failure_threshold": self.threshold,
+                "cooldown_sec": self.cooldown_sec,
+                "retry_in_sec": retry_in,
+                "trips": self.trips,
+                "short_circuited": self.short_circuited,
+                "last_error": self.last_error,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(provider: str) -> CircuitBreaker:
+    with _breakers_lock:
+        if provider not in _breakers:
+            _breakers[provider] = CircuitBreaker(provider)
+        return _breakers[provider]
+
+
+def breaker_status() -> Dict[str, Any]:
+    with _breakers_lock:
+        providers = list(_breakers.items())
+    return {
+        "negative_ttl_sec": OSINT_NEGATIVE_TTL_SEC,
+        "providers": {name: b.status() for name, b in providers},
+    }
@@ -0,0 +1,308 @@
+"""
+SatyaSetu.AI OSINT Cache
+-----------------------------------
+✅ Two tiers: in-process LRU in front of one SQLite file (WAL mode, shared by all workers)
+✅ Per-source TTLs (WHOIS changes rarely, abuse scores often)
+✅ Total size cap on disk; expired entries first, then least recently used, are evicted
+✅ Background sweep deletes expired entries and enforces the cap
+✅ Per-source hit (memory / disk / cached failure), miss, write and lookup-latency counters
+✅ Removes the pre-SQLite JSON cache directory (app/data/osint_cache) on first import
+
+    osint_cache.get("whois", "whois_example.com")       # dict or None
+    osint_cache.set("whois", "whois_example.com", {...})
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Optional
+
+# =========================
+# ⚙️ CONFIGURATION
+# =========================
+OSINT_CACHE_PATH = os.getenv("OSINT_CACHE_PATH", "app/data/osint_cache.sqlite3")
+OSINT_CACHE_MAX_MB = float(os.getenv("OSINT_CACHE_MAX_MB", "64"))
+OSINT_CACHE_LRU_ENTRIES = int(os.getenv("OSINT_CACHE_LRU_ENTRIES", "4096"))
+OSINT_CACHE_SWEEP_SEC = float(os.getenv("OSINT_CACHE_SWEEP_SEC", "300"))
+
+# Hours a successful answer stays fresh, per source (OSINT_TTL_WHOIS_HOURS=72, ...)
+DEFAULT_TTL_HOURS = {"vt_domain": 24, "vt_url": 24, "abuseipdb": 6, "whois": 168}
+SOURCE_TTL_HOURS = {
+    source: float(os.getenv(f"OSINT_TTL_{source.upper()}_HOURS", str(hours)))
+    for source, hours in DEFAULT_TTL_HOURS.items()
+}
+
+# Pre-SQLite cache: one JSON file per lookup, named by the SHA-1 of its key. The keys can't be
+# recovered from the names, so the entries can't be imported into SQLite; they are deleted.
+LEGACY_CACHE_DIR = "app/data/osint_cache"
+_LEGACY_FILE_RE = re.compile(r"^[0-9a-f]{40}\.json$")
+
+# Refresh a disk row's last-access time at most this often (keeps hits read-only)
+_TOUCH_INTERVAL_SEC = 300
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS osint_cache (
+    key TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_osint_cache_expires ON osint_cache (expires_at);
+CREATE INDEX IF NOT EXISTS idx_osint_cache_accessed ON osint_cache (accessed_at);
+"""
+
+
+def open_wal_connection(path: str) -> sqlite3.Connection:
+    """Autocommit SQLite connection in WAL mode (many readers alongside one writer, across processes)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class OsintCache:
+    def __init__(self, path: str = OSINT_CACHE_PATH, max_mb: float = OSINT_CACHE_MAX_MB,
+                 lru_entries: int = OSINT_CACHE_LRU_ENTRIES):
+        self.path = path
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.lru_entries = lru_entries
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # key -> (value, expires_at, accessed_at on disk)
+        self._lru: "OrderedDict[str, tuple]" = OrderedDict()
+        self._approx_bytes = None
+        self._sweeper_pid = None
+        self.counters = defaultdict(lambda: {
+            "memory_hits": 0, "disk_hits": 0, "negative_hits": 0, "misses": 0, "writes": 0,
+            "lookup_sec": 0.0, "lookups": 0,
+        })
+        self.evicted = 0
+        self.expired_deleted = 0
+        self.sweeps = 0
+
+    # -------------------------------
+    # 🗄️ SQLite
+    # -------------------------------
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread, reopened after fork (preload-and-fork workers)
+        conn, pid = getattr(self._local, "conn", None), getattr(self._local, "pid", None)
+        if conn is None or pid != os.getpid():
+            conn = open_wal_connection(self.path)
+            conn.executescript(_SCHEMA)
+            self._local.conn, self._local.pid = conn, os.getpid()
+            self._start_sweeper()
+        return conn
+
+    def _start_sweeper(self):
+        with self._lock:
+            if self._sweeper_pid == os.getpid() or OSINT_CACHE_SWEEP_SEC <= 0:
+                return
+            self._sweeper_pid = os.getpid()
+        threading.Thread(target=self._sweep_loop, name="osint-cache-sweep", daemon=True).start()
+
+    # -------------------------------
+    # 🔍 Lookups
+    # -------------------------------
+    def _remember(self, key: str, value: dict, expires_at: float, accessed_at: float):
+        with self._lock:
+            self._lru[key] = (value, expires_at, accessed_at)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.lru_entries:
+                self._lru.popitem(last=False)
+
+    def get(self, source: str, key: str) -> Optional[Dict[str, Any]]:
+        t0 = time.perf_counter()
+        now = time.time()
+        tier = "misses"
+        value = None
+
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._lru.move_to_end(key)
+                    value, tier = entry[0], "memory_hits"
+                else:
+                    del self._lru[key]
+
+        if value is None:
+            try:
+                conn = self._conn()
+                row = conn.execute(
+                    "SELECT value, expires_at, accessed_at FROM osint_cache WHERE key = ? AND expires_at > ?",
+                    (key, now),
+                ).fetchone()
+                if row is not None:
+                    value, tier = json.loads(row[0]), "disk_hits"
+                    accessed_at = row[2]
+                    if now - accessed_at > _TOUCH_INTERVAL_SEC:
+                        conn.execute("UPDATE osint_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                        accessed_at = now
+                    self._remember(key, value, row[1], accessed_at)
+            except Exception as e:
+                print(f"⚠️ OSINT cache read failed: {e}")
+        elif now - entry[2] > _TOUCH_INTERVAL_SEC:
+            # Memory hits keep the disk row from looking idle to LRU eviction
+            try:
+                self._conn().execute("UPDATE osint_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                self._remember(key, value, entry[1], now)
+            except Exception:
+                pass
+
+        with self._lock:
+            c = self.counters[source]
+            c[tier] += 1
+            if value is not None and value.get("used_fallback"):
+                c["negative_hits"] += 1  # a cached failure (see osint_engine.record_failure)
+            c["lookups"] += 1
+            c["lookup_sec"] += time.perf_counter() - t0
+        return dict(value) if value is not None else None
+
+    def set(self, source: str, key: str, value: Dict[str, Any], ttl_sec: float = None):
+        ttl_sec = SOURCE_TTL_HOURS.get(source, 24) * 3600 if ttl_sec is None else ttl_sec
+        now = time.time()
+        expires_at = now + ttl_sec
+        body = json.dumps(value, ensure_ascii=False)
+        self._remember(key, dict(value), expires_at, now)
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO osint_cache (key, source, value, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, source, body, len(body) + len(key), expires_at, now),
+            )
+        except Exception as e:
+            print(f"⚠️ OSINT cache write failed: {e}")
+            return
+        with self._lock:
+            self.counters[source]["writes"] += 1
+            over = self._approx_bytes is not None and self._approx_bytes + len(body) > self.max_bytes
+            if self._approx_bytes is not None:
+                self._approx_bytes += len(body) + len(key)
+        if over or self._approx_bytes is None:
+            try:
+                self.enforce_cap()
+            except Exception as e:
+                print(f"⚠️ OSINT cache eviction failed: {e}")
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._lru.pop(key, None)
+        try:
+            self._conn().execute("DELETE FROM osint_cache WHERE key = ?", (key,))
+        except Exception as e:
+            print(f"⚠️ OSINT cache delete failed: {e}")
+
+    # -------------------------------
+    # 🧹 Expiry & Eviction
+    # -------------------------------
+    def delete_expired(self) -> int:
+        deleted = self._conn().execute("DELETE FROM osint_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+        self.expired_deleted += max(0, deleted)
+        return deleted
+
+    def enforce_cap(self) -> int:
+        """Delete expired rows, then least recently used rows until the store is under 90% of the cap."""
+        conn = self._conn()
+        self.delete_expired()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM osint_cache").fetchone()[0]
+        evicted = 0
+        if total > self.max_bytes:
+            target = int(self.max_bytes * 0.9)
+            cutoff_rows = conn.execute(
+                "SELECT key, size FROM osint_cache ORDER BY accessed_at ASC"
+            ).fetchall()
+            doomed = []
+            for key, size in cutoff_rows:
+                if total <= target:
+                    break
+                doomed.append((key,))
+                total -= size
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany("DELETE FROM osint_cache WHERE key = ?", doomed)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            with self._lock:
+                for (key,) in doomed:
+                    self._lru.pop(key, None)
+            evicted = len(doomed)
+            self.evicted += evicted
+        with self._lock:
+            self._approx_bytes = total
+        return evicted
+
+    def _sweep_loop(self):
+        while True:
+            time.sleep(OSINT_CACHE_SWEEP_SEC)
+            try:
+                self.enforce_cap()
+                self.sweeps += 1
+            except Exception as e:
+                print(f"⚠️ OSINT cache sweep failed: {e}")
+
+    # -------------------------------
+    # 📈 Stats
+    # -------------------------------
+    def stats(self) -> Dict[str, Any]:
+        try:
+            rows, size = self._conn().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM osint_cache"
+            ).fetchone()
+        except Exception:
+            rows, size = None, None
+        with self._lock:
+            sources = {}
+            for source, c in self.counters.items():
+                hits = c["memory_hits"] + c["disk_hits"]
+                sources[source] = {
+                    **{k: v for k, v in c.items() if k not in ("lookup_sec", "lookups")},
+                    "hit_rate": round(hits / c["lookups"], 3) if c["lookups"] else None,
+                    "mean_lookup_ms": round(1000 * c["lookup_sec"] / c["lookups"], 3) if c["lookups"] else None,
+                    "ttl_hours": SOURCE_TTL_HOURS.get(source),
+                }
+            return {
+                "path": self.path,
+                "disk_entries": rows,
+                "stored_mb": round(size / 1024 / 1024, 2) if size is not None else None,
+                "max_mb": round(self.max_bytes / 1024 / 1024, 2),
+                "memory_entries": len(self._lru),
+                "memory_max_entries": self.lru_entries,
+                "evicted": self.evicted,
+                "expired_deleted": self.expired_deleted,
+                "sweeps": self.sweeps,
+                "sources": sources,
+            }
+
+
+def remove_legacy_cache(path: str = LEGACY_CACHE_DIR) -> int:
+    """Delete the old JSON cache files (and the directory once empty). Returns files removed."""
+    if not os.path.isdir(path):
+        return 0
+    removed = 0
+    for name in os.listdir(path):
+        if _LEGACY_FILE_RE.match(name):
+            try:
+                os.remove(os.path.join(path, name))
+                removed += 1
+            except OSError:
+                pass  # another worker got there first
+    try:
+        os.rmdir(path)
+    except OSError:
+        pass  # not empty (foreign files) or already gone
+    if removed:
+        print(f"♻️ Removed {removed} legacy OSINT cache files from {path}")
+    return removed
+
+
+remove_legacy_cache()
+osint_cache = OsintCache()
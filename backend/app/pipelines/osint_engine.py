@@ -1,18 +1,22 @@
-import os, json, re, time, hashlib, requests
+import os, re
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv
 from datetime import datetime
 
+from app.pipelines.openphish_feed import openphish_feed
+from app.pipelines.osint_http import get_json
+from app.pipelines.osint_cache import osint_cache
+from app.pipelines.osint_breaker import OSINT_NEGATIVE_TTL_SEC, breaker_for, is_provider_failure
+from app.pipelines.single_flight import SingleFlight
+from app.pipelines.osint_ratelimit import BATCH, INTERACTIVE, current_lane, limiter
+
 # 🔐 Load API keys
 load_dotenv()
 VT_API_KEY = os.getenv("VT_API_KEY", "")
 ABUSEIPDB_KEY = os.getenv("ABUSEIPDB_KEY", "")
 WHOIS_KEY = os.getenv("WHOIS_KEY", "")
 
-# 📂 Fallbacks and cache
-FALLBACK_DIR = "app/pipelines/fallback_osint"
-CACHE_DIR = "app/data/osint_cache"
-os.makedirs(CACHE_DIR, exist_ok=True)
+# 📂 Answers are cached in osint_cache (memory LRU + SQLite)
 
 EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@([A-Za-z0-9.-]+\.[A-Za-z]{2,})")
 URL_RE   = re.compile(r"https?://([A-Za-z0-9.-]+\.[A-Za-z]{2,})(?:[^\s]*)")
@@ -21,40 +25,9 @@ IP_RE    = re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}\b")
 # ------------------------------------------------------------
 # ⚙️ Utility Helpers
 # ------------------------------------------------------------
-def _read_json(path: str):
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
-
-def _cache_path(key: str) -> str:
-    return os.path.join(CACHE_DIR, f"{hashlib.sha1(key.encode()).hexdigest()}.json")
-
-def _from_cache(key: str, ttl_hours=24):
-    path = _cache_path(key)
-    if not os.path.exists(path):
-        return None
-    age = time.time() - os.path.getmtime(path)
-    if age > ttl_hours * 3600:
-        return None
-    return _read_json(path)
-
-def _save_cache(key: str, data: dict):
-    try:
-        with open(_cache_path(key), "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
-    except Exception:
-        pass
-
-def _safe_get_json(url: str, headers=None, params=None, timeout=10):
-    try:
-        r = requests.get(url, headers=headers, params=params, timeout=timeout)
-        if r.status_code == 200:
-            return r.json(), False
-        return {"error": f"status_{r.status_code}"}, True
-    except Exception as e:
-        return {"error": str(e)}, True
+def _safe_get_json(provider: str, url: str, headers=None, params=None, lane: str = None):
+    # Pooled keep-alive session per provider, with its timeouts and retries (osint_http)
+    return get_json(provider, url, headers=headers, params=params, lane=lane)
 
 def _risk_label(score: int) -> str:
     if score >= 70: return "High"
@@ -64,139 +37,203 @@ def _risk_label(score: int) -> str:
 # ------------------------------------------------------------
 # 🌐 External Sources (VirusTotal, AbuseIPDB, Whois, OpenPhish)
 # ------------------------------------------------------------
-def vt_domain_report(domain: str):
-    key = f"vt_domain_{domain}"
-    cached = _from_cache(key)
-    if cached: return cached
-
-    if not VT_API_KEY:
-        return {"source": "virustotal", "used_fallback": True, "note": "no_api_key"}
+# Each remote source is a request builder + response parser, shared by the
+# blocking lookups below and the concurrent fan-out in osint_async. OpenPhish
+# is answered from the locally indexed feed (openphish_feed).
+VT_BASE = "https://www.virustotal.com/api/v3"
+ABUSEIPDB_URL = "https://api.abuseipdb.com/api/v2/check"
+WHOIS_URL = "https://www.whoisxmlapi.com/whoisserver/WhoisService"
 
-    url = f"https://www.virustotal.com/api/v3/domains/{domain}"
-    headers = {"x-apikey": VT_API_KEY}
-    data, failed = _safe_get_json(url, headers=headers)
-    if failed:
-        return {"source": "virustotal", "used_fallback": True, **data}
+def _vt_domain_request(domain: str):
+    return f"{VT_BASE}/domains/{domain}", {"x-apikey": VT_API_KEY}, None
 
+def _vt_domain_parse(data, domain: str):
     stats = data.get("data", {}).get("attributes", {}).get("last_analysis_stats", {})
     positives = stats.get("malicious", 0) + stats.get("suspicious", 0)
     score = min(100, positives * 20)
-    out = {"source": "virustotal", "positives": positives, "score": score, "risk": _risk_label(score)}
-    _save_cache(key, out)
-    return out
-
-def vt_url_report(url_str: str):
-    key = f"vt_url_{url_str}"
-    cached = _from_cache(key)
-    if cached: return cached
-
-    if not VT_API_KEY:
-        return {"source": "virustotal_url", "used_fallback": True, "note": "no_api_key"}
+    return {"source": "virustotal", "positives": positives, "score": score, "risk": _risk_label(score)}
 
-    search_url = "https://www.virustotal.com/api/v3/search"
-    data, failed = _safe_get_json(search_url, headers={"x-apikey": VT_API_KEY}, params={"query": url_str})
-    if failed:
-        return {"source": "virustotal_url", "used_fallback": True, **data}
+def _vt_url_request(url_str: str):
+    return f"{VT_BASE}/search", {"x-apikey": VT_API_KEY}, {"query": url_str}
 
+def _vt_url_parse(data, url_str: str):
     positives = 0
     for item in data.get("data", []):
         stats = item.get("attributes", {}).get("last_analysis_stats", {})
         positives = max(positives, stats.get("malicious", 0) + stats.get("suspicious", 0))
     score = min(100, positives * 20)
-    out = {"source": "virustotal_url", "positives": positives, "score": score, "risk": _risk_label(score)}
-    _save_cache(key, out)
-    return out
-
-def abuseipdb_report(ip: str):
-    key = f"abuseip_{ip}"
-    cached = _from_cache(key)
-    if cached: return cached
+    return {"source": "virustotal_url", "positives": positives, "score": score, "risk": _risk_label(score)}
 
-    if not ABUSEIPDB_KEY:
-        return {"source": "abuseipdb", "used_fallback": True, "note": "no_api_key"}
-
-    url = "https://api.abuseipdb.com/api/v2/check"
+def _abuseipdb_request(ip: str):
     headers = {"Key": ABUSEIPDB_KEY, "Accept": "application/json"}
-    data, failed = _safe_get_json(url, headers=headers, params={"ipAddress": ip, "maxAgeInDays": "180"})
-    if failed:
-        return {"source": "abuseipdb", "used_fallback": True, **data}
+    return ABUSEIPDB_URL, headers, {"ipAddress": ip, "maxAgeInDays": "180"}
 
+def _abuseipdb_parse(data, ip: str):
     score = int(data.get("data", {}).get("abuseConfidenceScore", 0))
-    out = {"source": "abuseipdb", "score": score, "risk": _risk_label(score)}
-    _save_cache(key, out)
-    return out
-
-def whois_domain(domain: str):
-    key = f"whois_{domain}"
-    cached = _from_cache(key)
-    if cached: return cached
+    return {"source": "abuseipdb", "score": score, "risk": _risk_label(score)}
 
-    if not WHOIS_KEY:
-        return {"source": "whois", "used_fallback": True, "note": "no_api_key"}
-
-    url = "https://www.whoisxmlapi.com/whoisserver/WhoisService"
-    params = {"apiKey": WHOIS_KEY, "domainName": domain, "outputFormat": "JSON"}
-    data, failed = _safe_get_json(url, params=params)
-    if failed:
-        return {"source": "whois", "used_fallback": True, **data}
+def _whois_request(domain: str):
+    return WHOIS_URL, None, {"apiKey": WHOIS_KEY, "domainName": domain, "outputFormat": "JSON"}
 
+def _whois_parse(data, domain: str):
     rec = data.get("WhoisRecord", {})
     reg = rec.get("registrarName")
     cr  = rec.get("createdDateNormalized") or rec.get("createdDate")
     cn  = rec.get("registryData", {}).get("country")
     age_tag = "new_domain" if cr and str(cr).startswith(("2025","2024","2023")) else "established"
-    out = {"source": "whois", "registrar": reg, "created": cr, "country": cn, "age_tag": age_tag}
-    _save_cache(key, out)
+    return {"source": "whois", "registrar": reg, "created": cr, "country": cn, "age_tag": age_tag}
+
+# name -> how to look it up. `provider` groups sources that share an API quota
+# (concurrency limits, rate limits, HTTP pools and timeouts); `api_key` None means no key needed;
+# `local` sources are answered in-process and never cached or requested.
+# Cache keys are `cache_prefix` + value; TTLs are per source name (osint_cache).
+SOURCES = {
+    "vt_domain": {"provider": "virustotal", "source": "virustotal", "cache_prefix": "vt_domain_",
+                  "api_key": lambda: VT_API_KEY, "request": _vt_domain_request, "parse": _vt_domain_parse},
+    "vt_url": {"provider": "virustotal", "source": "virustotal_url", "cache_prefix": "vt_url_",
+               "api_key": lambda: VT_API_KEY, "request": _vt_url_request, "parse": _vt_url_parse},
+    "abuseipdb": {"provider": "abuseipdb", "source": "abuseipdb", "cache_prefix": "abuseip_",
+                  "api_key": lambda: ABUSEIPDB_KEY, "request": _abuseipdb_request, "parse": _abuseipdb_parse},
+    "whois": {"provider": "whois", "source": "whois", "cache_prefix": "whois_",
+              "api_key": lambda: WHOIS_KEY, "request": _whois_request, "parse": _whois_parse},
+    "openphish": {"provider": "openphish", "source": "openphish", "api_key": None,
+                  "local": lambda value: openphish_feed.check(value)},
+}
+
+def cached_or_precheck(name: str, value: str):
+    """
+    Answer for a lookup that needs no request, else None: local sources, cached
+    answers (including recently cached failures), the no-API-key fallback, and
+    an open circuit breaker.
+    """
+    spec = SOURCES[name]
+    if "local" in spec:
+        return spec["local"](value)
+    cached = osint_cache.get(name, f"{spec['cache_prefix']}{value}")
+    if cached: return cached
+    if spec["api_key"] is not None and not spec["api_key"]():
+        return {"source": spec["source"], "used_fallback": True, "note": "no_api_key"}
+    if not breaker_for(spec["provider"]).allow():
+        return {"source": spec["source"], "used_fallback": True, "error": "circuit_open"}
+    return None
+
+def failure_result(name: str, error: dict):
+    return {"source": SOURCES[name]["source"], "used_fallback": True, **error}
+
+def record_failure(name: str, value: str, error: dict):
+    """Failed request: feed the provider's breaker and cache the failure briefly."""
+    spec = SOURCES[name]
+    message = str(error.get("error", ""))
+    breaker = breaker_for(spec["provider"])
+    if is_provider_failure(message):
+        breaker.failure(message)
+    else:
+        breaker.success()  # the provider answered; this key just has no record
+    out = failure_result(name, error)
+    osint_cache.set(name, f"{spec['cache_prefix']}{value}", out, ttl_sec=OSINT_NEGATIVE_TTL_SEC)
     return out
 
+def parse_and_cache(name: str, value: str, data):
+    spec = SOURCES[name]
+    breaker_for(spec["provider"]).success()
+    out = spec["parse"](data, value)
+    osint_cache.set(name, f"{spec['cache_prefix']}{value}", out)
+    return out
+
+def rate_limited_result(name: str, reason: str, lane: str):
+    """Degraded answer when the provider's quota can't serve this lane now (not cached, not a failure)."""
+    return failure_result(name, {"error": reason, "lane": lane})
+
+def _request(name: str, value: str, lane: str):
+    spec = SOURCES[name]
+    denied = limiter.acquire(spec["provider"], lane)
+    if denied:
+        return rate_limited_result(name, denied, lane)
+    url, headers, params = spec["request"](value)
+    data, failed = _safe_get_json(spec["provider"], url, headers=headers, params=params, lane=lane)
+    if failed:
+        return record_failure(name, value, data)
+    return parse_and_cache(name, value, data)
+
+# Concurrent threads asking for the same (source, value) share one request
+_flights = SingleFlight()
+
+def _lookup(name: str, value: str):
+    """Blocking lookup of one source: cache / breaker → request (one per key in flight) → parse → cache."""
+    early = cached_or_precheck(name, value)
+    if early: return early
+    lane = current_lane()
+    out = _flights.do(name, (name, value), lambda: _request(name, value, lane))
+    if lane == INTERACTIVE and out.get("lane") == BATCH:
+        out = _request(name, value, lane)  # joined a batch lookup that was degraded; don't inherit that
+    return out
+
+def vt_domain_report(domain: str):
+    return _lookup("vt_domain", domain)
+
+def vt_url_report(url_str: str):
+    return _lookup("vt_url", url_str)
+
+def abuseipdb_report(ip: str):
+    return _lookup("abuseipdb", ip)
+
+def whois_domain(domain: str):
+    return _lookup("whois", domain)
+
 def openphish_check(domain_or_url: str):
-    key = f"openphish_{domain_or_url}"
-    cached = _from_cache(key)
-    if cached: return cached
-    try:
-        r = requests.get("https://openphish.com/feed.txt", timeout=5)
-        if r.status_code == 200:
-            hit = any(domain_or_url in line for line in r.text.splitlines()[:2000])
-            out = {"source": "openphish", "listed": bool(hit)}
-            _save_cache(key, out)
-            return out
-        return {"source": "openphish", "error": f"status_{r.status_code}"}
-    except Exception as e:
-        return {"source": "openphish", "error": str(e)}
+    return _lookup("openphish", domain_or_url)
+
+LOOKUPS = {
+    "vt_domain": vt_domain_report,
+    "vt_url": vt_url_report,
+    "abuseipdb": abuseipdb_report,
+    "whois": whois_domain,
+    "openphish": openphish_check,
+}
 
 # ------------------------------------------------------------
 # 🧠 OSINT Fusion Layer
 # ------------------------------------------------------------
-def enrich_entity_osint(entity: Dict[str, Any]) -> Dict[str, Any]:
-    """Central intelligence hub: combines multi-source OSINT into one dict."""
+def entity_lookup_plan(entity: Dict[str, Any]):
+    """(kind, domain, [(source name, lookup value), ...]) for one entity."""
+    val = entity.get("value", "")
+    if "@" in val:  # email
+        m = EMAIL_RE.search(val)
+        domain = m.group(1) if m else None
+        return "email", domain, [("vt_domain", domain), ("whois", domain), ("openphish", domain)]
+    if re.match(URL_RE, val):
+        m = URL_RE.search(val)
+        domain = m.group(1) if m else None
+        return "url", domain, [("vt_url", val), ("vt_domain", domain), ("openphish", val)]
+    if re.match(IP_RE, val):
+        return "ip", None, [("abuseipdb", val)]
+    if "." in val:  # domain
+        return "domain", None, [("vt_domain", val), ("whois", val), ("openphish", val)]
+    return "other", None, []
+
+def fuse_entity_osint(entity: Dict[str, Any], kind: str, domain, sources, error: Optional[str] = None) -> Dict[str, Any]:
+    """Combine one entity's source results (in plan order) into its OSINT record."""
     etype = entity.get("type", "").lower()
     val = entity.get("value", "")
     result = {"entity": val, "type": etype, "timestamp": datetime.now().isoformat()}
+    if error is not None:
+        result.update({"error": error})
+        return result
 
     try:
-        if "@" in val:  # email
-            m = EMAIL_RE.search(val)
-            domain = m.group(1) if m else None
-            vt = vt_domain_report(domain)
-            wh = whois_domain(domain)
-            op = openphish_check(domain)
+        if kind == "email":
+            vt, wh, op = sources
             score = int((vt.get("score", 0) + wh.get("age_tag") == "new_domain" and 10 or 0) + (op.get("listed") and 30 or 0))
             result.update({"domain": domain, "sources": [vt, wh, op], "aggregate_score": score, "risk": _risk_label(score)})
-        elif re.match(URL_RE, val):
-            m = URL_RE.search(val)
-            domain = m.group(1) if m else None
-            vt_u = vt_url_report(val)
-            vt_d = vt_domain_report(domain)
-            op = openphish_check(val)
+        elif kind == "url":
+            vt_u, vt_d, op = sources
             score = int((vt_u.get("score", 0) + vt_d.get("score", 0)) / 2 + (op.get("listed") and 20 or 0))
             result.update({"domain": domain, "sources": [vt_u, vt_d, op], "aggregate_score": score, "risk": _risk_label(score)})
-        elif re.match(IP_RE, val):
-            ab = abuseipdb_report(val)
+        elif kind == "ip":
+            ab, = sources
             result.update({"sources": [ab], "aggregate_score": ab.get("score", 0), "risk": ab.get("risk", "Low")})
-        elif "." in val:  # domain
-            vt = vt_domain_report(val)
-            wh = whois_domain(val)
-            op = openphish_check(val)
+        elif kind == "domain":
+            vt, wh, op = sources
             score = int((vt.get("score", 0) + (wh.get("age_tag") == "new_domain" and 15 or 0) + (op.get("listed") and 20 or 0)))
             result.update({"sources": [vt, wh, op], "aggregate_score": score, "risk": _risk_label(score)})
         else:
@@ -206,6 +243,15 @@ def enrich_entity_osint(entity: Dict[str, Any]) -> Dict[str, Any]:
 
     return result
 
+def enrich_entity_osint(entity: Dict[str, Any]) -> Dict[str, Any]:
+    """Central intelligence hub: combines multi-source OSINT into one dict (blocking, one source at a time)."""
+    kind, domain, plan = entity_lookup_plan(entity)
+    try:
+        sources = [LOOKUPS[name](value) for name, value in plan]
+    except Exception as e:
+        return fuse_entity_osint(entity, kind, domain, [], error=str(e))
+    return fuse_entity_osint(entity, kind, domain, sources)
+
 # -------------------------------
 # 🧩 Local Fallbacks (used by URL/QR scanner)
 # -------------------------------
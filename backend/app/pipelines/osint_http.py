@@ -0,0 +1,317 @@
+"""
+SatyaSetu.AI OSINT HTTP Client
+-----------------------------------
+✅ One pooled keep-alive session per provider (requests for blocking lookups,
+   aiohttp for the fan-out), so repeat lookups skip the TCP + TLS handshake
+✅ Pool sizes and connect / read timeouts per provider
+✅ Retries with exponential backoff and full jitter, only where a retry is safe and useful:
+   connection failures (incl. a dropped keep-alive connection) and 502 / 503 / 504.
+   A read timeout is not retried (a hung provider is the circuit breaker's job),
+   nor is 429 (quota pacing is osint_ratelimit's job). Each retry is another upstream
+   call, so it takes its own quota token; no token means no retry
+✅ Per-host metrics: requests, retries, new connections, connection reuse and handshake time
+
+    data, failed = get_json("virustotal", url, headers=headers)
+"""
+
+import os
+import time
+import random
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from app.pipelines.osint_ratelimit import limiter
+
+# =========================
+# ⚙️ CONFIGURATION
+# =========================
+PROVIDERS = ("virustotal", "abuseipdb", "whois", "openphish")
+
+# Keep-alive connections kept per provider host (OSINT_POOL_SIZE_VIRUSTOTAL=20, ...)
+OSINT_POOL_SIZE = int(os.getenv("OSINT_POOL_SIZE", "10"))
+PROVIDER_POOL_SIZE = {
+    provider: max(1, int(os.getenv(f"OSINT_POOL_SIZE_{provider.upper()}", str(OSINT_POOL_SIZE))))
+    for provider in PROVIDERS
+}
+# How long an idle fan-out connection is kept open
+OSINT_KEEPALIVE_SEC = float(os.getenv("OSINT_KEEPALIVE_SEC", "60"))
+
+# (connect, read) seconds per provider
+DEFAULT_TIMEOUTS = {"virustotal": (3, 10), "abuseipdb": (3, 10), "whois": (3, 10), "openphish": (5, 15)}
+PROVIDER_TIMEOUTS = {
+    provider: (
+        float(os.getenv(f"OSINT_TIMEOUT_{provider.upper()}_CONNECT", str(connect))),
+        float(os.getenv(f"OSINT_TIMEOUT_{provider.upper()}_READ", str(read))),
+    )
+    for provider, (connect, read) in DEFAULT_TIMEOUTS.items()
+}
+
+OSINT_HTTP_RETRIES = int(os.getenv("OSINT_HTTP_RETRIES", "2"))
+OSINT_HTTP_BACKOFF_SEC = float(os.getenv("OSINT_HTTP_BACKOFF_SEC", "0.3"))
+OSINT_HTTP_BACKOFF_MAX_SEC = 4.0
+
+RETRY_STATUSES = {502, 503, 504}
+# Connect-phase timeouts only have their own type (ConnectionTimeoutError) from aiohttp 3.10;
+# on older versions they can't be told apart from read timeouts and are not retried.
+_ASYNC_RETRYABLE = (aiohttp.ClientConnectorError, aiohttp.ServerDisconnectedError) + tuple(
+    t for t in (getattr(aiohttp, "ConnectionTimeoutError", None),) if t is not None
+)
+# Longest a retry waits for a quota token before giving up on retrying
+_RETRY_TOKEN_WAIT_SEC = OSINT_HTTP_BACKOFF_MAX_SEC
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full jitter: uniform in [0, base * 2^attempt], capped."""
+    return random.uniform(0, min(OSINT_HTTP_BACKOFF_MAX_SEC, OSINT_HTTP_BACKOFF_SEC * 2 ** attempt))
+
+
+def timeouts_for(provider: str) -> Tuple[float, float]:
+    return PROVIDER_TIMEOUTS.get(provider, (5.0, 10.0))
+
+
+# -------------------------------
+# 📈 Per-host metrics
+# -------------------------------
+class HttpStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts = defaultdict(lambda: {
+            "requests": 0, "retries": 0, "errors": 0, "connections": 0,
+            "handshake_sec": 0.0, "max_handshake_sec": 0.0,
+        })
+
+    def request(self, host: str):
+        with self._lock:
+            self._hosts[host]["requests"] += 1
+
+    def retry(self, host: str):
+        with self._lock:
+            self._hosts[host]["retries"] += 1
+
+    def error(self, host: str):
+        with self._lock:
+            self._hosts[host]["errors"] += 1
+
+    def connection(self, host: str, handshake: float):
+        with self._lock:
+            h = self._hosts[host]
+            h["connections"] += 1
+            h["handshake_sec"] += handshake
+            h["max_handshake_sec"] = max(h["max_handshake_sec"], handshake)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            hosts = {host: dict(h) for host, h in self._hosts.items()}
+        return {
+            "retries": OSINT_HTTP_RETRIES,
+            "pool_size": PROVIDER_POOL_SIZE,
+            "timeouts": {p: {"connect": c, "read": r} for p, (c, r) in PROVIDER_TIMEOUTS.items()},
+            "hosts": {
+                host: {
+                    "requests": h["requests"],
+                    "retries": h["retries"],
+                    "errors": h["errors"],
+                    "new_connections": h["connections"],
+                    "reuse_rate": round(max(0.0, 1 - h["connections"] / h["requests"]), 3) if h["requests"] else None,
+                    "mean_handshake_ms": round(1000 * h["handshake_sec"] / h["connections"], 1) if h["connections"] else None,
+                    "max_handshake_ms": round(1000 * h["max_handshake_sec"], 1),
+                }
+                for host, h in hosts.items()
+            },
+        }
+
+
+http_stats = HttpStats()
+
+
+# -------------------------------
+# 🔌 Blocking sessions (requests / urllib3)
+# -------------------------------
+# Connections that time their own connect() (TCP, plus TLS for https): only new
+# connections call it, so its count against requests gives the reuse rate.
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        t0 = time.perf_counter()
+        super().connect()
+        http_stats.connection(self.host, time.perf_counter() - t0)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        t0 = time.perf_counter()
+        super().connect()
+        http_stats.connection(self.host, time.perf_counter() - t0)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _PooledAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPConnectionPool, "https": _TimedHTTPSConnectionPool}
+
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def session_for(provider: str) -> requests.Session:
+    """The provider's shared keep-alive session (thread-safe for concurrent GETs)."""
+    with _sessions_lock:
+        if provider not in _sessions:
+            size = PROVIDER_POOL_SIZE.get(provider, OSINT_POOL_SIZE)
+            session = requests.Session()
+            # Retries are done in get() so they can be counted and jittered
+            adapter = _PooledAdapter(pool_connections=4, pool_maxsize=size, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[provider] = session
+        return _sessions[provider]
+
+
+def get(provider: str, url: str, headers=None, params=None, lane: str = None) -> requests.Response:
+    """
+    GET through the provider's pooled session, with retries. The first attempt's quota
+    token is the caller's; each retry acquires one in `lane`. Raises on a final transport error.
+    """
+    session = session_for(provider)
+    host = urlsplit(url).hostname or ""
+    outcome = None
+    for attempt in range(OSINT_HTTP_RETRIES + 1):
+        if attempt:
+            time.sleep(backoff_delay(attempt - 1))
+            if limiter.acquire(provider, lane, timeout=_RETRY_TOKEN_WAIT_SEC) is not None:
+                break
+            http_stats.retry(host)
+        last = attempt == OSINT_HTTP_RETRIES
+        http_stats.request(host)
+        try:
+            # ConnectionError covers connect timeouts and dropped keep-alive connections, not read timeouts
+            r = session.get(url, headers=headers, params=params, timeout=timeouts_for(provider))
+        except requests.ConnectionError as e:
+            if last:
+                http_stats.error(host)
+                raise
+            outcome = e
+            continue
+        except Exception:
+            http_stats.error(host)
+            raise
+        if r.status_code not in RETRY_STATUSES or last:
+            if r.status_code >= 400:
+                http_stats.error(host)
+            return r
+        r.close()
+        outcome = r
+
+    # No quota left for a retry: the last attempt's outcome stands
+    http_stats.error(host)
+    if isinstance(outcome, Exception):
+        raise outcome
+    return outcome
+
+
+def get_json(provider: str, url: str, headers=None, params=None, lane: str = None):
+    """(data, failed) — data is the JSON body, or {"error": ...} on any failure."""
+    try:
+        r = get(provider, url, headers=headers, params=params, lane=lane)
+        if r.status_code == 200:
+            return r.json(), False
+        return {"error": f"status_{r.status_code}"}, True
+    except Exception as e:
+        return {"error": str(e)}, True
+
+
+# -------------------------------
+# ⚡ Fan-out sessions (aiohttp)
+# -------------------------------
+async def _on_request_start(session, ctx, params):
+    ctx.host = params.url.host or ""
+
+
+async def _on_connection_create_start(session, ctx, params):
+    ctx.connect_t0 = time.perf_counter()
+
+
+async def _on_connection_create_end(session, ctx, params):
+    http_stats.connection(getattr(ctx, "host", ""), time.perf_counter() - ctx.connect_t0)
+
+
+def _trace_config() -> aiohttp.TraceConfig:
+    trace = aiohttp.TraceConfig()
+    trace.on_request_start.append(_on_request_start)
+    trace.on_connection_create_start.append(_on_connection_create_start)
+    trace.on_connection_create_end.append(_on_connection_create_end)
+    return trace
+
+
+def new_async_session(provider: str) -> aiohttp.ClientSession:
+    """Keep-alive aiohttp session for one provider. Create it on the loop that will use it."""
+    connect, read = timeouts_for(provider)
+    connector = aiohttp.TCPConnector(
+        limit=PROVIDER_POOL_SIZE.get(provider, OSINT_POOL_SIZE),
+        keepalive_timeout=OSINT_KEEPALIVE_SEC,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=read),
+        trace_configs=[_trace_config()],
+    )
+
+
+async def get_json_async(session: aiohttp.ClientSession, provider: str, url: str, headers=None, params=None,
+                         lane: str = None) -> Tuple[int, Optional[Any]]:
+    """
+    (status, JSON body or None) with the same retry and quota policy as get().
+    Pass `lane` explicitly: the caller's contextvar does not reach the OSINT loop thread.
+    Raises on a final transport error.
+    """
+    host = urlsplit(url).hostname or ""
+    outcome = None
+    for attempt in range(OSINT_HTTP_RETRIES + 1):
+        if attempt:
+            await asyncio.sleep(backoff_delay(attempt - 1))
+            if await limiter.acquire_async(provider, lane, timeout=_RETRY_TOKEN_WAIT_SEC) is not None:
+                break
+            http_stats.retry(host)
+        last = attempt == OSINT_HTTP_RETRIES
+        http_stats.request(host)
+        try:
+            async with session.get(url, headers=headers, params=params) as r:
+                if r.status == 200:
+                    return r.status, await r.json(content_type=None)
+                if r.status not in RETRY_STATUSES or last:
+                    http_stats.error(host)
+                    return r.status, None
+                outcome = r.status
+        except _ASYNC_RETRYABLE as e:
+            if last:
+                http_stats.error(host)
+                raise
+            outcome = e
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            http_stats.error(host)
+            raise
+
+    # No quota left for a retry: the last attempt's outcome stands
+    http_stats.error(host)
+    if isinstance(outcome, Exception):
+        raise outcome
+    return outcome, None
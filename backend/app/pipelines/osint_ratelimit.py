@@ -0,0 +1,262 @@
+"""
+SatyaSetu.AI OSINT Rate Limiter
+-----------------------------------
+✅ Token bucket per provider (per-minute rate, one minute of burst) plus a per-day quota
+✅ Quota state shared by all worker processes (SQLite, next to the OSINT cache)
+✅ Two lanes: interactive (/analyze) waits for a token within its deadline;
+   batch (/batch-analyze) may not dip into the reserve and degrades to a fallback answer
+✅ Interactive waiters go first; batch never queues ahead of a single-case analyst
+✅ Remaining quota, grants, degradations and queue-wait metrics per provider and lane
+
+    with osint_priority(BATCH):
+        analyze_batch(...)      # every OSINT lookup inside runs in the batch lane
+"""
+
+import os
+import time
+import asyncio
+import threading
+import contextvars
+from contextlib import contextmanager
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from app.pipelines.osint_cache import OSINT_CACHE_PATH, open_wal_connection
+
+# =========================
+# ⚙️ CONFIGURATION
+# =========================
+OSINT_QUOTA_PATH = os.getenv("OSINT_QUOTA_PATH", OSINT_CACHE_PATH)
+
+# (requests per minute, requests per day) per provider; 0 = unlimited.
+# Defaults are the free-tier limits (VirusTotal public API: 4/min, 500/day).
+DEFAULT_QUOTAS = {"virustotal": (4, 500), "abuseipdb": (60, 1000), "whois": (30, 1000)}
+PROVIDER_QUOTAS = {
+    provider: {
+        "per_min": float(os.getenv(f"OSINT_QUOTA_{provider.upper()}_PER_MIN", str(per_min))),
+        "per_day": int(os.getenv(f"OSINT_QUOTA_{provider.upper()}_PER_DAY", str(per_day))),
+    }
+    for provider, (per_min, per_day) in DEFAULT_QUOTAS.items()
+}
+
+# Share of each bucket and daily quota that only the interactive lane may use
+OSINT_INTERACTIVE_RESERVE = float(os.getenv("OSINT_INTERACTIVE_RESERVE", "0.25"))
+# Longest a batch lookup waits for a token before answering with a fallback
+OSINT_BATCH_MAX_WAIT_SEC = float(os.getenv("OSINT_BATCH_MAX_WAIT_SEC", "2"))
+# Longest a blocking interactive lookup waits (fan-out lookups wait up to their deadline)
+OSINT_INTERACTIVE_MAX_WAIT_SEC = float(os.getenv("OSINT_INTERACTIVE_MAX_WAIT_SEC", "20"))
+
+INTERACTIVE, BATCH = "interactive", "batch"
+_lane: contextvars.ContextVar = contextvars.ContextVar("osint_lane", default=INTERACTIVE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS osint_quota (
+    provider TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    refreshed_at REAL NOT NULL,
+    day TEXT NOT NULL,
+    day_used INTEGER NOT NULL
+);
+"""
+
+
+@contextmanager
+def osint_priority(lane: str):
+    """Run the enclosed OSINT lookups in `lane` (INTERACTIVE or BATCH)."""
+    token = _lane.set(lane)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def current_lane() -> str:
+    return _lane.get()
+
+
+class QuotaLimiter:
+    def __init__(self, path: str = OSINT_QUOTA_PATH, quotas: Dict[str, dict] = None,
+                 reserve: float = OSINT_INTERACTIVE_RESERVE):
+        self.path = path
+        self.quotas = PROVIDER_QUOTAS if quotas is None else quotas
+        self.reserve = reserve
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._interactive_waiting = defaultdict(int)
+        self._metrics = defaultdict(lambda: {
+            "granted": 0, "rate_limited": 0, "quota_exhausted": 0, "waited": 0,
+            "wait_sec": 0.0, "max_wait_sec": 0.0, "waiting": 0,
+        })
+
+    def _conn(self):
+        conn, pid = getattr(self._local, "conn", None), getattr(self._local, "pid", None)
+        if conn is None or pid != os.getpid():
+            conn = open_wal_connection(self.path)
+            conn.executescript(_SCHEMA)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    # -------------------------------
+    # 🪣 Token bucket (one SQLite transaction per attempt)
+    # -------------------------------
+    def _try_take(self, provider: str, lane: str):
+        """(granted, seconds until a retry could succeed or None, denial reason)."""
+        quota = self.quotas.get(provider)
+        if not quota:
+            return True, None, None
+        per_min, per_day = quota["per_min"], quota["per_day"]
+        # Batch has to leave the reserve untouched
+        floor = self.reserve if lane == BATCH else 0.0
+        now = time.time()
+        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, refreshed_at, day, day_used FROM osint_quota WHERE provider = ?", (provider,)
+            ).fetchone()
+            tokens, refreshed_at, day, day_used = row if row else (per_min, now, today, 0)
+            if per_min > 0:
+                tokens = min(per_min, tokens + (now - refreshed_at) * per_min / 60)
+            if day != today:
+                day, day_used = today, 0
+
+            granted, wait, reason = True, None, None
+            if per_day > 0 and day_used + 1 > per_day * (1 - floor):
+                granted, reason = False, "quota_exhausted"
+            elif per_min > 0 and tokens - 1 < per_min * floor:
+                granted, reason = False, "rate_limited"
+                wait = (per_min * floor + 1 - tokens) * 60 / per_min
+            if granted:
+                tokens, day_used = tokens - (1 if per_min > 0 else 0), day_used + 1
+
+            conn.execute(
+                "INSERT OR REPLACE INTO osint_quota (provider, tokens, refreshed_at, day, day_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (provider, tokens, now, day, day_used),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return granted, wait, reason
+
+    def _attempt(self, provider: str, lane: str):
+        # Batch steps aside while an interactive lookup in this worker is waiting for the same provider
+        if lane == BATCH:
+            with self._lock:
+                if self._interactive_waiting[provider]:
+                    return False, 0.05, "rate_limited"
+        try:
+            return self._try_take(provider, lane)
+        except Exception as e:
+            print(f"⚠️ OSINT quota check failed for {provider}: {e}")
+            return True, None, None  # never block lookups on a quota-store error
+
+    def _record(self, provider: str, lane: str, reason: Optional[str], waited: float):
+        with self._lock:
+            m = self._metrics[(provider, lane)]
+            m["granted" if reason is None else reason] += 1
+            if waited > 0.005:
+                m["waited"] += 1
+                m["wait_sec"] += waited
+                m["max_wait_sec"] = max(m["max_wait_sec"], waited)
+
+    def _waiting(self, provider: str, lane: str, delta: int):
+        with self._lock:
+            self._metrics[(provider, lane)]["waiting"] += delta
+            if lane == INTERACTIVE:
+                self._interactive_waiting[provider] += delta
+
+    def _max_wait(self, lane: str, timeout: Optional[float]) -> float:
+        if lane == BATCH:
+            return OSINT_BATCH_MAX_WAIT_SEC if timeout is None else min(timeout, OSINT_BATCH_MAX_WAIT_SEC)
+        return OSINT_INTERACTIVE_MAX_WAIT_SEC if timeout is None else timeout
+
+    # -------------------------------
+    # 🚦 Acquire (None = go ahead, else the denial reason)
+    # -------------------------------
+    def acquire(self, provider: str, lane: str = None, timeout: float = None) -> Optional[str]:
+        """Blocking acquire for thread callers."""
+        lane = lane or current_lane()
+        t0 = time.perf_counter()
+        give_up = t0 + self._max_wait(lane, timeout)
+        self._waiting(provider, lane, 1)
+        try:
+            while True:
+                granted, wait, reason = self._attempt(provider, lane)
+                now = time.perf_counter()
+                if granted or wait is None or now + wait > give_up:
+                    break
+                time.sleep(min(wait, give_up - now))
+        finally:
+            self._waiting(provider, lane, -1)
+        reason = None if granted else reason
+        self._record(provider, lane, reason, time.perf_counter() - t0)
+        return reason
+
+    async def acquire_async(self, provider: str, lane: str = None, timeout: float = None) -> Optional[str]:
+        """Same as acquire, for tasks on the OSINT event loop."""
+        lane = lane or current_lane()
+        loop = asyncio.get_running_loop()
+        t0 = time.perf_counter()
+        give_up = t0 + self._max_wait(lane, timeout)
+        self._waiting(provider, lane, 1)
+        try:
+            while True:
+                # The SQLite transaction can block on another worker's lock (busy timeout):
+                # run it off the loop so other fan-outs keep going meanwhile
+                granted, wait, reason = await loop.run_in_executor(None, self._attempt, provider, lane)
+                now = time.perf_counter()
+                if granted or wait is None or now + wait > give_up:
+                    break
+                await asyncio.sleep(min(wait, give_up - now))
+        finally:
+            self._waiting(provider, lane, -1)
+        reason = None if granted else reason
+        self._record(provider, lane, reason, time.perf_counter() - t0)
+        return reason
+
+    # -------------------------------
+    # 📈 Status
+    # -------------------------------
+    def status(self) -> Dict[str, Any]:
+        try:
+            rows = {r[0]: r[1:] for r in self._conn().execute(
+                "SELECT provider, tokens, refreshed_at, day, day_used FROM osint_quota").fetchall()}
+        except Exception:
+            rows = {}
+        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        now = time.time()
+        providers = {}
+        for provider, quota in self.quotas.items():
+            per_min, per_day = quota["per_min"], quota["per_day"]
+            tokens, refreshed_at, day, day_used = rows.get(provider, (per_min, now, today, 0))
+            if per_min > 0:
+                tokens = min(per_min, tokens + (now - refreshed_at) * per_min / 60)
+            if day != today:
+                day_used = 0
+            with self._lock:
+                lanes = {
+                    lane: {
+                        **{k: v for k, v in m.items() if k != "wait_sec"},
+                        "max_wait_sec": round(m["max_wait_sec"], 3),
+                        "mean_wait_sec": round(m["wait_sec"] / m["waited"], 3) if m["waited"] else 0.0,
+                    }
+                    for (p, lane), m in self._metrics.items() if p == provider
+                }
+            providers[provider] = {
+                "per_min": per_min,
+                "per_day": per_day,
+                "tokens_now": round(tokens, 2) if per_min > 0 else None,
+                "used_today": day_used,
+                "remaining_today": max(0, per_day - day_used) if per_day > 0 else None,
+                "lanes": lanes,
+            }
+        return {"interactive_reserve": self.reserve, "batch_max_wait_sec": OSINT_BATCH_MAX_WAIT_SEC,
+                "providers": providers}
+
+
+limiter = QuotaLimiter()
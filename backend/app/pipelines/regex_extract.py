@@ -1,4 +1,5 @@
 import re
+from app.pipelines.keyword_engine import keyword_engine
 
 # 🔍 Comprehensive regex patterns
 PATTERNS = {
@@ -23,24 +24,29 @@ SCAM_KEYWORDS = [
 ]
 
 
+keyword_engine.register("entity.scam", SCAM_KEYWORDS)
+
+_BASE_CONFIDENCE = {
+    "email": 0.9,
+    "url": 0.85,
+    "upi": 0.88,
+    "phone": 0.75,
+    "ip": 0.8,
+    "domain": 0.8,
+    "ifsc": 0.95,
+    "crypto_wallet": 0.7,
+    "invoice_id": 0.6,
+    "pan": 0.9,
+    "qr_placeholder": 0.5,
+}
+
+
 def _confidence_boost(entity_type: str, value: str) -> float:
     """Assign confidence heuristically based on pattern reliability."""
-    base = {
-        "email": 0.9,
-        "url": 0.85,
-        "upi": 0.88,
-        "phone": 0.75,
-        "ip": 0.8,
-        "domain": 0.8,
-        "ifsc": 0.95,
-        "crypto_wallet": 0.7,
-        "invoice_id": 0.6,
-        "pan": 0.9,
-        "qr_placeholder": 0.5,
-    }.get(entity_type, 0.5)
+    base = _BASE_CONFIDENCE.get(entity_type, 0.5)
 
     # Small confidence boosts for scam-like words near entities
-    if any(k in value.lower() for k in SCAM_KEYWORDS):
+    if keyword_engine.scan(value, memo=False).any("entity.scam"):
         base += 0.1
 
     return round(min(base, 1.0), 2)
@@ -51,24 +57,138 @@ def _normalize_value(value: str) -> str:
     return value.strip().strip(".,;:").replace("\n", " ")
 
 
-def extract_entities(text: str):
+# -------------------------------
+# ⚡ Single-Pass Scanner
+# -------------------------------
+# Every pattern except url / qr_placeholder only matches characters from
+# [\w.%+\-@], and every match contains '@', '.' or a digit. So one pass that
+# picks out maximal runs of those characters containing '@', '.' or a digit
+# finds every place those nine types can occur; each type's own pattern then
+# runs only inside the (short) runs that pass a cheap guard. Run edges are
+# non-word, non-digit characters, so \b and digit look-arounds behave exactly
+# as they do on the full text.
+_COMPILED = {etype: re.compile(p) for etype, p in PATTERNS.items()}
+_RUN_RE = re.compile(r"(?<![\w.%+\-@])[\w.%+\-@]*?[@.\d][\w.%+\-@]*")
+
+# Types that can cross a run boundary get their own literal-anchored scan
+_GLOBAL_TYPES = ("url", "qr_placeholder")
+
+# Shortest possible match per run-confined type; shorter runs are skipped
+_MIN_LEN = {"ip": 7, "ifsc": 11, "pan": 10, "crypto_wallet": 26, "invoice_id": 8}
+
+
+def _phone_segments(text: str, runs):
+    """
+    Phone numbers may carry a '+91 ' prefix, whose whitespace splits runs.
+    Join a run ending in '+91' with the next run when one whitespace separates them.
+    """
+    segments, i = [], 0
+    while i < len(runs):
+        start, end = runs[i]
+        while (i + 1 < len(runs) and text.endswith("+91", start, end)
+               and runs[i + 1][0] == end + 1 and text[end].isspace()):
+            i += 1
+            end = runs[i][1]
+        segments.append((start, end))
+        i += 1
+    return segments
+
+
+def _scan(text: str):
+    """All raw matches per entity type, in PATTERNS order and text order."""
+    found = {etype: [] for etype in PATTERNS}
+
+    for etype in _GLOBAL_TYPES:
+        found[etype] = list(_COMPILED[etype].finditer(text))
+
+    runs = [m.span() for m in _RUN_RE.finditer(text)]
+    email, upi, domain = _COMPILED["email"], _COMPILED["upi"], _COMPILED["domain"]
+    ip, ifsc, pan = _COMPILED["ip"], _COMPILED["ifsc"], _COMPILED["pan"]
+    crypto, invoice = _COMPILED["crypto_wallet"], _COMPILED["invoice_id"]
+    for start, end in runs:
+        size = end - start
+        if size < 4:
+            continue  # shortest run-confined match is "a.in" / "ab@cd"
+        run = text[start:end]
+
+        # Cheap necessary conditions before running each type's own pattern
+        if "@" in run:
+            if "." in run:
+                found["email"].extend(email.finditer(text, start, end))
+            found["upi"].extend(upi.finditer(text, start, end))
+        if "." in run:
+            if size >= _MIN_LEN["ip"]:
+                found["ip"].extend(ip.finditer(text, start, end))
+            found["domain"].extend(domain.finditer(text, start, end))
+        if size >= _MIN_LEN["pan"]:
+            if size >= _MIN_LEN["ifsc"]:
+                found["ifsc"].extend(ifsc.finditer(text, start, end))
+            found["pan"].extend(pan.finditer(text, start, end))
+            if size >= _MIN_LEN["crypto_wallet"]:
+                found["crypto_wallet"].extend(crypto.finditer(text, start, end))
+        if size >= _MIN_LEN["invoice_id"] and "INV" in run:
+            found["invoice_id"].extend(invoice.finditer(text, start, end))
+
+    phone = _COMPILED["phone"]
+    for start, end in _phone_segments(text, runs):
+        if end - start >= 10:  # ten digits at minimum
+            found["phone"].extend(phone.finditer(text, start, end))
+
+    return found
+
+
+def extract_entities(text: str, features=None):
     """
     Extract multiple types of entities from raw text using regex patterns.
     Returns list of {type, value, confidence, context_snippet}
+    With the analysis' DocumentFeatures, the raw matches are memoized (and timed) there.
     """
-    entities = []
-    lowered = text.lower()
+    unique_entities = []
+    seen = set()
+    boosts = {}
 
-    for entity_type, pattern in PATTERNS.items():
-        matches = list(re.finditer(pattern, text))
+    found = features.feature("regex_matches", lambda: _scan(text)) if features else _scan(text)
+    for entity_type, matches in found.items():
         for m in matches:
             val = _normalize_value(m.group())
-            conf = _confidence_boost(entity_type, val)
+
+            # Deduplicate by (type, value)
+            key = (entity_type, val.lower())
+            if key in seen:
+                continue
+            seen.add(key)
+
+            conf = boosts.get(key)
+            if conf is None:
+                conf = boosts[key] = _confidence_boost(entity_type, val)
             start, end = m.start(), m.end()
 
             # Extract surrounding context (useful for OSINT + Risk)
             context = text[max(0, start - 40): min(len(text), end + 40)]
 
+            unique_entities.append({
+                "type": entity_type,
+                "value": val,
+                "confidence": conf,
+                "context": context.strip(),
+            })
+
+    return unique_entities
+
+
+def extract_entities_multipass(text: str):
+    """
+    Reference implementation: one finditer pass per pattern, then dedupe.
+    Kept for parity checks and benchmarks (see benchmarks/bench_regex_extract.py).
+    """
+    entities = []
+
+    for entity_type, pattern in PATTERNS.items():
+        for m in re.finditer(pattern, text):
+            val = _normalize_value(m.group())
+            conf = _confidence_boost(entity_type, val)
+            start, end = m.start(), m.end()
+            context = text[max(0, start - 40): min(len(text), end + 40)]
             entities.append({
                 "type": entity_type,
                 "value": val,
@@ -76,7 +196,6 @@ def extract_entities(text: str):
                 "context": context.strip(),
             })
 
-    # Deduplicate by (type, value)
     seen = set()
     unique_entities = []
     for e in entities:
@@ -0,0 +1,227 @@
+"""
+SatyaSetu.AI Content-Addressed Result Store
+-----------------------------------
+✅ Caches full pipeline output by evidence SHA-256 + pipeline version
+✅ Byte-identical re-uploads / repeat batch items return in milliseconds
+✅ Any change to a stage's code, rules or model files bumps the pipeline version
+✅ Entries expire no later than the shortest OSINT cache TTL; analyses with degraded
+   OSINT (deadline, breaker, cached failure, rate limit) or failed OCR pages are never stored
+"""
+
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from app.pipelines.embedding_runtime import active_backend
+from app.pipelines.osint_breaker import is_provider_failure
+from app.pipelines.osint_cache import SOURCE_TTL_HOURS
+
+STORE_DIR = "app/data/result_store"
+os.makedirs(STORE_DIR, exist_ok=True)
+
+# Files whose content defines each stage's behaviour (code + rules + model artifacts).
+# Touching any of them invalidates every stored result.
+PIPELINE_STAGES = {
+    "extraction": ["app/pipelines/ocr.py", "app/pipelines/ocr_engines.py"],
+    "keywords": ["app/pipelines/keyword_engine.py"],
+    "entities": ["app/pipelines/regex_extract.py", "app/pipelines/ner.py"],
+    "classifier": [
+        "app/pipelines/scam_classifier.py",
+        "app/pipelines/document_features.py",
+        "app/pipelines/embedding_runtime.py",
+        "app/models/scam_classifier.pkl",
+        "app/models/tfidf_vectorizer.pkl",
+        # Names the published online model version (online_trainer.py)
+        "app/models/online/current.json",
+    ],
+    "osint": ["app/pipelines/osint_engine.py", "app/pipelines/openphish_feed.py"],
+    "risk": ["app/pipelines/risk_assessor.py", "app/pipelines/document_features.py"],
+    "url_qr": ["app/pipelines/url_qr_scanner.py"],
+}
+
+# Settings that change a stage's output without touching its files
+STAGE_SETTINGS = {
+    "classifier": ["CLASSIFIER_CASCADE", "CASCADE_ML_CONF", "CASCADE_HEURISTIC_CONF"],
+}
+# Runtime state that does the same: the embedding backend that actually loaded
+# (EMBEDDING_BACKEND=onnx-int8 can fall back to torch)
+STAGE_RUNTIME = {
+    "classifier": {"embedding_backend": active_backend},
+}
+
+# Manual bump for behaviour changes that don't show up in the files above
+# (e.g. a new spaCy / EasyOCR model release).
+PIPELINE_EPOCH = os.getenv("PIPELINE_EPOCH", "1")
+
+# A stored analysis embeds OSINT answers, so it must not outlive them
+_SHORTEST_OSINT_TTL_SEC = min(SOURCE_TTL_HOURS.values()) * 3600
+RESULT_STORE_TTL_SEC = min(
+    float(os.getenv("RESULT_STORE_TTL_SEC", str(_SHORTEST_OSINT_TTL_SEC))), _SHORTEST_OSINT_TTL_SEC
+)
+
+_fingerprints: Dict[str, tuple] = {}
+_lock = threading.Lock()
+
+
+# -------------------------------------------------------
+# 🧠 Hashing
+# -------------------------------------------------------
+def sha256_file(file_path: str) -> str:
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(4096), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _file_fingerprint(path: str) -> str:
+    """Content hash of a stage file, recomputed only when its mtime/size change."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return "missing"
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _lock:
+        cached = _fingerprints.get(path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+    digest = sha256_file(path)
+    with _lock:
+        _fingerprints[path] = (stamp, digest)
+    return digest
+
+
+def stage_versions() -> Dict[str, str]:
+    out = {}
+    for stage, files in PIPELINE_STAGES.items():
+        h = hashlib.sha256()
+        for path in files:
+            h.update(path.encode())
+            h.update(_file_fingerprint(path).encode())
+        for var in STAGE_SETTINGS.get(stage, []):
+            h.update(f"{var}={os.getenv(var, '')}".encode())
+        for key, current in STAGE_RUNTIME.get(stage, {}).items():
+            h.update(f"{key}={current()}".encode())
+        out[stage] = h.hexdigest()[:12]
+    return out
+
+
+def pipeline_version() -> str:
+    h = hashlib.sha256(PIPELINE_EPOCH.encode())
+    for stage, digest in sorted(stage_versions().items()):
+        h.update(f"{stage}={digest}".encode())
+    return h.hexdigest()[:16]
+
+
+# -------------------------------------------------------
+# 💾 Store
+# -------------------------------------------------------
+def _store_path(sha256: str, variant: str) -> str:
+    return os.path.join(STORE_DIR, f"{sha256}.{variant}.json")
+
+
+def lookup(sha256: str, variant: str = "default") -> Optional[dict]:
+    """
+    Return the stored analysis for this content hash if it matches the current pipeline.
+    `variant` separates results produced under different settings (e.g. OCR tier).
+    """
+    path = _store_path(sha256, variant)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except Exception:
+        return None
+    if entry.get("pipeline_version") != pipeline_version():
+        return None
+    try:
+        age = (datetime.now() - datetime.fromisoformat(entry["stored_at"])).total_seconds()
+    except Exception:
+        return None
+    if age > RESULT_STORE_TTL_SEC:
+        return None
+    return entry
+
+
+def osint_degraded(value: Any) -> bool:
+    """
+    Whether any OSINT answer in a result is a fallback for a transient reason
+    (deadline_exceeded, circuit_open, cached failure, rate_limited / quota_exhausted).
+    A missing API key is a configuration state, and a 4xx "no record" answer (e.g. a
+    VirusTotal 404 for a fresh domain) is the provider's real answer; neither is a degradation.
+    """
+    if isinstance(value, dict):
+        error = value.get("error")
+        if value.get("used_fallback") and error and is_provider_failure(str(error)):
+            return True
+        return any(osint_degraded(v) for v in value.values())
+    if isinstance(value, list):
+        return any(osint_degraded(v) for v in value)
+    return False
+
+
+def extraction_failed(result: dict) -> bool:
+    """Whether any page's OCR failed, leaving the analysis based on partial text."""
+    return bool(((result.get("extraction") or {}).get("ocr") or {}).get("failed_pages"))
+
+
+def save(sha256: str, source_file_id: str, result: dict, variant: str = "default"):
+    # Degraded OSINT must be retried on the next upload, not replayed
+    if osint_degraded(result.get("osint_hits")) or osint_degraded(result.get("url_qr_findings")):
+        return
+    # Same for a transient OCR failure on some pages
+    if extraction_failed(result):
+        return
+    entry = {
+        "sha256": sha256,
+        "variant": variant,
+        "pipeline_version": pipeline_version(),
+        "stage_versions": stage_versions(),
+        "source_file_id": source_file_id,
+        "stored_at": datetime.now().isoformat(),
+        "result": result,
+    }
+    _write_entry(_store_path(sha256, variant), entry)
+
+
+def _write_entry(path: str, entry: dict):
+    # Write-then-rename so concurrent readers never see a half-written entry
+    tmp = path + f".{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"⚠️ Result store write failed: {e}")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def iter_entries():
+    """(path, entry) for every stored analysis, any variant or pipeline version."""
+    for name in sorted(os.listdir(STORE_DIR)):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(STORE_DIR, name)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                yield path, json.load(f)
+        except Exception:
+            continue
+
+
+def rewrite(path: str, entry: dict):
+    """Replace a stored entry in place (keeps its pipeline version and stored_at)."""
+    _write_entry(path, entry)
+
+
+# Per-request fields that must not be replayed from another upload
+VOLATILE_FIELDS = ("file_id", "analyzed_at", "processing_time_sec", "cache", "feature_timings")
+
+
+def strip_volatile(result: dict) -> dict:
+    return {k: v for k, v in result.items() if k not in VOLATILE_FIELDS}
@@ -1,12 +1,28 @@
 import re
 import numpy as np
-from textblob import TextBlob
 from datetime import datetime
+from app.pipelines.keyword_engine import keyword_engine
+from app.pipelines.document_features import DocumentFeatures
 
 # -----------------------------------
 # Entity-level Risk Analyzer
 # -----------------------------------
 
+ENTITY_SUSPICIOUS_TLDS = [".xyz", ".top", ".tk", ".pw", ".cf", ".club"]
+ENTITY_PHISHING_KEYWORDS = ["verify", "kyc", "secure", "update", "payment", "login"]
+TRUSTED_EMAIL_DOMAINS = ["gov", "edu", "amazon", "hdfcbank", "icici", "paytm"]
+ENTITY_FOREIGN_DOMAINS = [".ru", ".cn", ".br", ".cl", ".io"]
+FINANCIAL_CHANNEL_TYPES = ["upi", "crypto_wallet"]
+
+# (tag, points) in the order calculate_risk applies them
+ENTITY_SIGNALS = [
+    ("suspicious_tld", 20),
+    ("phishing_keyword", 25),
+    ("unverified_domain", 30),
+    ("foreign_domain", 15),
+    ("financial_channel", 10),
+]
+
 def domain_from_email(email):
     match = re.search(r'@([\w.-]+)', email)
     return match.group(1) if match else None
@@ -23,29 +39,29 @@ def calculate_risk(entity):
     tags = []
 
     # 1️⃣ Suspicious TLDs / domains
-    if any(tld in value for tld in [".xyz", ".top", ".tk", ".pw", ".cf", ".club"]):
+    if any(tld in value for tld in ENTITY_SUSPICIOUS_TLDS):
         score += 20
         tags.append("suspicious_tld")
 
     # 2️⃣ Financial/credential-related keywords
-    if any(k in value for k in ["verify", "kyc", "secure", "update", "payment", "login"]):
+    if any(k in value for k in ENTITY_PHISHING_KEYWORDS):
         score += 25
         tags.append("phishing_keyword")
 
     # 3️⃣ Email reputation
     if etype == "email":
         domain = domain_from_email(value)
-        if domain and not any(ok in domain for ok in ["gov", "edu", "amazon", "hdfcbank", "icici", "paytm"]):
+        if domain and not any(ok in domain for ok in TRUSTED_EMAIL_DOMAINS):
             score += 30
             tags.append("unverified_domain")
 
     # 4️⃣ Foreign domains
-    if any(cc in value for cc in [".ru", ".cn", ".br", ".cl", ".io"]):
+    if any(cc in value for cc in ENTITY_FOREIGN_DOMAINS):
         score += 15
         tags.append("foreign_domain")
 
     # 5️⃣ UPI or Crypto presence
-    if etype in ["upi", "crypto_wallet"]:
+    if etype in FINANCIAL_CHANNEL_TYPES:
         score += 10
         tags.append("financial_channel")
 
@@ -78,28 +94,51 @@ MEDIUM_RISK_KEYWORDS = [
     "helpdesk", "support", "account", "service", "offer", "promotion", "congratulations"
 ]
 
-DECEPTIVE_TONE_PATTERNS = [
-    r"(act\s+now)", r"(limited\s+time)", r"(verify\s+account)",
-    r"(update\s+details)", r"(click\s+here)", r"(avoid\s+suspension)"
+# Words separated by any whitespace (formerly r"(act\s+now)"-style regexes)
+DECEPTIVE_TONE_PHRASES = [
+    "act now", "limited time", "verify account",
+    "update details", "click here", "avoid suspension"
+]
+
+# Fusion weights per factor, and per-scam-type boosts (first matching substring wins)
+RISK_WEIGHTS = {
+    "scam_conf": 0.4,
+    "entity_risk": 0.25,
+    "keyword_toxicity": 0.15,
+    "sentiment": 0.05,
+    "osint": 0.1,
+    "tone": 0.05
+}
+SCAM_TYPE_WEIGHT_BOOSTS = [
+    ("investment", "osint", 0.05),
+    ("phishing", "keyword_toxicity", 0.05),
+    ("loan", "entity_risk", 0.05),
 ]
 
+keyword_engine.register("risk.high", HIGH_RISK_KEYWORDS)
+keyword_engine.register("risk.medium", MEDIUM_RISK_KEYWORDS)
+keyword_engine.register("risk.tone", DECEPTIVE_TONE_PHRASES, mode="phrase")
+
 
-def _detect_deceptive_tone(text):
+def _detect_deceptive_tone(text, hits=None):
     """Detects psychological manipulation cues in scam-like language."""
-    text_lower = text.lower()
-    count = sum(1 for pattern in DECEPTIVE_TONE_PATTERNS if re.search(pattern, text_lower))
+    hits = hits or keyword_engine.scan(text)
+    count = hits.n_present("risk.tone")
     return min(1.0, count * 0.15)  # scale 0–1
 
 
-def assess_risk(text, entities, scam_class, osint_hits=None):
+def assess_risk(text, entities, scam_class, osint_hits=None, features=None):
     """
     ⚖️ Multi-factor risk fusion engine
     Combines AI classifier, entities, OSINT, sentiment, tone, and keyword signals.
+    `features` is the analysis' DocumentFeatures (keyword hits and sentiment are reused).
     """
     if osint_hits is None:
         osint_hits = []
+    features = features or DocumentFeatures(text)
 
-    text_lower = text.lower()
+    # One keyword-engine pass covers the keyword and tone features below
+    hits = features.keyword_hits
 
     # --- 1️⃣ Scam classifier weight ---
     scam_conf = scam_class.get("confidence", 0)
@@ -110,14 +149,13 @@ def assess_risk(text, entities, scam_class, osint_hits=None):
     avg_entity_risk = np.mean([e["risk_score"] for e in entity_results]) / 100 if entity_results else 0
 
     # --- 3️⃣ Keyword & tone toxicity ---
-    high_kw = sum(1 for kw in HIGH_RISK_KEYWORDS if kw in text_lower)
-    med_kw = sum(1 for kw in MEDIUM_RISK_KEYWORDS if kw in text_lower)
+    high_kw = hits.n_present("risk.high")
+    med_kw = hits.n_present("risk.medium")
     kw_score = min(1.0, (high_kw * 0.12) + (med_kw * 0.05))
-    tone_score = _detect_deceptive_tone(text)
+    tone_score = _detect_deceptive_tone(text, hits)
 
     # --- 4️⃣ Sentiment neutrality ---
-    blob = TextBlob(text)
-    sentiment = blob.sentiment.polarity
+    sentiment = features.sentiment
     sentiment_score = 1 - abs(sentiment)
 
     # --- 5️⃣ OSINT intelligence impact ---
@@ -140,21 +178,12 @@ def assess_risk(text, entities, scam_class, osint_hits=None):
 
     # --- 6️⃣ Dynamic weight tuning ---
     # Adjust relative weights depending on scam type
-    base_weights = {
-        "scam_conf": 0.4,
-        "entity_risk": 0.25,
-        "keyword_toxicity": 0.15,
-        "sentiment": 0.05,
-        "osint": 0.1,
-        "tone": 0.05
-    }
+    base_weights = dict(RISK_WEIGHTS)
 
-    if "investment" in scam_type.lower():
-        base_weights["osint"] += 0.05
-    elif "phishing" in scam_type.lower():
-        base_weights["keyword_toxicity"] += 0.05
-    elif "loan" in scam_type.lower():
-        base_weights["entity_risk"] += 0.05
+    for needle, factor, boost in SCAM_TYPE_WEIGHT_BOOSTS:
+        if needle in scam_type.lower():
+            base_weights[factor] += boost
+            break
 
     # --- 7️⃣ Weighted fusion ---
     final_score = (
@@ -207,3 +236,238 @@ def assess_risk(text, entities, scam_class, osint_hits=None):
         },
         "scam_type": scam_type,
     }
+
+
+# -----------------------------------
+# ⚡ Vectorized Batch Risk Fusion
+# -----------------------------------
+# Same arithmetic as calculate_risk / assess_risk, in the same operation order,
+# over arrays for many cases at once. Output dicts are identical to assess_risk
+# (timestamps aside), including int-vs-float and Python-vs-NumPy rounding.
+
+FUSION_FACTORS = ["scam_conf", "entity_risk", "keyword_toxicity", "tone", "sentiment", "osint"]
+
+
+def _contains_any(values, needles):
+    """Boolean mask: which of `values` (numpy str array) contain any needle."""
+    mask = np.zeros(len(values), dtype=bool)
+    for needle in needles:
+        mask |= np.char.find(values, needle) >= 0
+    return mask
+
+
+def entity_feature_matrix(entities):
+    """
+    Signal matrix for a flat entity list: (n, len(ENTITY_SIGNALS)) bool in
+    ENTITY_SIGNALS order, plus each entity's confidence and whether it has one.
+    """
+    n = len(entities)
+    if n == 0:
+        return np.zeros((0, len(ENTITY_SIGNALS)), dtype=bool), np.ones(0), np.zeros(0, dtype=bool)
+
+    values = np.char.lower(np.array([e["value"] for e in entities], dtype=str))
+    types = np.array([e.get("type", "") for e in entities], dtype=object)
+    is_email = types == "email"
+
+    unverified = np.zeros(n, dtype=bool)
+    for i in np.flatnonzero(is_email):
+        domain = domain_from_email(str(values[i]))
+        unverified[i] = bool(domain) and not any(ok in domain for ok in TRUSTED_EMAIL_DOMAINS)
+
+    signals = np.column_stack([
+        _contains_any(values, ENTITY_SUSPICIOUS_TLDS),
+        _contains_any(values, ENTITY_PHISHING_KEYWORDS),
+        unverified,
+        _contains_any(values, ENTITY_FOREIGN_DOMAINS),
+        np.isin(types, FINANCIAL_CHANNEL_TYPES),
+    ])
+    has_conf = np.array(["confidence" in e for e in entities], dtype=bool)
+    confidence = np.array([e.get("confidence", 1.0) for e in entities], dtype=np.float64)
+    return signals, confidence, has_conf
+
+
+def _entity_results(entities, signals, confidence, has_conf):
+    """Per-entity score array and calculate_risk-style dicts."""
+    points = np.array([p for _, p in ENTITY_SIGNALS], dtype=np.int64)
+    raw = signals.astype(np.int64) @ points
+    weighted = raw * confidence
+
+    # Signal combinations as bit codes → precomputed tag lists
+    codes = (signals.astype(np.int64) @ (1 << np.arange(len(ENTITY_SIGNALS)))).tolist()
+    tags_by_code = [
+        [tag for j, (tag, _) in enumerate(ENTITY_SIGNALS) if code >> j & 1]
+        for code in range(1 << len(ENTITY_SIGNALS))
+    ]
+
+    scores, results = [], []
+    for e, r, w, c, code in zip(entities, raw.tolist(), weighted.tolist(), has_conf.tolist(), codes):
+        # int points stay int without a confidence, exactly as in calculate_risk
+        score = min(100, round(w, 2)) if c else min(100, round(r, 2))
+        scores.append(score)
+        results.append({
+            "entity": e["value"],
+            "type": e.get("type", ""),
+            "risk_score": score,
+            "risk_level": "High" if score >= 70 else "Medium" if score >= 40 else "Low",
+            "tags": list(tags_by_code[code]),
+        })
+    return np.array(scores, dtype=np.float64), results
+
+
+def _segment_means(values, lengths):
+    """
+    Mean of each consecutive segment, matching np.mean's pairwise summation:
+    segments of equal length are summed together as rows of one 2-D array.
+    """
+    means = np.zeros(len(lengths), dtype=np.float64)
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+    for length in np.unique(lengths):
+        if length == 0:
+            continue
+        rows = np.flatnonzero(lengths == length)
+        block = values[starts[rows][:, None] + np.arange(length)]
+        means[rows] = block.sum(axis=1) / length
+    return means
+
+
+def fusion_weight_matrix(scam_types, weights=None, boosts=None):
+    """(n_cases, len(FUSION_FACTORS)) weights after per-scam-type boosts."""
+    weights = RISK_WEIGHTS if weights is None else weights
+    boosts = SCAM_TYPE_WEIGHT_BOOSTS if boosts is None else boosts
+    column = {f: j for j, f in enumerate(FUSION_FACTORS)}
+    W = np.tile(np.array([weights[f] for f in FUSION_FACTORS], dtype=np.float64), (len(scam_types), 1))
+    for i, scam_type in enumerate(scam_types):
+        lowered = scam_type.lower()
+        for needle, factor, boost in boosts:
+            if needle in lowered:
+                W[i, column[factor]] += boost
+                break
+    return W
+
+
+def fuse_scores(F, W):
+    """Weighted fusion of a (n, len(FUSION_FACTORS)) factor matrix, in assess_risk's order."""
+    return (
+        F[:, 0] * W[:, 0]
+        + F[:, 1] * W[:, 1]
+        + F[:, 2] * W[:, 2]
+        + F[:, 3] * W[:, 3]
+        + F[:, 4] * W[:, 4]
+        + F[:, 5] * W[:, 5]
+    )
+
+
+def round_scores(fused, numpy_rounded):
+    """
+    round(score, 3) as assess_risk does it: NumPy rounding where the score is a
+    NumPy scalar (the case had entities), Python rounding otherwise.
+    """
+    np_round = np.round(fused, 3)
+    return [float(np_round[i]) if numpy_rounded[i] else round(float(x), 3) for i, x in enumerate(fused.tolist())]
+
+
+def risk_levels(scores):
+    scores = np.asarray(scores, dtype=np.float64)
+    return np.where(scores >= 0.75, "HIGH 🔴", np.where(scores >= 0.45, "MEDIUM 🟠", "LOW 🟢"))
+
+
+def score_factor_matrix(F, scam_types, numpy_rounded, weights=None, boosts=None):
+    """
+    Scores and risk levels for a (n, len(FUSION_FACTORS)) factor matrix under a
+    weight profile (default RISK_WEIGHTS / SCAM_TYPE_WEIGHT_BOOSTS).
+    `numpy_rounded` marks cases whose assess_risk score was a NumPy scalar (had entities).
+    """
+    scores = round_scores(fuse_scores(F, fusion_weight_matrix(scam_types, weights, boosts)), numpy_rounded)
+    return scores, risk_levels(scores)
+
+
+def _osint_factor(osint_hits):
+    osint_score = 0
+    if osint_hits:
+        for hit in osint_hits:
+            if isinstance(hit, dict):
+                osint_score += hit.get("aggregate_score", 0) / 100
+            else:
+                osint_score += 0.1
+        osint_score = min(1.0, osint_score / len(osint_hits))
+    return osint_score
+
+
+def assess_risk_batch(texts, entities_list, scam_classes, osint_hits_list=None, features=None):
+    """
+    ⚖️ assess_risk for many cases at once. Per-case text factors (keyword and
+    tone counts, sentiment, OSINT) are gathered once; entity scores, weighted
+    fusion and risk levels run as array operations over every case.
+    Returns one assess_risk-style dict per case, in order.
+    """
+    n = len(texts)
+    osint_hits_list = osint_hits_list or [None] * n
+    features = features or [DocumentFeatures(t) for t in texts]
+    if n == 0:
+        return []
+
+    # --- Per-case factors ---
+    scam_confs = [sc.get("confidence", 0) for sc in scam_classes]
+    scam_types = [sc.get("category", "Unknown") for sc in scam_classes]
+    counts = np.array([
+        (f.keyword_hits.n_present("risk.high"),
+         f.keyword_hits.n_present("risk.medium"),
+         f.keyword_hits.n_present("risk.tone"))
+        for f in features
+    ], dtype=np.int64).reshape(n, 3)
+    sentiments = np.array([f.sentiment for f in features], dtype=np.float64)
+    osint_scores = [_osint_factor(h or []) for h in osint_hits_list]
+
+    # --- Entity matrix over every case's entities ---
+    lengths = np.array([len(ents) for ents in entities_list], dtype=np.int64)
+    flat = [e for ents in entities_list for e in ents]
+    entity_scores, entity_dicts = _entity_results(flat, *entity_feature_matrix(flat))
+    avg_entity_risk = _segment_means(entity_scores, lengths) / 100
+    has_entities = lengths > 0
+
+    kw_scores = np.minimum(1.0, (counts[:, 0] * 0.12) + (counts[:, 1] * 0.05))
+    tone_scores = np.minimum(1.0, counts[:, 2] * 0.15)
+    sentiment_scores = 1 - np.abs(sentiments)
+
+    F = np.column_stack([
+        np.array(scam_confs, dtype=np.float64), avg_entity_risk, kw_scores,
+        tone_scores, sentiment_scores, np.array(osint_scores, dtype=np.float64),
+    ])
+    final_scores, levels = score_factor_matrix(F, scam_types, has_entities)
+
+    # --- Explainable reasoning masks ---
+    reason_masks = [
+        (F[:, 0] > 0.7, None),
+        (avg_entity_risk > 0.3, "Suspicious entities or financial channels detected"),
+        (kw_scores > 0.3, "Urgent or manipulative keywords found"),
+        (tone_scores > 0.3, "Deceptive tone detected in language"),
+        (F[:, 5] > 0.1, "Entity flagged in OSINT threat feeds"),
+    ]
+
+    results, offset = [], 0
+    for i in range(n):
+        reasons = []
+        for mask, reason in reason_masks:
+            if mask[i]:
+                reasons.append(reason or f"AI classified as {scam_types[i]} ({int(scam_confs[i] * 100)}% confidence)")
+        details = entity_dicts[offset:offset + lengths[i]]
+        offset += lengths[i]
+
+        avg = np.float64(avg_entity_risk[i]) if has_entities[i] else 0
+        results.append({
+            "score": final_scores[i],
+            "risk_level": str(levels[i]),
+            "rationale": "; ".join(reasons) if reasons else "No major fraud indicators found.",
+            "timestamp": datetime.now().isoformat(),
+            "entity_details": details,
+            "factors": {
+                "scam_confidence": scam_confs[i],
+                "avg_entity_risk": round(avg, 2),
+                "keyword_toxicity": float(kw_scores[i]),
+                "tone_score": float(tone_scores[i]),
+                "sentiment_neutrality": float(sentiment_scores[i]),
+                "osint_weight": osint_scores[i],
+            },
+            "scam_type": scam_types[i],
+        })
+    return results
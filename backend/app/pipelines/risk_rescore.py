@@ -0,0 +1,266 @@
+"""
+SatyaSetu.AI Risk Re-scoring
+-----------------------------------
+✅ Recomputes risk score / level for every cached case from its stored factors
+✅ New weight profile applied to the whole corpus in one vectorized pass (no OCR / ML)
+✅ Each run is saved as a versioned result set with a diff of changed risk levels
+✅ Optionally applies the new scores to app/data/analysis_cache and to the matching
+   result_store entries (by evidence SHA-256), so re-uploads replay the new score too
+
+    python -m app.pipelines.risk_rescore profile.json           # dry run, report only
+    python -m app.pipelines.risk_rescore profile.json --apply   # also update cached cases
+
+profile.json: {"weights": {"osint": 0.2, ...}, "boosts": [["investment", "osint", 0.05], ...]}
+(omitted keys keep the current RISK_WEIGHTS / SCAM_TYPE_WEIGHT_BOOSTS)
+"""
+
+import os
+import sys
+import json
+import glob
+import hashlib
+import numpy as np
+from collections import Counter
+from datetime import datetime, timezone
+
+from app.pipelines import result_store
+from app.pipelines.risk_assessor import (
+    FUSION_FACTORS,
+    RISK_WEIGHTS,
+    SCAM_TYPE_WEIGHT_BOOSTS,
+    score_factor_matrix,
+)
+
+# =========================
+# ⚙️ CONFIGURATION
+# =========================
+CACHE_DIR = "app/data/analysis_cache"
+META_DIR = "app/data/metadata"
+RESCORE_DIR = "app/data/rescoring"
+
+# Stored risk.factors key for each FUSION_FACTORS column
+FACTOR_KEYS = {
+    "scam_conf": "scam_confidence",
+    "entity_risk": "avg_entity_risk",
+    "keyword_toxicity": "keyword_toxicity",
+    "tone": "tone_score",
+    "sentiment": "sentiment_neutrality",
+    "osint": "osint_weight",
+}
+
+
+def resolve_profile(weights: dict = None, boosts=None) -> dict:
+    """Current weights overridden by `weights`; validated."""
+    merged = dict(RISK_WEIGHTS)
+    for key, value in (weights or {}).items():
+        if key not in RISK_WEIGHTS:
+            raise ValueError(f"Unknown risk factor '{key}'. Must be one of: {sorted(RISK_WEIGHTS)}")
+        value = float(value)
+        if value < 0:
+            raise ValueError(f"Weight for '{key}' must be non-negative")
+        merged[key] = value
+
+    resolved_boosts = []
+    for boost in (SCAM_TYPE_WEIGHT_BOOSTS if boosts is None else boosts):
+        needle, factor, amount = boost
+        if factor not in RISK_WEIGHTS:
+            raise ValueError(f"Unknown risk factor '{factor}' in boost for '{needle}'")
+        resolved_boosts.append([str(needle).lower(), factor, float(amount)])
+    return {"weights": merged, "boosts": resolved_boosts}
+
+
+def _profile_hash(profile: dict) -> str:
+    return hashlib.sha256(json.dumps(profile, sort_keys=True).encode()).hexdigest()[:8]
+
+
+# -------------------------------
+# 📂 Corpus
+# -------------------------------
+def load_cases(cache_dir: str = CACHE_DIR):
+    """(file_id, path, case) for every cached single-case analysis with stored risk factors."""
+    cases = []
+    for path in sorted(glob.glob(os.path.join(cache_dir, "*.json"))):
+        if os.path.basename(path).startswith("batch_"):
+            continue  # batch summaries; their cases are also cached individually
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                case = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Skipping unreadable cache file {path}: {e}")
+            continue
+        if isinstance(case.get("risk"), dict) and isinstance(case["risk"].get("factors"), dict):
+            cases.append((case.get("file_id") or os.path.basename(path)[:-5], path, case))
+    return cases
+
+
+def factor_matrix(cases):
+    """
+    (n, len(FUSION_FACTORS)) factors, scam types and which cases had entities.
+    avg_entity_risk is re-derived from entity_details when present, since the
+    stored factor is rounded to two decimals.
+    """
+    F = np.zeros((len(cases), len(FUSION_FACTORS)), dtype=np.float64)
+    scam_types, with_entities = [], np.zeros(len(cases), dtype=bool)
+    for i, (_, _, case) in enumerate(cases):
+        risk = case["risk"]
+        factors = risk["factors"]
+        F[i] = [float(factors.get(FACTOR_KEYS[f], 0) or 0) for f in FUSION_FACTORS]
+
+        details = risk.get("entity_details") or []
+        if details:
+            F[i, FUSION_FACTORS.index("entity_risk")] = np.mean([d["risk_score"] for d in details]) / 100
+        with_entities[i] = bool(details) or bool(case.get("entities"))
+        scam_types.append(risk.get("scam_type") or case.get("scam_class", {}).get("category", "Unknown"))
+    return F, scam_types, with_entities
+
+
+# -------------------------------
+# ⚖️ Re-scoring run
+# -------------------------------
+def _write_json(obj, path: str):
+    tmp = path + f".{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _case_sha256(file_id: str, case: dict):
+    """Evidence hash of a cached case: from a replayed result, else the upload metadata."""
+    sha = (case.get("cache") or {}).get("sha256")
+    if sha:
+        return sha
+    try:
+        with open(os.path.join(META_DIR, f"{file_id}.json"), "r", encoding="utf-8") as f:
+            return json.load(f).get("sha256")
+    except Exception:
+        return None
+
+
+def _apply_to_risk(risk: dict, r: dict, version: str):
+    risk.setdefault("rescore_history", []).append({
+        "score": risk.get("score"),
+        "risk_level": risk.get("risk_level"),
+        "weight_profile": risk.get("weight_profile", "default"),
+    })
+    risk["score"], risk["risk_level"] = r["score"], r["risk_level"]
+    risk["weight_profile"] = version
+    # The reasons only depend on the factors (unchanged); flag that the score behind them was re-fused
+    base = risk.setdefault("base_rationale", risk.get("rationale", ""))
+    risk["rationale"] = f"{base} [re-scored under weight profile {version}: " \
+                        f"{r['previous_score']} → {r['score']}]"
+
+
+def _apply_to_result_store(results: dict, case_hashes: dict, version: str) -> int:
+    """Update stored analyses of the re-scored evidence (matched by SHA-256, else source file id)."""
+    by_sha = {sha: file_id for file_id, sha in case_hashes.items() if sha}
+    updated = 0
+    for path, entry in result_store.iter_entries():
+        file_id = by_sha.get(entry.get("sha256"))
+        if file_id is None and entry.get("source_file_id") in results:
+            file_id = entry["source_file_id"]
+        risk = (entry.get("result") or {}).get("risk")
+        if file_id is None or not isinstance(risk, dict):
+            continue
+        _apply_to_risk(risk, results[file_id], version)
+        result_store.rewrite(path, entry)
+        updated += 1
+    return updated
+
+
+def rescore_corpus(weights: dict = None, boosts=None, apply: bool = False, label: str = None) -> dict:
+    """
+    Re-score every cached case under a weight profile. Writes the run to
+    RESCORE_DIR/<version>.json and returns its report (summary + level diff).
+    With apply=True the cached cases and their stored analyses get the new score / level.
+    """
+    profile = resolve_profile(weights, boosts)
+    now = datetime.now(timezone.utc)
+    version = f"rs-{now.strftime('%Y%m%d%H%M%S')}-{_profile_hash(profile)}"
+
+    cases = load_cases()
+    results, changes = {}, []
+    transitions = Counter()
+    if cases:
+        F, scam_types, with_entities = factor_matrix(cases)
+        scores, levels = score_factor_matrix(
+            F, scam_types, with_entities,
+            weights=profile["weights"], boosts=[tuple(b) for b in profile["boosts"]],
+        )
+        for (file_id, _, case), score, level in zip(cases, scores, levels.tolist()):
+            prev_score, prev_level = case["risk"].get("score"), case["risk"].get("risk_level")
+            results[file_id] = {
+                "score": score,
+                "risk_level": level,
+                "previous_score": prev_score,
+                "previous_level": prev_level,
+            }
+            if level != prev_level:
+                transitions[f"{prev_level} → {level}"] += 1
+                changes.append({"file_id": file_id, **results[file_id]})
+
+    deltas = [r["score"] - (r["previous_score"] or 0) for r in results.values()]
+    report = {
+        "version": version,
+        "label": label,
+        "created_at": now.isoformat(),
+        "profile": profile,
+        "applied": apply,
+        "summary": {
+            "cases": len(results),
+            "level_changes": len(changes),
+            "transitions": dict(transitions),
+            "mean_score_delta": round(float(np.mean(deltas)), 4) if deltas else 0.0,
+            "max_abs_score_delta": round(float(np.max(np.abs(deltas))), 4) if deltas else 0.0,
+        },
+        "diff": sorted(changes, key=lambda c: abs(c["score"] - (c["previous_score"] or 0)), reverse=True),
+        "results": results,
+    }
+
+    if apply:
+        case_hashes = {}
+        for file_id, path, case in cases:
+            case_hashes[file_id] = _case_sha256(file_id, case)
+            _apply_to_risk(case["risk"], results[file_id], version)
+            _write_json(case, path)
+        # Same bytes re-uploaded must replay the new score, not the pre-rescore one
+        report["store_entries_updated"] = _apply_to_result_store(results, case_hashes, version)
+
+    os.makedirs(RESCORE_DIR, exist_ok=True)
+    _write_json(report, os.path.join(RESCORE_DIR, f"{version}.json"))
+
+    print(f"✅ Re-scored {len(results)} cases under {version}: "
+          f"{len(changes)} risk-level changes{' (applied)' if apply else ''}")
+    return report
+
+
+def list_runs():
+    runs = []
+    for path in sorted(glob.glob(os.path.join(RESCORE_DIR, "rs-*.json")), reverse=True):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                report = json.load(f)
+            runs.append({k: report.get(k) for k in ("version", "label", "created_at", "applied", "summary")})
+        except Exception:
+            continue
+    return runs
+
+
+def load_run(version: str):
+    path = os.path.join(RESCORE_DIR, f"{os.path.basename(version)}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    profile_arg = {}
+    if args:
+        with open(args[0], "r", encoding="utf-8") as f:
+            profile_arg = json.load(f)
+    report = rescore_corpus(
+        profile_arg.get("weights"), profile_arg.get("boosts"), apply="--apply" in sys.argv,
+        label=profile_arg.get("label"),
+    )
+    print(json.dumps(report["summary"], indent=2, ensure_ascii=False))
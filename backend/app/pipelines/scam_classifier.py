@@ -9,21 +9,44 @@ Combines:
 """
 
 import os
-import re
+import json
+import random
+import hashlib
+import threading
 import numpy as np
 import joblib
-import gc  # <--- CRITICAL IMPORT FOR MEMORY MANAGEMENT
-from collections import Counter
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
-from textblob import TextBlob
+from app.pipelines.model_registry import registry
+from app.pipelines.inference_batcher import INFERENCE_BATCHING, get_batcher
+from app.pipelines.keyword_engine import keyword_engine
+from app.pipelines.document_features import DocumentFeatures, clean_text
+from app.pipelines.embedding_runtime import (
+    EMBEDDER_SIZE_MB,
+    EMBEDDING_BACKEND,
+    EMBEDDING_MODEL,
+    embedder_backend,
+    load_pipeline_embedder,
+)
 
 # =========================
 # ⚙️ CONFIGURATION
 # =========================
 MODEL_PATH = "app/models/scam_classifier.pkl"
 VECTORIZER_PATH = "app/models/tfidf_vectorizer.pkl"
-EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+PROTOTYPES_PATH = "app/models/category_prototypes.npz"
+# Analyst-feedback models (online_trainer.py) are published here; the pointer
+# names the current version and is swapped atomically with os.replace.
+ONLINE_MODEL_DIR = "app/models/online"
+ONLINE_MODEL_POINTER = os.path.join(ONLINE_MODEL_DIR, "current.json")
+
+# Cascade: return on the LR + keyword-heuristic votes alone (no embedder) when
+# they agree with at least these confidences. Off by default.
+CLASSIFIER_CASCADE = os.getenv("CLASSIFIER_CASCADE", "0") == "1"
+CASCADE_ML_CONF = float(os.getenv("CASCADE_ML_CONF", "0.5"))
+CASCADE_HEURISTIC_CONF = float(os.getenv("CASCADE_HEURISTIC_CONF", "0.4"))
+# Fraction of cascade exits also run through full fusion to measure the gate
+CASCADE_AUDIT_SAMPLE_RATE = float(os.getenv("CASCADE_AUDIT_SAMPLE_RATE", "0.05"))
 
 SCAM_TYPES = [
     "Fake Bank / Financial Fraud",
@@ -47,14 +70,47 @@ TRAIN_DATA = [
 ]
 
 # =========================
-# 🧠 UTILITIES
+# 🧭 CATEGORY PROTOTYPES
 # =========================
+# Exemplar sentences per category for the semantic voter. A category scores the
+# best cosine similarity over its exemplars. Editing this dict (or the embedding
+# model) triggers a one-time re-embed of PROTOTYPES_PATH.
+CATEGORY_EXEMPLARS = {
+    "Fake Bank / Financial Fraud": ["bank account blocked refund transfer verify payment loan upi"],
+    "Lottery / Prize Scam": ["lottery prize claim reward congratulations winner gift"],
+    "Tech Support Scam": ["support microsoft windows security virus fix alert technician helpdesk"],
+    "Fake Job / Recruitment Scam": ["job offer hr recruiter apply resume salary internship work from home"],
+    "Investment / Crypto Scam": ["crypto bitcoin investment trading wallet profit double money fund"],
+    "Romance / Relationship Scam": ["love relationship chat gift darling sweetheart honey emotional connect"],
+}
 
-def clean_text(text: str):
-    text = text.lower()
-    text = re.sub(r"[^a-z0-9\s]", " ", text)
-    return re.sub(r"\s+", " ", text).strip()
+# =========================
+# 🔑 KEYWORD LISTS
+# =========================
+URGENT_WORDS = ["urgent", "immediately", "verify", "blocked", "update", "alert", "action required"]
+FINANCIAL_WORDS = ["bank", "upi", "payment", "account", "transfer", "refund", "investment", "loan", "crypto"]
+REWARD_WORDS = ["prize", "winner", "reward", "claim", "offer"]
+
+# Heuristic voter: whole-token keyword → category
+KEYWORDS = {
+    "verify": "Fake Bank / Financial Fraud",
+    "upi": "Fake Bank / Financial Fraud",
+    "lottery": "Lottery / Prize Scam",
+    "crypto": "Investment / Crypto Scam",
+    "resume": "Fake Job / Recruitment Scam",
+    "love": "Romance / Relationship Scam",
+    "support": "Tech Support Scam"
+}
+
+keyword_engine.register("classifier.urgent", URGENT_WORDS)
+keyword_engine.register("classifier.financial", FINANCIAL_WORDS)
+keyword_engine.register("classifier.reward", REWARD_WORDS)
+keyword_engine.register("classifier.keywords", list(KEYWORDS))
+keyword_engine.register("classifier.keyword_tokens", list(KEYWORDS), mode="token")
 
+# =========================
+# 🧠 UTILITIES
+# =========================
 
 def ensure_model_loaded():
     """If model not found, trains a minimal one."""
@@ -70,21 +126,146 @@ def ensure_model_loaded():
         joblib.dump(vectorizer, VECTORIZER_PATH)
 
 
+def _pointer_stamp():
+    try:
+        st = os.stat(ONLINE_MODEL_POINTER)
+        return st.st_mtime_ns, st.st_size
+    except OSError:
+        return None
+
+
+def read_model_pointer():
+    """Current online model version record, or None when only the baseline exists."""
+    try:
+        with open(ONLINE_MODEL_POINTER, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+_loaded_stamp = None
+_swap_lock = threading.Lock()
+
+
+def _load_text_model():
+    """
+    Text vectorizer + linear model, loaded as one registry entry: the published
+    online version if there is one, else the TF-IDF + LR baseline.
+    Returns (model, vectorizer, model_version).
+    """
+    global _loaded_stamp
+    _loaded_stamp = _pointer_stamp()
+    pointer = read_model_pointer()
+    if pointer:
+        try:
+            model, vectorizer = joblib.load(pointer["path"])
+            return model, vectorizer, pointer["version"]
+        except Exception as e:
+            print(f"⚠️ Online model {pointer.get('version')} unusable, using baseline: {e}")
+    ensure_model_loaded()
+    return joblib.load(MODEL_PATH), joblib.load(VECTORIZER_PATH), "baseline"
+
+
+def _text_model():
+    """Registry entry, hot-swapped when a new model version is published (pointer changed)."""
+    if _pointer_stamp() != _loaded_stamp and registry.peek("scam_tfidf_lr") is not None:
+        with _swap_lock:
+            if _pointer_stamp() != _loaded_stamp:
+                # In-flight calls keep the old tuple; the next get() loads the new version
+                registry.unload("scam_tfidf_lr")
+    return registry.get("scam_tfidf_lr")
+
+
+registry.register("scam_tfidf_lr", _load_text_model, size_hint_mb=5)
+# EMBEDDING_BACKEND picks fp32 sentence-transformers or the int8 ONNX runtime; the entry is
+# re-sized after load, since a failed int8 load falls back to the ~5x larger torch model
+registry.register(
+    "sbert", load_pipeline_embedder,
+    size_hint_mb=EMBEDDER_SIZE_MB.get(EMBEDDING_BACKEND, EMBEDDER_SIZE_MB["torch"]),
+    size_of=lambda embedder: EMBEDDER_SIZE_MB[embedder_backend(embedder)],
+)
+
+
+def _encode(texts):
+    """Unit-length float32 embeddings, one row per text (cosine == dot product)."""
+    embedder = registry.get("sbert")
+    return embedder.encode(texts, convert_to_numpy=True, normalize_embeddings=True).astype(np.float32)
+
+
+def _embed_batch(texts):
+    """Encode all queued texts in one embedder forward pass."""
+    return list(_encode(texts))
+
+
+def embed_text(text: str):
+    """Normalized embedding for a single text (micro-batched across concurrent callers)."""
+    if INFERENCE_BATCHING:
+        return get_batcher("embeddings", _embed_batch)(text)
+    return _encode([text])[0]
+
+
+def _prototype_definitions_hash() -> str:
+    # The loaded embedder's backend, not the configured one: a torch fallback must not
+    # store prototypes under the int8 hash (or reuse int8 ones)
+    backend = embedder_backend(registry.get("sbert"))
+    definitions = {"model": EMBEDDING_MODEL, "backend": backend, "exemplars": CATEGORY_EXEMPLARS}
+    return hashlib.sha256(json.dumps(definitions, sort_keys=True).encode()).hexdigest()
+
+
+def _load_prototypes():
+    """
+    Category prototype matrix: one normalized row per exemplar, rows grouped by
+    category. Read from PROTOTYPES_PATH; re-embedded only when definitions change.
+    Returns (matrix, group_starts, categories).
+    """
+    categories = list(CATEGORY_EXEMPLARS)
+    sizes = [len(CATEGORY_EXEMPLARS[c]) for c in categories]
+    group_starts = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+    definitions_hash = _prototype_definitions_hash()
+
+    try:
+        with np.load(PROTOTYPES_PATH) as stored:
+            if str(stored["definitions_hash"]) == definitions_hash:
+                return stored["matrix"], group_starts, categories
+    except Exception:
+        pass  # missing, unreadable or stale
+
+    print("⚙️ Embedding scam category prototypes...")
+    sentences = [s for c in categories for s in CATEGORY_EXEMPLARS[c]]
+    matrix = _encode(sentences)
+    os.makedirs(os.path.dirname(PROTOTYPES_PATH), exist_ok=True)
+    tmp = PROTOTYPES_PATH + f".{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            np.savez(f, matrix=matrix, definitions_hash=np.array(definitions_hash))
+        os.replace(tmp, PROTOTYPES_PATH)
+    except Exception as e:
+        print(f"⚠️ Could not persist category prototypes: {e}")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return matrix, group_starts, categories
+
+
+registry.register("category_prototypes", _load_prototypes, size_hint_mb=1)
+
+
+def _semantic_scores(text_embs):
+    """(n_categories, n_texts) best exemplar cosine similarities, via one matrix product."""
+    matrix, group_starts, categories = registry.get("category_prototypes")
+    return np.maximum.reduceat(matrix @ text_embs.T, group_starts, axis=0), categories
+
+
+def semantic_category_scores(text_emb) -> dict:
+    """{category: best cosine similarity over its exemplars} for one embedding."""
+    sims, categories = _semantic_scores(np.asarray(text_emb)[None, :])
+    return {cat: float(score) for cat, score in zip(categories, sims[:, 0])}
+
+
 # =========================
 # ⚡ CLASSIFICATION LOGIC
 # =========================
 
-def detect_urgency_and_financial_terms(text: str):
-    """Detect scam-related tone features."""
-    urgent_words = ["urgent", "immediately", "verify", "blocked", "update", "alert", "action required"]
-    financial_words = ["bank", "upi", "payment", "account", "transfer", "refund", "investment", "loan", "crypto"]
-    reward_words = ["prize", "winner", "reward", "claim", "offer"]
-
-    urgency = sum(1 for w in urgent_words if w in text)
-    financial = sum(1 for w in financial_words if w in text)
-    reward = sum(1 for w in reward_words if w in text)
-
-    tone_factor = min(1.0, (urgency * 0.1) + (financial * 0.1) + (reward * 0.05))
+def _tone_signals(urgency: int, financial: int, reward: int, tone_factor: float):
     return {
         "urgency_score": round(urgency / 3, 2),
         "financial_score": round(financial / 4, 2),
@@ -93,119 +274,245 @@ def detect_urgency_and_financial_terms(text: str):
     }
 
 
-def classify_scam(text: str):
-    """Perform hybrid AI + semantic + heuristic classification."""
+def detect_urgency_and_financial_terms(text: str, hits=None):
+    """Detect scam-related tone features."""
+    hits = hits or keyword_engine.scan(text)
+    urgency = hits.n_present("classifier.urgent")
+    financial = hits.n_present("classifier.financial")
+    reward = hits.n_present("classifier.reward")
 
-    # ⚠️ Initialize variables to None so we can safely delete them in 'finally'
-    model = None
-    vectorizer = None
-    embedder = None
+    tone_factor = min(1.0, (urgency * 0.1) + (financial * 0.1) + (reward * 0.05))
+    return _tone_signals(urgency, financial, reward, tone_factor)
+
+
+def _cheap_votes(features_list):
+    """TF-IDF+LR, keyword-heuristic and tone votes in array form (no embedder needed)."""
+    n = len(features_list)
+    texts_clean = [f.clean for f in features_list]
+
+    # --- Step 1: Logistic Regression Prediction ---
+    model, vectorizer, model_version = _text_model()
+    probs = model.predict_proba(vectorizer.transform(texts_clean))
+    pred_labels = model.classes_[np.argmax(probs, axis=1)]
+    ml_confs = np.max(probs, axis=1)
+
+    # --- Step 3: Heuristic Keyword Matching (whole-token votes per category) ---
+    type_index = {cat: j for j, cat in enumerate(SCAM_TYPES)}
+    votes = np.zeros((n, len(SCAM_TYPES)), dtype=np.int64)
+    tone_counts = np.zeros((n, 3), dtype=np.int64)
+    for i, hits in enumerate(f.keyword_hits for f in features_list):
+        for token, count in hits.counts("classifier.keyword_tokens").items():
+            votes[i, type_index[KEYWORDS[token]]] += count
+        tone_counts[i] = (hits.n_present("classifier.urgent"),
+                          hits.n_present("classifier.financial"),
+                          hits.n_present("classifier.reward"))
+    heuristic_idx = np.argmax(votes, axis=1)
+    heuristic_confs = np.minimum(1.0, votes[np.arange(n), heuristic_idx] / 5.0)
+
+    # --- Step 4: Tone (urgent + financial + reward) ---
+    tone_factors = np.minimum(
+        1.0, (tone_counts[:, 0] * 0.1) + (tone_counts[:, 1] * 0.1) + (tone_counts[:, 2] * 0.05)
+    )
+    return {
+        "model_version": model_version,
+        "pred_labels": pred_labels,
+        "ml_confs": ml_confs,
+        "heuristic_idx": heuristic_idx,
+        "heuristic_confs": heuristic_confs,
+        "tone_counts": tone_counts,
+        "tone_factors": tone_factors,
+    }
 
-    try:
-        text_clean = clean_text(text)
-        if not text_clean:
-            return {"category": "Unclassified", "confidence": 0.0, "keywords": []}
-
-        # --- LOAD RESOURCES LOCALLY (PREVENTS GLOBAL MEMORY LEAKS) ---
-        print("⏳ Loading Scam Models...")
-        ensure_model_loaded()
-
-        # Load lightweight ML models
-        model = joblib.load(MODEL_PATH)
-        vectorizer = joblib.load(VECTORIZER_PATH)
-
-        # Load heavy Transformer model
-        from sentence_transformers import SentenceTransformer, util
-        embedder = SentenceTransformer(EMBEDDING_MODEL)
-
-        # --- Step 1: Logistic Regression Prediction ---
-        X = vectorizer.transform([text_clean])
-        probs = model.predict_proba(X)[0]
-        pred_label = model.classes_[np.argmax(probs)]
-        ml_conf = float(np.max(probs))
-
-        # --- Step 2: Sentence Embedding Semantic Match ---
-        embeddings_db = {
-            "Fake Bank / Financial Fraud": "bank account blocked refund transfer verify payment loan upi",
-            "Lottery / Prize Scam": "lottery prize claim reward congratulations winner gift",
-            "Tech Support Scam": "support microsoft windows security virus fix alert technician helpdesk",
-            "Fake Job / Recruitment Scam": "job offer hr recruiter apply resume salary internship work from home",
-            "Investment / Crypto Scam": "crypto bitcoin investment trading wallet profit double money fund",
-            "Romance / Relationship Scam": "love relationship chat gift darling sweetheart honey emotional connect"
-        }
-
-        text_emb = embedder.encode(text_clean, convert_to_tensor=True)
-        semantic_scores = {
-            cat: float(util.cos_sim(text_emb, embedder.encode(desc, convert_to_tensor=True))[0][0])
-            for cat, desc in embeddings_db.items()
-        }
-        semantic_label = max(semantic_scores, key=semantic_scores.get)
-        semantic_conf = float(semantic_scores[semantic_label])
-
-        # --- Step 3: Heuristic Keyword Matching ---
-        KEYWORDS = {
-            "verify": "Fake Bank / Financial Fraud",
-            "upi": "Fake Bank / Financial Fraud",
-            "lottery": "Lottery / Prize Scam",
-            "crypto": "Investment / Crypto Scam",
-            "resume": "Fake Job / Recruitment Scam",
-            "love": "Romance / Relationship Scam",
-            "support": "Tech Support Scam"
-        }
-        token_counts = Counter(text_clean.split())
-        heuristic_scores = {cat: 0 for cat in SCAM_TYPES}
-        for token, count in token_counts.items():
-            if token in KEYWORDS:
-                heuristic_scores[KEYWORDS[token]] += count
-        heuristic_label = max(heuristic_scores, key=heuristic_scores.get)
-        heuristic_conf = min(1.0, heuristic_scores[heuristic_label] / 5.0)
-
-        # --- Step 4: Tone and Sentiment Analysis ---
-        tone = detect_urgency_and_financial_terms(text_clean)
-        sentiment = TextBlob(text_clean).sentiment.polarity
-
-        # --- Step 5: Confidence Fusion ---
+
+def _cascade_exits(cheap, ml_conf: float = CASCADE_ML_CONF, heuristic_conf: float = CASCADE_HEURISTIC_CONF):
+    """
+    Rows whose LR and heuristic votes agree, both above threshold. Two agreeing
+    voters already form the majority, so the semantic vote cannot change the
+    category there — only the fused confidence.
+    """
+    heuristic_labels = np.array(SCAM_TYPES, dtype=object)[cheap["heuristic_idx"]]
+    return (
+        (cheap["pred_labels"].astype(object) == heuristic_labels)
+        & (cheap["ml_confs"] >= ml_conf)
+        & (cheap["heuristic_confs"] >= heuristic_conf)
+    )
+
+
+def _classify_cleaned(features_list, text_embs, cheap=None, exits=None):
+    """
+    Hybrid classification for documents with non-empty cleaned text
+    (DocumentFeatures), all voters in array form:
+    one sparse TF-IDF matrix, one prototype matrix product, keyword count matrices.
+    `text_embs` holds one normalized embedding row per text not in `exits`
+    (cascade exits skip the semantic vote and fuse the two cheap voters).
+    """
+    n = len(features_list)
+    cheap = cheap if cheap is not None else _cheap_votes(features_list)
+    exits = np.zeros(n, dtype=bool) if exits is None else exits
+    pred_labels, ml_confs = cheap["pred_labels"], cheap["ml_confs"]
+    heuristic_idx, heuristic_confs = cheap["heuristic_idx"], cheap["heuristic_confs"]
+    tone_counts, tone_factors = cheap["tone_counts"], cheap["tone_factors"]
+
+    # --- Step 2: Sentence Embedding Semantic Match (precomputed category prototypes) ---
+    full = ~exits
+    semantic_idx = np.zeros(n, dtype=np.int64)
+    semantic_confs = np.zeros(n, dtype=np.float64)
+    categories = None
+    if full.any():
+        sims, categories = _semantic_scores(text_embs)
+        semantic_idx[full] = np.argmax(sims, axis=0)
+        semantic_confs[full] = sims[semantic_idx[full], np.arange(sims.shape[1])]
+
+    # --- Step 5: Confidence Fusion ---
+    weights = {"ml": 0.5, "semantic": 0.3, "heuristic": 0.2}
+    combined_confs = (
+        ml_confs * weights["ml"] +
+        semantic_confs * weights["semantic"] +
+        heuristic_confs * weights["heuristic"]
+    )
+    # Cascade exits: renormalize over the voters that ran
+    cheap_confs = (
+        (ml_confs * weights["ml"] + heuristic_confs * weights["heuristic"])
+        / (weights["ml"] + weights["heuristic"])
+    )
+    combined_confs = np.where(exits, cheap_confs, combined_confs)
+    # Adjust confidence based on tone factors (urgent + financial)
+    combined_confs = np.minimum(1.0, combined_confs + tone_factors * 0.1)
+
+    results = []
+    for i, features in enumerate(features_list):
+        pred_label = str(pred_labels[i])
+        semantic_label = None if exits[i] else categories[semantic_idx[i]]
+        heuristic_label = SCAM_TYPES[heuristic_idx[i]]
         final_label = max(
             [pred_label, semantic_label, heuristic_label],
             key=[pred_label, semantic_label, heuristic_label].count
         )
 
-        weights = {"ml": 0.5, "semantic": 0.3, "heuristic": 0.2}
-        combined_conf = (
-            ml_conf * weights["ml"] +
-            semantic_conf * weights["semantic"] +
-            heuristic_conf * weights["heuristic"]
-        )
-
-        # Adjust confidence based on tone factors (urgent + financial)
-        combined_conf = min(1.0, combined_conf + tone["tone_factor"] * 0.1)
+        # Polarity of the cleaned text, as the classifier has always reported it
+        # (assess_risk uses the raw-text polarity)
+        sentiment = features.clean_sentiment
 
         # --- Step 6: Keyword Evidence Extraction ---
-        top_keywords = [k for k, v in KEYWORDS.items() if v == final_label and k in text_clean]
+        top_keywords = [k for k in features.keyword_hits.present("classifier.keywords") if KEYWORDS[k] == final_label]
 
-        return {
+        results.append({
             "category": final_label,
-            "confidence": round(combined_conf, 2),
+            "confidence": round(float(combined_confs[i]), 2),
             "votes": {
                 "ml": pred_label,
                 "semantic": semantic_label,
                 "heuristic": heuristic_label
             },
-            "tone_signals": tone,
+            "tone_signals": _tone_signals(*(int(c) for c in tone_counts[i]), float(tone_factors[i])),
             "sentiment_polarity": round(sentiment, 3),
             "keywords": top_keywords,
-        }
-
-    finally:
-        # --- ⚠️ CRITICAL MEMORY CLEANUP ---
-        # This block ALWAYS runs, even if the code above crashes.
-        # It forces the deletion of the heavy models to free up 300MB+ RAM.
-        if 'embedder' in locals() and embedder is not None:
-            del embedder
-        if 'model' in locals() and model is not None:
-            del model
-        if 'vectorizer' in locals() and vectorizer is not None:
-            del vectorizer
-
-        gc.collect() # Force Python to release memory to OS
-        print("✅ Scam Classifier Models Unloaded from Memory")
\ No newline at end of file
+            "model_version": cheap["model_version"],
+        })
+    return results
+
+
+# -------------------------------
+# 📊 Cascade metrics
+# -------------------------------
+_cascade_lock = threading.Lock()
+_cascade = {"classified": 0, "exits": 0, "audits": 0, "audit_agree": 0, "audit_conf_delta_sum": 0.0}
+
+
+def _record_cascade(classified: int, exits: int):
+    with _cascade_lock:
+        _cascade["classified"] += classified
+        _cascade["exits"] += exits
+
+
+def _maybe_audit_exit(features, cheap, result):
+    """On a sample of cascade exits, also run full fusion and log how far the exit was off."""
+    if CASCADE_AUDIT_SAMPLE_RATE <= 0 or random.random() >= CASCADE_AUDIT_SAMPLE_RATE:
+        return
+    try:
+        text_emb = embed_text(features.clean)
+        full = _classify_cleaned([features], np.asarray(text_emb)[None, :], cheap=cheap)[0]
+    except Exception as e:
+        print(f"[Classifier] Cascade audit failed: {e}")
+        return
+    delta = abs(full["confidence"] - result["confidence"])
+    with _cascade_lock:
+        _cascade["audits"] += 1
+        _cascade["audit_agree"] += int(full["category"] == result["category"])
+        _cascade["audit_conf_delta_sum"] += delta
+
+
+def cascade_stats() -> dict:
+    with _cascade_lock:
+        c = dict(_cascade)
+    return {
+        "enabled": CLASSIFIER_CASCADE,
+        "thresholds": {"ml": CASCADE_ML_CONF, "heuristic": CASCADE_HEURISTIC_CONF},
+        "audit_sample_rate": CASCADE_AUDIT_SAMPLE_RATE,
+        "classified": c["classified"],
+        "exits": c["exits"],
+        "exit_rate": round(c["exits"] / c["classified"], 3) if c["classified"] else None,
+        "audits": c["audits"],
+        "audit_category_agreement": round(c["audit_agree"] / c["audits"], 3) if c["audits"] else None,
+        "audit_mean_confidence_delta": round(c["audit_conf_delta_sum"] / c["audits"], 3) if c["audits"] else None,
+    }
+
+
+def _unclassified():
+    return {"category": "Unclassified", "confidence": 0.0, "keywords": []}
+
+
+def classify_scam(text: str, features: DocumentFeatures = None):
+    """
+    Perform hybrid AI + semantic + heuristic classification.
+    Pass the analysis' DocumentFeatures to reuse its cleaned text, keyword hits and sentiment.
+    """
+    features = features or DocumentFeatures(text)
+    if not features.clean:
+        return _unclassified()
+
+    cheap = _cheap_votes([features])
+    if CLASSIFIER_CASCADE and _cascade_exits(cheap)[0]:
+        # Cheap voters agree confidently: skip the embedder entirely
+        _record_cascade(1, 1)
+        result = _classify_cleaned([features], None, cheap=cheap, exits=np.ones(1, dtype=bool))[0]
+        _maybe_audit_exit(features, cheap, result)
+        return result
+    _record_cascade(1, 0)
+
+    # Single texts go through the embeddings micro-batcher
+    text_emb = embed_text(features.clean)
+    return _classify_cleaned([features], np.asarray(text_emb)[None, :], cheap=cheap)[0]
+
+
+def classify_scam_batch(texts, features=None):
+    """
+    Classify many documents at once: one TF-IDF transform / predict_proba over a
+    sparse matrix, one batched SentenceTransformer encode, array-form heuristics.
+    `features` optionally holds one DocumentFeatures per text.
+    Returns one classify_scam-style dict per input text, in order.
+    """
+    features = features or [DocumentFeatures(text) for text in texts]
+    results = [None] * len(texts)
+    todo = []
+    for i, f in enumerate(features):
+        if f.clean:
+            todo.append(i)
+        else:
+            results[i] = _unclassified()
+
+    if todo:
+        pending = [features[i] for i in todo]
+        cheap = _cheap_votes(pending)
+        exits = _cascade_exits(cheap) if CLASSIFIER_CASCADE else np.zeros(len(pending), dtype=bool)
+        _record_cascade(len(pending), int(exits.sum()))
+
+        # Only texts that did not exit the cascade are embedded
+        remaining = [f.clean for f, e in zip(pending, exits) if not e]
+        text_embs = _encode(remaining) if remaining else None
+        for i, result in zip(todo, _classify_cleaned(pending, text_embs, cheap=cheap, exits=exits)):
+            results[i] = result
+        print(f"✅ Scam classifier processed {len(todo)} texts in one batch "
+              f"({int(exits.sum())} cascade exits)")
+
+    return results
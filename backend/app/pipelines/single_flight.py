@@ -0,0 +1,114 @@
+"""
+SatyaSetu.AI Single-Flight Coalescing
+-----------------------------------
+✅ At most one in-flight call per key; concurrent callers share its result
+✅ SingleFlight for threads (blocking calls), AsyncSingleFlight for asyncio tasks
+✅ A waiter's cancellation (e.g. a fan-out deadline) never cancels the shared call
+✅ Per-group counters: calls made vs calls coalesced (= upstream requests saved)
+
+    flights = SingleFlight()
+    report = flights.do("vt_domain", ("vt_domain", domain), lambda: fetch(domain))
+
+    aflights = AsyncSingleFlight()
+    report = await aflights.do("vt_domain", ("vt_domain", domain), lambda: fetch_async(domain))
+"""
+
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlightStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._groups = defaultdict(lambda: {"calls": 0, "coalesced": 0})
+
+    def record(self, group: str, leader: bool):
+        with self._lock:
+            self._groups[group]["calls" if leader else "coalesced"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            groups = {g: dict(c) for g, c in self._groups.items()}
+        return {
+            "calls": sum(c["calls"] for c in groups.values()),
+            "coalesced": sum(c["coalesced"] for c in groups.values()),
+            "groups": groups,
+        }
+
+
+# Shared by every flight group unless one is given its own
+flight_stats = SingleFlightStats()
+
+
+def _copy(result):
+    # Each caller gets its own top-level dict, as a cache read would return
+    return dict(result) if isinstance(result, dict) else result
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Thread-level coalescing: followers block until the leader's call returns."""
+
+    def __init__(self, stats: SingleFlightStats = flight_stats):
+        self.stats = stats
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, group: str, key: Hashable, fn: Callable[[], Any]):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        self.stats.record(group, leader)
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return _copy(call.result)
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+
+class AsyncSingleFlight:
+    """Task-level coalescing on one event loop: followers await the leader's task."""
+
+    def __init__(self, stats: SingleFlightStats = flight_stats):
+        self.stats = stats
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+
+    def _done(self, key: Hashable, task: asyncio.Future):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here so an unawaited failure isn't logged as lost
+
+    async def do(self, group: str, key: Hashable, factory: Callable[[], Awaitable[Any]]):
+        task = self._tasks.get(key)
+        leader = task is None
+        if leader:
+            task = self._tasks[key] = asyncio.ensure_future(factory())
+            task.add_done_callback(lambda t, key=key: self._done(key, t))
+        self.stats.record(group, leader)
+        result = await asyncio.shield(task)
+        return result if leader else _copy(result)
@@ -13,13 +13,9 @@ from typing import List, Dict
 from urllib.parse import urlparse
 
 # Import your OSINT functions
-from app.pipelines.osint_engine import (
-    vt_domain_report,
-    vt_url_report,
-    whois_domain,
-    openphish_check,
-    fallback_domain
-)
+from app.pipelines.keyword_engine import keyword_engine
+from app.pipelines.osint_engine import fallback_domain
+from app.pipelines.osint_async import lookup_many, source_error
 
 # -------------------------------
 # 🧩 Threat Intelligence (Local Fallback)
@@ -35,6 +31,7 @@ MALICIOUS_DOMAINS = {
 
 SUSPICIOUS_TLDS = [".xyz", ".top", ".tk", ".pw", ".cf", ".club", ".icu", ".zip", ".mov"]
 PHISHING_KEYWORDS = ["verify", "kyc", "login", "secure", "update", "bank", "account", "payment", "refund", "click"]
+keyword_engine.register("url.phishing", PHISHING_KEYWORDS)
 
 
 # -------------------------------
@@ -64,7 +61,7 @@ def heuristic_url_risk(url: str) -> Dict:
         risk_score += 50
         tags.append("known_malicious_domain")
 
-    if any(k in url.lower() for k in PHISHING_KEYWORDS):
+    if keyword_engine.scan(url, memo=False).any("url.phishing"):
         risk_score += 20
         tags.append("phishing_keyword")
 
@@ -111,34 +108,49 @@ def extract_qr_codes(image_path: str) -> List[str]:
 # -------------------------------
 # 🌐 OSINT Enrichment
 # -------------------------------
+_LINK_SOURCES = [
+    ("virustotal_domain", "vt_domain", "domain"),
+    ("virustotal_url", "vt_url", "link"),
+    ("whois", "whois", "domain"),
+    ("openphish", "openphish", "domain"),
+]
+
+
+def osint_enrich_many(links: List[str]) -> Dict[str, Dict]:
+    """OSINT for every link, with all lookups of all links in one concurrent fan-out."""
+    plans, out = {}, {}
+    for link in links:
+        try:
+            domain = urlparse(link).netloc or link
+            plans[link] = (domain, [(name, domain if arg == "domain" else link) for _, name, arg in _LINK_SOURCES])
+        except Exception as e:
+            out[link] = {"error": f"OSINT enrichment failed: {str(e)}"}
+
+    results = lookup_many([key for _, plan in plans.values() for key in plan])
+    for link, (domain, plan) in plans.items():
+        sources = [results[key] for key in plan]
+        error = source_error(sources)
+        if error:
+            out[link] = {"error": f"OSINT enrichment failed: {error}"}
+            continue
+        out[link] = {field: src for (field, _, _), src in zip(_LINK_SOURCES, sources)}
+        out[link]["fallback"] = fallback_domain(domain)
+    return out
+
+
 def osint_enrich(domain_or_url: str) -> Dict:
-    try:
-        parsed = urlparse(domain_or_url)
-        domain = parsed.netloc or domain_or_url
-
-        vt_d = vt_domain_report(domain)
-        vt_u = vt_url_report(domain_or_url)
-        whois_info = whois_domain(domain)
-        openphish_info = openphish_check(domain)
-        fallback_info = fallback_domain(domain)
-
-        osint_data = {
-            "virustotal_domain": vt_d,
-            "virustotal_url": vt_u,
-            "whois": whois_info,
-            "openphish": openphish_info,
-            "fallback": fallback_info,
-        }
-        return osint_data
-    except Exception as e:
-        return {"error": f"OSINT enrichment failed: {str(e)}"}
+    return osint_enrich_many([domain_or_url])[domain_or_url]
 
 
 # -------------------------------
 # ⚙️ Combined Scanner
 # -------------------------------
-def scan_urls_and_qr(text: str, image_path: str) -> List[Dict]:
-    urls = extract_urls(text or "")
+def scan_urls_and_qr(text: str, image_path: str, features=None) -> List[Dict]:
+    # With the analysis' DocumentFeatures, URL extraction is memoized (and timed) there
+    if features is not None:
+        urls = features.feature("urls", lambda: extract_urls(features.text))
+    else:
+        urls = extract_urls(text or "")
     # Only try extracting QR if image path is provided
     qr_links = extract_qr_codes(image_path) if image_path else []
 
@@ -146,10 +158,11 @@ def scan_urls_and_qr(text: str, image_path: str) -> List[Dict]:
     if not all_links:
         return []
 
+    link_osint = osint_enrich_many(all_links)
     results = []
     for link in all_links:
         heuristics = heuristic_url_risk(link)
-        osint = osint_enrich(link)
+        osint = link_osint[link]
 
         final_risk = heuristics["risk_score"]
         if isinstance(osint, dict):
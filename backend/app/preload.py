@@ -0,0 +1,118 @@
+"""
+🧠 Preload-and-Fork Support
+Loads every heavy model once in the master process so forked workers share
+the weights copy-on-write, and reports per-process unique vs shared memory.
+"""
+
+import os
+import gc
+import time
+import threading
+
+# Comma-separated registry names to warm in the master ("all" = every registered model)
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "all")
+# Request counts at which a worker logs its memory again: right after fork every page
+# is trivially shared, so copy-on-write only shows up once requests have been served
+MEMORY_REPORT_AT_REQUESTS = sorted(
+    int(n) for n in os.getenv("MEMORY_REPORT_AT_REQUESTS", "1,10,100,1000").split(",") if n.strip()
+)
+
+
+def preload_models():
+    """Import the pipelines, load their models, then freeze the GC heap."""
+    # Importing the app pulls in fraud_predict (XGBoost) and registers
+    # the OCR / NER / classifier loaders with the model registry.
+    import app.main  # noqa: F401
+    from app.pipelines.model_registry import registry
+
+    # The preloaded set is meant to stay resident and shared: evicting here (or in a
+    # forked worker) would drop shared pages and reload them privately.
+    if "MODEL_RSS_BUDGET_MB" not in os.environ:
+        registry.budget_bytes = 0
+
+    wanted = [m.strip() for m in PRELOAD_MODELS.split(",") if m.strip()]
+    if "all" in wanted:
+        wanted = list(registry.stats()["models"].keys())
+
+    t0 = time.perf_counter()
+    for name in wanted:
+        try:
+            registry.get(name)
+        except Exception as e:
+            print(f"⚠️ Preload failed for '{name}': {e}")
+
+    # Move everything allocated so far into the permanent generation so the
+    # collector never touches (and therefore never copies) those pages in workers.
+    gc.collect()
+    if hasattr(gc, "freeze"):
+        gc.freeze()
+
+    print(f"✅ Preloaded {len(wanted)} models in {time.perf_counter() - t0:.1f}s (pid {os.getpid()})")
+    return wanted
+
+
+def memory_report(pid: int = None) -> dict:
+    """
+    Unique vs shared memory for a process, from /proc/<pid>/smaps_rollup.
+    Unique = private pages (what this worker costs on its own);
+    shared = pages still shared copy-on-write with the master / siblings.
+    """
+    pid = pid or os.getpid()
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1]) * 1024
+    except Exception as e:
+        return {"pid": pid, "error": f"smaps_rollup unavailable: {e}"}
+
+    unique = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    shared = fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)
+    return {
+        "pid": pid,
+        "rss_bytes": fields.get("Rss", 0),
+        "pss_bytes": fields.get("Pss", 0),
+        "unique_bytes": unique,
+        "shared_bytes": shared,
+    }
+
+
+# -------------------------------
+# 📈 Memory after serving requests
+# -------------------------------
+_requests_served = 0
+_checkpoints = []
+_requests_lock = threading.Lock()
+
+
+def note_request():
+    """Count a served request; at MEMORY_REPORT_AT_REQUESTS, log and keep this worker's memory."""
+    global _requests_served
+    with _requests_lock:
+        _requests_served += 1
+        served = _requests_served
+    if served not in MEMORY_REPORT_AT_REQUESTS:
+        return
+    report = memory_report()
+    with _requests_lock:
+        _checkpoints.append({"requests": served, **report})
+    print(f"👷 worker after {served} requests {format_report(report)}")
+
+
+def request_memory_history() -> dict:
+    with _requests_lock:
+        return {"requests_served": _requests_served, "checkpoints": list(_checkpoints)}
+
+
+def format_report(report: dict) -> str:
+    if "error" in report:
+        return f"pid {report['pid']}: {report['error']}"
+
+    def mb(b):
+        return f"{b / 1e6:.1f} MB"
+
+    return (f"pid {report['pid']}: rss={mb(report['rss_bytes'])} "
+            f"unique={mb(report['unique_bytes'])} shared={mb(report['shared_bytes'])} "
+            f"pss={mb(report['pss_bytes'])}")
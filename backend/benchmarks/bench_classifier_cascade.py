@@ -0,0 +1,66 @@
+"""
+Classifier cascade benchmark
+-----------------------------------
+Sweeps the cascade gate (CASCADE_ML_CONF × CASCADE_HEURISTIC_CONF) over a
+labeled set and reports, per threshold pair: exit rate, accuracy of full
+fusion vs the cascade, category agreement, mean |confidence delta| on exits,
+and wall time with the embedder skipped for exiting texts.
+
+Run from backend/:
+    python -m benchmarks.bench_classifier_cascade                # built-in labeled set
+    python -m benchmarks.bench_classifier_cascade labeled.csv    # CSV with text,label columns
+"""
+
+import sys
+import time
+import numpy as np
+
+from app.pipelines import scam_classifier as sc
+from app.pipelines.document_features import DocumentFeatures
+from benchmarks.bench_embedding_backends import LABELED_SET, load_labeled
+
+ML_GRID = (0.3, 0.4, 0.5, 0.6, 0.7)
+HEURISTIC_GRID = (0.2, 0.4, 0.6)
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    labeled = load_labeled(sys.argv[1]) if len(sys.argv) > 1 else LABELED_SET
+    texts, labels = [t for t, _ in labeled], [y for _, y in labeled]
+    features = [DocumentFeatures(t) for t in texts]
+    cleaned = [f.clean for f in features]
+
+    # Warm the registry so timings measure inference, not loading
+    sc._classify_cleaned(features[:1], sc._encode(cleaned[:1]))
+
+    cheap, t_cheap = _timed(lambda: sc._cheap_votes(features))
+    embs, t_embed = _timed(lambda: sc._encode(cleaned))
+    full = sc._classify_cleaned(features, embs, cheap=cheap)
+    full_acc = np.mean([r["category"] == y for r, y in zip(full, labels)])
+    t_full = t_cheap + t_embed
+    print(f"Labeled set: {len(texts)} texts   full fusion acc {full_acc:6.1%}   "
+          f"cheap votes {t_cheap * 1000:.1f} ms + embed {t_embed * 1000:.1f} ms")
+    print(f"{'ml≥':>5} {'heur≥':>6} {'exit rate':>10} {'cascade acc':>12} {'Δacc':>7} "
+          f"{'agree':>7} {'|Δconf|':>8} {'time':>9}")
+
+    for ml_conf in ML_GRID:
+        for heuristic_conf in HEURISTIC_GRID:
+            exits = sc._cascade_exits(cheap, ml_conf, heuristic_conf)
+            remaining = [t for t, e in zip(cleaned, exits) if not e]
+            sub_embs, t_sub = _timed(lambda: sc._encode(remaining) if remaining else None)
+            rows = embs[~exits]  # same rows as sub_embs; reused so labels are comparable
+            cascade = sc._classify_cleaned(features, rows, cheap=cheap, exits=exits)
+
+            acc = np.mean([r["category"] == y for r, y in zip(cascade, labels)])
+            agree = np.mean([a["category"] == b["category"] for a, b in zip(cascade, full)])
+            deltas = [abs(a["confidence"] - b["confidence"])
+                      for a, b, e in zip(cascade, full, exits) if e]
+            print(f"{ml_conf:>5.2f} {heuristic_conf:>6.2f} {exits.mean():>10.1%} {acc:>12.1%} "
+                  f"{acc - full_acc:>+7.1%} {agree:>7.1%} {np.mean(deltas) if deltas else 0:>8.3f} "
+                  f"{(t_cheap + t_sub) * 1000:>6.1f} ms")
+    print(f"(full fusion time {t_full * 1000:.1f} ms)")
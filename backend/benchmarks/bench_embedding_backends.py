@@ -0,0 +1,138 @@
+"""
+Embedding backend benchmark
+-----------------------------------
+fp32 sentence-transformers ("torch") vs int8 ONNX Runtime ("onnx-int8") for the
+classifier's semantic stage:
+
+  • accuracy parity on a labeled set (semantic vote and full classify_scam_batch)
+  • label agreement and embedding cosine between the two backends
+  • single-text latency (p50 / p95) and batch throughput
+
+Run from backend/:
+    python -m benchmarks.bench_embedding_backends                # built-in labeled set
+    python -m benchmarks.bench_embedding_backends labeled.csv    # CSV with text,label columns
+
+Exits non-zero if int8 semantic accuracy drops more than MAX_ACCURACY_DROP
+below fp32 or the two backends agree on fewer than MIN_AGREEMENT of labels.
+"""
+
+import csv
+import sys
+import time
+import numpy as np
+
+from app.pipelines.model_registry import registry
+from app.pipelines.embedding_runtime import OnnxEmbedder, load_embedder
+from app.pipelines import scam_classifier as sc
+
+MAX_ACCURACY_DROP = 0.02
+MIN_AGREEMENT = 0.95
+LATENCY_RUNS = 50
+BATCH_SIZE = 32
+
+LABELED_SET = [
+    ("Your SBI account has been blocked. Verify your KYC within 24 hours to avoid suspension.", "Fake Bank / Financial Fraud"),
+    ("Dear customer, a refund of Rs 4,999 is pending. Share your UPI PIN to receive the transfer.", "Fake Bank / Financial Fraud"),
+    ("Pre-approved loan of 5 lakh credited on paying a processing fee to this account.", "Fake Bank / Financial Fraud"),
+    ("Unusual login detected on your net banking. Update your details at the link below.", "Fake Bank / Financial Fraud"),
+    ("Your debit card will be deactivated today. Call the bank officer and share the OTP.", "Fake Bank / Financial Fraud"),
+    ("Electricity bill payment failed, your connection will be cut tonight. Pay now via UPI.", "Fake Bank / Financial Fraud"),
+    ("Congratulations! Your number won Rs 25 lakh in the KBC lucky draw. Claim your prize now.", "Lottery / Prize Scam"),
+    ("You are the lucky winner of an iPhone 15. Pay delivery charges to claim your gift.", "Lottery / Prize Scam"),
+    ("Your email was selected in the international lottery. Send your details to collect the reward.", "Lottery / Prize Scam"),
+    ("Spin the wheel and win a free car! Registration fee of Rs 999 required to release the prize.", "Lottery / Prize Scam"),
+    ("Festival bonanza: you have won a cash reward. Reply YES to claim before midnight.", "Lottery / Prize Scam"),
+    ("Microsoft has detected a virus on your computer. Call our technician immediately.", "Tech Support Scam"),
+    ("Windows security alert: your PC is infected. Install the remote support tool to fix it.", "Tech Support Scam"),
+    ("Your Apple ID is compromised. Contact the helpdesk to secure your device now.", "Tech Support Scam"),
+    ("Antivirus subscription expired, your files are at risk. Our support agent will renew it remotely.", "Tech Support Scam"),
+    ("Router hacked warning. Call the customer care technician to remove the malware.", "Tech Support Scam"),
+    ("Work from home and earn Rs 50,000 monthly. Pay a registration fee to confirm your job.", "Fake Job / Recruitment Scam"),
+    ("HR from a top MNC: you are shortlisted. Deposit a refundable security amount for the offer letter.", "Fake Job / Recruitment Scam"),
+    ("Part-time job liking YouTube videos, daily salary. Send your resume on WhatsApp.", "Fake Job / Recruitment Scam"),
+    ("Internship with guaranteed placement, pay training charges to the recruiter to apply.", "Fake Job / Recruitment Scam"),
+    ("Airport ground staff vacancy, interview fee payable before joining.", "Fake Job / Recruitment Scam"),
+    ("Double your bitcoin in 7 days with our AI trading bot. Minimum investment Rs 10,000.", "Investment / Crypto Scam"),
+    ("Join our VIP stock tips group, guaranteed 30% monthly profit on your fund.", "Investment / Crypto Scam"),
+    ("New crypto token presale, send USDT to this wallet for 10x returns.", "Investment / Crypto Scam"),
+    ("Forex trading scheme with daily payouts, invest now before slots close.", "Investment / Crypto Scam"),
+    ("Mining pool offer: deposit ETH and withdraw double money in a week.", "Investment / Crypto Scam"),
+    ("I love you so much darling, I need money for my flight to come and meet you.", "Romance / Relationship Scam"),
+    ("Sweetheart, my customs parcel with your gift is stuck, please pay the clearance fee.", "Romance / Relationship Scam"),
+    ("We connected on a dating app and I feel a deep emotional bond. Can you help me with a loan?", "Romance / Relationship Scam"),
+    ("Honey, I am a soldier posted abroad and cannot access my account. Send gift cards please.", "Romance / Relationship Scam"),
+    ("My love, our chats mean everything. Transfer some money so I can visit you.", "Romance / Relationship Scam"),
+]
+
+
+def load_labeled(path: str):
+    with open(path, newline="", encoding="utf-8") as f:
+        return [(row["text"], row["label"]) for row in csv.DictReader(f)]
+
+
+def _use_backend(embedder):
+    """Point the classifier's registry entries at this embedder (prototypes kept in memory)."""
+    registry.register("sbert", lambda: embedder)
+
+    def prototypes():
+        categories = list(sc.CATEGORY_EXEMPLARS)
+        sizes = [len(sc.CATEGORY_EXEMPLARS[c]) for c in categories]
+        group_starts = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+        matrix = sc._encode([s for c in categories for s in sc.CATEGORY_EXEMPLARS[c]])
+        return matrix, group_starts, categories
+
+    registry.register("category_prototypes", prototypes)
+
+
+def evaluate(backend: str, embedder, texts, labels):
+    _use_backend(embedder)
+    cleaned = [sc.clean_text(t) for t in texts]
+
+    embs = sc._encode(cleaned)
+    sims, categories = sc._semantic_scores(embs)
+    semantic = [categories[j] for j in np.argmax(sims, axis=0)]
+    fused = [r["category"] for r in sc.classify_scam_batch(texts)]
+
+    # Single-text latency (what one upload pays) and batched throughput
+    sc._encode(cleaned[:1])  # warm-up
+    latencies = []
+    for i in range(LATENCY_RUNS):
+        t0 = time.perf_counter()
+        sc._encode([cleaned[i % len(cleaned)]])
+        latencies.append(time.perf_counter() - t0)
+    batch = (cleaned * (BATCH_SIZE // len(cleaned) + 1))[:BATCH_SIZE]
+    t0 = time.perf_counter()
+    for _ in range(5):
+        sc._encode(batch)
+    throughput = 5 * BATCH_SIZE / (time.perf_counter() - t0)
+
+    semantic_acc = float(np.mean([p == y for p, y in zip(semantic, labels)]))
+    fused_acc = float(np.mean([p == y for p, y in zip(fused, labels)]))
+    print(f"{backend:<10} semantic acc {semantic_acc:6.1%}  classify_scam acc {fused_acc:6.1%}  "
+          f"p50 {np.percentile(latencies, 50) * 1000:6.1f} ms  p95 {np.percentile(latencies, 95) * 1000:6.1f} ms  "
+          f"batch-{BATCH_SIZE} {throughput:7.1f} texts/s")
+    return {"embs": embs, "semantic": semantic, "fused": fused, "semantic_acc": semantic_acc}
+
+
+if __name__ == "__main__":
+    labeled = load_labeled(sys.argv[1]) if len(sys.argv) > 1 else LABELED_SET
+    texts, labels = [t for t, _ in labeled], [y for _, y in labeled]
+    print(f"Labeled set: {len(texts)} texts")
+
+    fp32 = evaluate("torch", load_embedder("torch"), texts, labels)
+    int8_embedder = load_embedder("onnx-int8")
+    if not isinstance(int8_embedder, OnnxEmbedder):
+        print("❌ onnx-int8 backend unavailable (install onnxruntime and optimum[onnxruntime])")
+        sys.exit(2)
+    int8 = evaluate("onnx-int8", int8_embedder, texts, labels)
+
+    cosine = float(np.mean(np.sum(fp32["embs"] * int8["embs"], axis=1)))
+    semantic_agree = float(np.mean([a == b for a, b in zip(fp32["semantic"], int8["semantic"])]))
+    fused_agree = float(np.mean([a == b for a, b in zip(fp32["fused"], int8["fused"])]))
+    print(f"fp32↔int8  mean cosine {cosine:.4f}  semantic agreement {semantic_agree:6.1%}  "
+          f"classify_scam agreement {fused_agree:6.1%}")
+
+    ok = (fp32["semantic_acc"] - int8["semantic_acc"] <= MAX_ACCURACY_DROP
+          and semantic_agree >= MIN_AGREEMENT)
+    print("✅ int8 within parity budget" if ok else "❌ int8 outside parity budget")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,73 @@
+"""
+Keyword feature benchmark
+-----------------------------------
+Per-list substring / regex / Counter scans (as the classifier and risk
+assessor used to do them) vs one keyword_engine pass, with a parity check.
+
+Run from backend/:
+    python -m benchmarks.bench_keyword_engine
+"""
+
+import re
+import sys
+import time
+from collections import Counter
+
+from app.pipelines.keyword_engine import keyword_engine
+from app.pipelines import risk_assessor as ra
+from app.pipelines import scam_classifier as sc
+from benchmarks.bench_regex_extract import synthetic_text
+
+_TONE_REGEXES = [re.compile(r"\s+".join(p.split())) for p in ra.DECEPTIVE_TONE_PHRASES]
+
+
+def per_list_scans(text: str):
+    text_lower = text.lower()
+    text_clean = sc.clean_text(text)
+    tokens = Counter(text_clean.split())
+    return (
+        sum(1 for kw in ra.HIGH_RISK_KEYWORDS if kw in text_lower),
+        sum(1 for kw in ra.MEDIUM_RISK_KEYWORDS if kw in text_lower),
+        sum(1 for p in _TONE_REGEXES if p.search(text_lower)),
+        sum(1 for w in sc.URGENT_WORDS if w in text_clean),
+        sum(1 for w in sc.FINANCIAL_WORDS if w in text_clean),
+        sum(1 for w in sc.REWARD_WORDS if w in text_clean),
+        [k for k in sc.KEYWORDS if k in text_clean],
+        {k: tokens[k] for k in sc.KEYWORDS if tokens[k]},
+    )
+
+
+def engine_scan(text: str):
+    hits = keyword_engine.scan(text, memo=False)
+    return (
+        hits.n_present("risk.high"),
+        hits.n_present("risk.medium"),
+        hits.n_present("risk.tone"),
+        hits.n_present("classifier.urgent"),
+        hits.n_present("classifier.financial"),
+        hits.n_present("classifier.reward"),
+        hits.present("classifier.keywords"),
+        hits.counts("classifier.keyword_tokens"),
+    )
+
+
+def _best_of(fn, text, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+if __name__ == "__main__":
+    ok = True
+    for n in (10_000, 100_000, 1_000_000):
+        text = synthetic_text(n)
+        same = per_list_scans(text) == engine_scan(text)
+        t_old, t_new = _best_of(per_list_scans, text), _best_of(engine_scan, text)
+        ok &= same
+        print(f"{len(text):>10,} chars  per-list {t_old * 1000:8.1f} ms  "
+              f"engine[{keyword_engine.backend}] {t_new * 1000:8.1f} ms  "
+              f"x{t_old / t_new:4.1f}  {'identical' if same else 'MISMATCH'}")
+    sys.exit(0 if ok else 1)
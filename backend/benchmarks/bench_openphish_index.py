@@ -0,0 +1,65 @@
+"""
+OpenPhish feed index benchmark
+-----------------------------------
+Old per-lookup check (substring scan of the first 2000 feed lines, download
+time not included) vs the local FeedIndex, on a synthetic feed. Reports
+index build time, per-lookup latency and how many listed hosts the
+2000-line scan could never see.
+
+Run from backend/:
+    python -m benchmarks.bench_openphish_index            # 30k-line feed
+    python -m benchmarks.bench_openphish_index 100000
+"""
+
+import sys
+import time
+import random
+
+from app.pipelines.openphish_feed import FeedIndex
+
+_TLDS = ["xyz", "top", "tk", "com", "co.in", "info", "click"]
+_PATHS = ["login", "verify", "kyc/update", "secure/account", "refund", "wallet/connect"]
+
+
+def synthetic_feed(n: int, seed: int = 5):
+    rnd = random.Random(seed)
+    lines = []
+    for i in range(n):
+        host = f"{rnd.choice(['', 'secure.', 'login.', 'm.'])}brand{i}-{rnd.randint(0, 999)}.{rnd.choice(_TLDS)}"
+        lines.append(f"{rnd.choice(['http', 'https'])}://{host}/{rnd.choice(_PATHS)}")
+    return lines
+
+
+def _old_check(lines, domain_or_url: str) -> bool:
+    return any(domain_or_url in line for line in lines[:2000])
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 30000
+    lines = synthetic_feed(n)
+    feed_text = "\n".join(lines)
+
+    t0 = time.perf_counter()
+    index = FeedIndex(feed_text, time.time(), "bench")
+    t_build = time.perf_counter() - t0
+
+    rnd = random.Random(9)
+    listed_hosts = [line.split("/")[2] for line in rnd.sample(lines, 500)]
+    clean_hosts = [f"clean{i}.example.org" for i in range(500)]
+    queries = listed_hosts + clean_hosts
+
+    t0 = time.perf_counter()
+    old = [_old_check(lines, q) for q in queries]
+    t_old = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    new = [index.lookup(q)[0] for q in queries]
+    t_new = time.perf_counter() - t0
+
+    print(f"feed {n} lines: {len(index.urls)} URLs, {len(index.hosts)} hosts, "
+          f"{len(index.domains)} registered domains, index built in {t_build * 1000:.0f} ms")
+    print(f"  2000-line scan  {t_old / len(queries) * 1e6:9.1f} µs/lookup   "
+          f"listed hits {sum(old[:500])}/500   false hits {sum(old[500:])}/500")
+    print(f"  feed index      {t_new / len(queries) * 1e6:9.1f} µs/lookup   "
+          f"listed hits {sum(new[:500])}/500   false hits {sum(new[500:])}/500")
+    sys.exit(0 if all(new[:500]) and not any(new[500:]) else 1)
@@ -0,0 +1,95 @@
+"""
+OSINT outage benchmark (negative cache + circuit breakers)
+-----------------------------------
+A fake VirusTotal that hangs past the request timeout while WHOIS stays
+healthy. Runs consecutive cases with fresh entities through the fan-out and
+reports per-case wall time: the first case waits out the timeouts, later
+ones are short-circuited by the open breaker. Repeating a case shows the
+cached failures. Finally VirusTotal recovers, and after the cooldown one
+trial request closes the breaker again.
+
+Run from backend/:
+    python -m benchmarks.bench_osint_breaker
+"""
+
+import sys
+import time
+import asyncio
+import tempfile
+from aiohttp import web
+
+from app.pipelines import osint_engine, osint_async, osint_breaker, osint_http
+from app.pipelines.osint_breaker import CircuitBreaker
+from app.pipelines.osint_cache import OsintCache
+from benchmarks.bench_osint_fanout import point_engine_at, serve_app, synthetic_entities
+
+REQUEST_TIMEOUT = 0.5
+COOLDOWN = 1.0
+
+
+def _flaky_app(state: dict) -> web.Application:
+    async def vt(request):
+        if state["vt_down"]:
+            await asyncio.sleep(REQUEST_TIMEOUT * 10)
+        return web.json_response({"data": {"attributes": {"last_analysis_stats": {"malicious": 1}}}})
+
+    async def vt_search(request):
+        if state["vt_down"]:
+            await asyncio.sleep(REQUEST_TIMEOUT * 10)
+        return web.json_response({"data": []})
+
+    async def whois(request):
+        return web.json_response({"WhoisRecord": {"createdDate": "2012-01-01"}})
+
+    async def abuseipdb(request):
+        return web.json_response({"data": {"abuseConfidenceScore": 10}})
+
+    async def feed(request):
+        return web.Response(text="http://upibanksecure.xyz/login\n")
+
+    app = web.Application()
+    app.router.add_get("/vt/domains/{domain}", vt)
+    app.router.add_get("/vt/search", vt_search)
+    app.router.add_get("/whois", whois)
+    app.router.add_get("/abuseipdb", abuseipdb)
+    app.router.add_get("/feed.txt", feed)
+    return app
+
+
+def _case(seed: int):
+    # Fresh values per case, so only the breaker (not the cache) can help
+    return [{**e, "value": e["value"].replace("xyz", f"x{seed}.xyz").replace(".top", f"{seed}.top")}
+            for e in synthetic_entities(10)]
+
+
+def _run(entities):
+    t0 = time.perf_counter()
+    hits = osint_async.enrich_entities_osint(entities, deadline=10)
+    errors = [s.get("error") for h in hits for s in h.get("sources", []) if s.get("source", "").startswith("virustotal")]
+    return time.perf_counter() - t0, errors
+
+
+if __name__ == "__main__":
+    state = {"vt_down": True}
+    point_engine_at(serve_app(_flaky_app(state)))
+    osint_engine.osint_cache = OsintCache(f"{tempfile.mkdtemp(prefix='osint_breaker_bench_')}/cache.sqlite3")
+    for provider in osint_http.PROVIDER_TIMEOUTS:
+        osint_http.PROVIDER_TIMEOUTS[provider] = (REQUEST_TIMEOUT, REQUEST_TIMEOUT)
+    osint_breaker._breakers["virustotal"] = CircuitBreaker("virustotal", failures=3, cooldown_sec=COOLDOWN)
+
+    print(f"VirusTotal hanging, request timeout {REQUEST_TIMEOUT}s, breaker opens after 3 failures")
+    for i in range(4):
+        t, errors = _run(_case(i))
+        print(f"  case {i}  {t:6.2f} s   VT answers: {sorted(set(errors))}   "
+              f"breaker {osint_breaker.breaker_for('virustotal').state}")
+
+    t, errors = _run(_case(0))
+    print(f"  case 0 again  {t:6.2f} s   (cached failures)")
+
+    state["vt_down"] = False
+    time.sleep(COOLDOWN)
+    t, errors = _run(_case(9))
+    status = osint_breaker.breaker_status()["providers"]["virustotal"]
+    print(f"VirusTotal back, after cooldown: {t:6.2f} s   breaker {status['state']}   "
+          f"trips {status['trips']}   short-circuited {status['short_circuited']}")
+    sys.exit(0 if status["state"] == "closed" else 1)
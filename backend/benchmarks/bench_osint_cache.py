@@ -0,0 +1,107 @@
+"""
+OSINT cache benchmark
+-----------------------------------
+Lookup latency of the old one-JSON-file-per-key cache (stat + parse per
+lookup) vs OsintCache memory-LRU hits and SQLite hits (cold LRU), then a
+size-capped store under churn, and a second process reading what the
+first one wrote.
+
+Run from backend/:
+    python -m benchmarks.bench_osint_cache            # 5000 keys
+    python -m benchmarks.bench_osint_cache 20000
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import tempfile
+import multiprocessing
+
+from app.pipelines.osint_cache import OsintCache
+
+
+def _record(i: int) -> dict:
+    return {"source": "virustotal", "positives": i % 5, "score": (i % 5) * 20, "risk": "Low",
+            "note": f"domain-{i}.xyz"}
+
+
+class LegacyFileCache:
+    """The previous osint_engine cache: sha1-named JSON file per key, mtime TTL."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{hashlib.sha1(key.encode()).hexdigest()}.json")
+
+    def get(self, key: str, ttl_hours=24):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        if time.time() - os.path.getmtime(path) > ttl_hours * 3600:
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def set(self, key: str, data: dict):
+        with open(self._path(key), "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+
+def _timed_lookups(get, keys):
+    t0 = time.perf_counter()
+    hits = sum(1 for k in keys if get(k) is not None)
+    return (time.perf_counter() - t0) / len(keys) * 1e6, hits
+
+
+def _read_in_child(path, keys, out):
+    cache = OsintCache(path)
+    out.put(sum(1 for k in keys if cache.get("vt_domain", k) is not None))
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    keys = [f"vt_domain_domain-{i}.xyz" for i in range(n)]
+    workdir = tempfile.mkdtemp(prefix="osint_cache_bench_")
+
+    legacy = LegacyFileCache(workdir)
+    for i, k in enumerate(keys):
+        legacy.set(k, _record(i))
+    t_legacy, h_legacy = _timed_lookups(legacy.get, keys)
+
+    path = os.path.join(workdir, "cache.sqlite3")
+    cache = OsintCache(path, lru_entries=n)
+    t0 = time.perf_counter()
+    for i, k in enumerate(keys):
+        cache.set("vt_domain", k, _record(i))
+    t_write = (time.perf_counter() - t0) / n * 1e6
+    t_memory, h_memory = _timed_lookups(lambda k: cache.get("vt_domain", k), keys)
+
+    cold = OsintCache(path, lru_entries=n)
+    t_disk, h_disk = _timed_lookups(lambda k: cold.get("vt_domain", k), keys)
+
+    print(f"{n} keys")
+    print(f"  legacy JSON files   {t_legacy:8.1f} µs/lookup   hits {h_legacy}")
+    print(f"  SQLite (cold LRU)   {t_disk:8.1f} µs/lookup   hits {h_disk}   write {t_write:.1f} µs")
+    print(f"  memory LRU          {t_memory:8.1f} µs/lookup   hits {h_memory}")
+
+    # Cross-process: a fresh process sees every entry written above
+    q = multiprocessing.get_context("spawn").Queue()
+    p = multiprocessing.get_context("spawn").Process(target=_read_in_child, args=(path, keys[:500], q))
+    p.start()
+    p.join()
+    h_child = q.get()
+    print(f"  other process       hits {h_child}/500")
+
+    # Cap: 1 MB store under 3x that much churn stays at or under the cap
+    capped = OsintCache(os.path.join(workdir, "capped.sqlite3"), max_mb=1, lru_entries=256)
+    for i in range(n * 3):
+        capped.set("whois", f"whois_domain-{i}.xyz", {**_record(i), "pad": "x" * 200})
+    stats = capped.stats()
+    print(f"  1 MB cap            {stats['disk_entries']} entries, {stats['stored_mb']} MB stored, "
+          f"{stats['evicted']} evicted")
+
+    ok = h_memory == h_disk == h_legacy == n and h_child == 500 and stats["stored_mb"] <= 1
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,152 @@
+"""
+OSINT fan-out benchmark
+-----------------------------------
+Blocking per-entity enrichment (enrich_entity_osint in a loop) vs the
+concurrent fan-out (enrich_entities_osint) against a local fake provider
+server with fixed per-request latency. Checks both return the same records,
+then shows a deadline shorter than one request returning partial results.
+
+Run from backend/:
+    python -m benchmarks.bench_osint_fanout              # 20 entities, 200 ms per request
+    python -m benchmarks.bench_osint_fanout 50 0.3
+"""
+
+import sys
+import time
+import socket
+import asyncio
+import hashlib
+import tempfile
+import threading
+from aiohttp import web
+
+from app.pipelines import osint_engine, osint_async, osint_http, openphish_feed
+from app.pipelines.osint_cache import OsintCache
+from app.pipelines.osint_ratelimit import QuotaLimiter
+
+
+def _stable(value: str, mod: int) -> int:
+    return int(hashlib.sha1(value.encode()).hexdigest(), 16) % mod
+
+
+def _fake_app(latency: float) -> web.Application:
+    async def vt_domain(request):
+        await asyncio.sleep(latency)
+        n = _stable(request.match_info["domain"], 4)
+        return web.json_response({"data": {"attributes": {"last_analysis_stats": {"malicious": n, "suspicious": 0}}}})
+
+    async def vt_search(request):
+        await asyncio.sleep(latency)
+        n = _stable(request.query.get("query", ""), 3)
+        return web.json_response({"data": [{"attributes": {"last_analysis_stats": {"malicious": n}}}]})
+
+    async def abuseipdb(request):
+        await asyncio.sleep(latency)
+        return web.json_response({"data": {"abuseConfidenceScore": _stable(request.query["ipAddress"], 100)}})
+
+    async def whois(request):
+        await asyncio.sleep(latency)
+        year = 2024 if _stable(request.query["domainName"], 2) else 2012
+        return web.json_response({"WhoisRecord": {"registrarName": "Fake Registrar", "createdDate": f"{year}-01-01"}})
+
+    async def feed(request):
+        await asyncio.sleep(latency)
+        return web.Response(text="http://upibanksecure.xyz/login\nhttps://kycupdate.cf/verify\n")
+
+    app = web.Application()
+    app.router.add_get("/vt/domains/{domain}", vt_domain)
+    app.router.add_get("/vt/search", vt_search)
+    app.router.add_get("/abuseipdb", abuseipdb)
+    app.router.add_get("/whois", whois)
+    app.router.add_get("/feed.txt", feed)
+    return app
+
+
+def serve_app(app: web.Application, ssl_context=None) -> str:
+    """Run an aiohttp app on a free local port in a background thread; returns its base URL."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    loop = asyncio.new_event_loop()
+
+    async def _serve():
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port, ssl_context=ssl_context).start()
+
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    asyncio.run_coroutine_threadsafe(_serve(), loop).result(10)
+    return f"{'https' if ssl_context else 'http'}://127.0.0.1:{port}"
+
+
+def start_fake_server(latency: float) -> str:
+    return serve_app(_fake_app(latency))
+
+
+def point_engine_at(base: str):
+    osint_engine.VT_BASE = f"{base}/vt"
+    osint_engine.ABUSEIPDB_URL = f"{base}/abuseipdb"
+    osint_engine.WHOIS_URL = f"{base}/whois"
+    osint_engine.VT_API_KEY = osint_engine.ABUSEIPDB_KEY = osint_engine.WHOIS_KEY = "bench"
+    openphish_feed.OPENPHISH_FEED_URL = f"{base}/feed.txt"
+    openphish_feed.SNAPSHOT_DIR = tempfile.mkdtemp(prefix="openphish_bench_")
+    openphish_feed.SNAPSHOT_PATH = f"{openphish_feed.SNAPSHOT_DIR}/feed.txt"
+    openphish_feed.SNAPSHOT_META_PATH = f"{openphish_feed.SNAPSHOT_DIR}/feed_meta.json"
+    # No provider quotas against the fake server (bench_osint_ratelimit installs its own)
+    osint_engine.limiter = osint_async.limiter = osint_http.limiter = QuotaLimiter(f"{openphish_feed.SNAPSHOT_DIR}/quota.sqlite3", quotas={})
+
+
+def synthetic_entities(n: int):
+    kinds = [
+        lambda i: {"value": f"support{i}@upibanksecure{i % 7}.xyz", "type": "EMAIL"},
+        lambda i: {"value": f"https://kycupdate{i % 5}.cf/verify?id={i}", "type": "URL"},
+        lambda i: {"value": f"10.0.{i % 3}.{i}", "type": "IP"},
+        lambda i: {"value": f"lotterywin{i % 6}.top", "type": "DOMAIN"},
+        lambda i: {"value": f"Acme Corp {i}", "type": "ORG"},
+    ]
+    return [kinds[i % len(kinds)](i) for i in range(n)]
+
+
+def _strip(records):
+    # timestamp and OpenPhish feed age tick between the two runs
+    return [
+        {k: ([{sk: sv for sk, sv in src.items() if sk != "feed_age_sec"} for src in v] if k == "sources" else v)
+         for k, v in r.items() if k != "timestamp"}
+        for r in records
+    ]
+
+
+def _fresh_cache():
+    osint_engine.osint_cache = OsintCache(f"{tempfile.mkdtemp(prefix='osint_bench_')}/cache.sqlite3")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    point_engine_at(start_fake_server(latency))
+    openphish_feed.openphish_feed.check("warm.up")  # initial feed download, outside the timings
+    entities = synthetic_entities(n)
+
+    _fresh_cache()
+    t0 = time.perf_counter()
+    blocking = [osint_engine.enrich_entity_osint(e) for e in entities]
+    t_blocking = time.perf_counter() - t0
+
+    _fresh_cache()
+    t0 = time.perf_counter()
+    fanned = osint_async.enrich_entities_osint(entities, deadline=30)
+    t_fanned = time.perf_counter() - t0
+
+    same = _strip(blocking) == _strip(fanned)
+    print(f"{n} entities, {latency * 1000:.0f} ms per request")
+    print(f"  blocking loop   {t_blocking:7.2f} s")
+    print(f"  fan-out         {t_fanned:7.2f} s   x{t_blocking / t_fanned:5.1f}   "
+          f"{'identical' if same else 'MISMATCH'}")
+
+    _fresh_cache()
+    t0 = time.perf_counter()
+    partial = osint_async.enrich_entities_osint(entities, deadline=latency / 2)
+    missed = sum(1 for r in partial for s in r.get("sources", []) if s.get("error") == "deadline_exceeded")
+    print(f"  deadline {latency / 2:.2f} s  {time.perf_counter() - t0:7.2f} s   {missed} sources past deadline")
+    print(osint_async.fanout_stats())
+    sys.exit(0 if same else 1)
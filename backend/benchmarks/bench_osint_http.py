@@ -0,0 +1,117 @@
+"""
+OSINT HTTP client benchmark (pooled keep-alive sessions)
+-----------------------------------
+Sequential VirusTotal-style lookups against a local HTTPS fake provider:
+a fresh requests.get per lookup (new TCP + TLS handshake every time) vs the
+provider's pooled session in osint_http. Then the fan-out over plain HTTP,
+reporting connection reuse, and a provider that answers 503 to every first
+attempt, recovered by the jittered retries.
+
+Run from backend/:
+    python -m benchmarks.bench_osint_http            # 200 lookups
+    python -m benchmarks.bench_osint_http 500
+"""
+
+import os
+import ssl
+import sys
+import time
+import tempfile
+import subprocess
+from collections import Counter
+
+import requests
+from aiohttp import web
+
+from app.pipelines import osint_engine, osint_async, osint_http
+from app.pipelines.osint_cache import OsintCache
+from app.pipelines.osint_http import http_stats
+from benchmarks.bench_osint_fanout import _fake_app, point_engine_at, serve_app, synthetic_entities
+
+
+def _self_signed_cert():
+    tmp = tempfile.mkdtemp(prefix="osint_http_bench_")
+    cert, key = f"{tmp}/cert.pem", f"{tmp}/key.pem"
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-keyout", key, "-out", cert,
+         "-days", "1", "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1"],
+        check=True, capture_output=True,
+    )
+    ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    ctx.load_cert_chain(cert, key)
+    return cert, ctx
+
+
+def _flaky_app():
+    attempts = Counter()
+
+    async def vt_domain(request):
+        domain = request.match_info["domain"]
+        attempts[domain] += 1
+        if attempts[domain] == 1:
+            return web.Response(status=503)
+        return web.json_response({"data": {"attributes": {"last_analysis_stats": {"malicious": 1}}}})
+
+    app = web.Application()
+    app.router.add_get("/vt/domains/{domain}", vt_domain)
+    return app
+
+
+def _host(snapshot):
+    return snapshot["hosts"].get("127.0.0.1", {"requests": 0, "retries": 0, "new_connections": 0})
+
+
+def _delta(before, after, field):
+    return _host(after)[field] - _host(before)[field]
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    headers = {"x-apikey": "bench"}
+
+    point_engine_at(serve_app(_fake_app(0.01)))  # also lifts provider quotas for the bench
+
+    # 1) Blocking lookups over TLS: fresh connection per call vs pooled session
+    cert, server_ctx = _self_signed_cert()
+    tls_base = serve_app(_fake_app(0.0), ssl_context=server_ctx)
+    # Both clients trust the bench certificate (env, since it overrides Session.verify)
+    os.environ["REQUESTS_CA_BUNDLE"] = os.environ["CURL_CA_BUNDLE"] = cert
+    urls = [f"{tls_base}/vt/domains/site{i}.xyz" for i in range(n)]
+
+    t0 = time.perf_counter()
+    for url in urls:
+        requests.get(url, headers=headers, timeout=10).json()
+    fresh = time.perf_counter() - t0
+
+    before = http_stats.snapshot()
+    t0 = time.perf_counter()
+    for url in urls:
+        osint_http.get("virustotal", url, headers=headers).json()
+    pooled = time.perf_counter() - t0
+    after = http_stats.snapshot()
+
+    print(f"{n} sequential HTTPS lookups (local fake provider)")
+    print(f"  requests.get per lookup   {1000 * fresh / n:6.2f} ms/lookup   {n} handshakes")
+    print(f"  pooled session            {1000 * pooled / n:6.2f} ms/lookup   "
+          f"{_delta(before, after, 'new_connections')} handshakes   x{fresh / pooled:5.1f}")
+    print(f"  handshake (TCP + TLS)     {_host(after)['mean_handshake_ms']} ms mean")
+
+    # 2) Fan-out over the shared aiohttp sessions: connections reused across cases
+    osint_engine.osint_cache = OsintCache(f"{tempfile.mkdtemp(prefix='osint_http_bench_')}/cache.sqlite3")
+    before = http_stats.snapshot()
+    for case in range(10):
+        entities = [{**e, "value": e["value"].replace("xyz", f"c{case}.xyz").replace(".top", f"{case}.top")}
+                    for e in synthetic_entities(20)]
+        osint_async.enrich_entities_osint(entities, deadline=20)
+    after = http_stats.snapshot()
+    sent, new = _delta(before, after, "requests"), _delta(before, after, "new_connections")
+    print(f"fan-out, 10 cases: {sent} requests over {new} connections   reuse {1 - new / max(1, sent):.0%}")
+
+    # 3) A provider that fails every first attempt with 503
+    flaky = serve_app(_flaky_app())
+    before = http_stats.snapshot()
+    results = [osint_http.get_json("virustotal", f"{flaky}/vt/domains/flaky{i}.xyz", headers=headers) for i in range(20)]
+    after = http_stats.snapshot()
+    ok = sum(1 for _, failed in results if not failed)
+    print(f"503 on first attempt: {ok}/20 answered after {_delta(before, after, 'retries')} retries")
+    sys.exit(0 if ok == 20 else 1)
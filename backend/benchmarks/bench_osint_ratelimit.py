@@ -0,0 +1,105 @@
+"""
+OSINT quota / priority-lane benchmark
+-----------------------------------
+A batch job floods the fan-out with fresh entities while an analyst runs a
+single case every second, against a fake provider server, with a tight
+VirusTotal quota. Run once with the batch job in the same lane as the
+analyst (no priority) and once in the batch lane: reports the analyst's
+case latency and degraded sources, how much of the batch was served vs
+degraded, and the remaining quota afterwards.
+
+Run from backend/:
+    python -m benchmarks.bench_osint_ratelimit              # 8 s flood, 120 VT requests/min
+    python -m benchmarks.bench_osint_ratelimit 12 60
+"""
+
+import sys
+import time
+import tempfile
+import threading
+import statistics
+
+from app.pipelines import osint_engine, osint_async, osint_http
+from app.pipelines.osint_cache import OsintCache
+from app.pipelines.osint_ratelimit import BATCH, INTERACTIVE, QuotaLimiter, osint_priority
+from benchmarks.bench_osint_fanout import _fake_app, point_engine_at, serve_app, synthetic_entities
+
+LATENCY = 0.05
+LIMITED = ("rate_limited", "quota_exhausted")
+
+
+def _fresh(tag: str, n: int):
+    # New values every call, so the cache never answers and every lookup needs a token
+    return [{**e, "value": e["value"].replace("xyz", f"{tag}.xyz").replace(".top", f"{tag}.top")}
+            for e in synthetic_entities(n)]
+
+
+def _degraded(hits):
+    return sum(1 for h in hits for s in h.get("sources", []) if s.get("error") in LIMITED)
+
+
+def _sources(hits):
+    return sum(len(h.get("sources", [])) for h in hits)
+
+
+def _install(per_min_vt: float):
+    quotas = {
+        "virustotal": {"per_min": per_min_vt, "per_day": 0},
+        "abuseipdb": {"per_min": per_min_vt * 4, "per_day": 0},
+        "whois": {"per_min": per_min_vt * 4, "per_day": 0},
+    }
+    limiter = QuotaLimiter(f"{tempfile.mkdtemp(prefix='osint_quota_bench_')}/quota.sqlite3", quotas)
+    osint_engine.limiter = osint_async.limiter = osint_http.limiter = limiter
+    osint_engine.osint_cache = OsintCache(f"{tempfile.mkdtemp(prefix='osint_quota_bench_')}/cache.sqlite3")
+    return limiter
+
+
+def _run(batch_lane: str, duration: float, per_min_vt: float):
+    limiter = _install(per_min_vt)
+    stop = threading.Event()
+    batch = {"sources": 0, "degraded": 0}
+
+    def flood():
+        i = 0
+        with osint_priority(batch_lane):
+            while not stop.is_set():
+                hits = osint_async.enrich_entities_osint(_fresh(f"b{batch_lane[0]}{i}", 20), deadline=20)
+                batch["sources"] += _sources(hits)
+                batch["degraded"] += _degraded(hits)
+                i += 1
+
+    worker = threading.Thread(target=flood, daemon=True)
+    worker.start()
+    time.sleep(0.5)  # let the flood drain the bucket first
+
+    latencies, degraded, total = [], 0, 0
+    t_end = time.perf_counter() + duration
+    i = 0
+    while time.perf_counter() < t_end:
+        t0 = time.perf_counter()
+        hits = osint_async.enrich_entities_osint(_fresh(f"i{batch_lane[0]}{i}", 2), deadline=20)
+        latencies.append(time.perf_counter() - t0)
+        degraded += _degraded(hits)
+        total += _sources(hits)
+        i += 1
+        time.sleep(max(0.0, 1.0 - latencies[-1]))
+    stop.set()
+    worker.join(30)
+
+    vt = limiter.status()["providers"]["virustotal"]
+    label = "no priority (same lane)" if batch_lane == INTERACTIVE else "batch lane"
+    print(f"  {label:<24} analyst p50 {statistics.median(latencies):5.2f} s  max {max(latencies):5.2f} s  "
+          f"degraded {degraded}/{total}   batch served {batch['sources'] - batch['degraded']}/{batch['sources']}   "
+          f"VT tokens left {vt['tokens_now']}")
+    for lane, m in sorted(vt["lanes"].items()):
+        print(f"      VT {lane:<12} granted {m['granted']:4d}  rate_limited {m['rate_limited']:4d}  "
+              f"mean wait {m['mean_wait_sec']:.3f} s  max wait {m['max_wait_sec']:.3f} s")
+
+
+if __name__ == "__main__":
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 8
+    per_min_vt = float(sys.argv[2]) if len(sys.argv) > 2 else 120
+    point_engine_at(serve_app(_fake_app(LATENCY)))
+    print(f"Batch flood for {duration:.0f} s, analyst case every second, VirusTotal {per_min_vt:.0f}/min")
+    for lane in (INTERACTIVE, BATCH):
+        _run(lane, duration, per_min_vt)
@@ -0,0 +1,89 @@
+"""
+OSINT single-flight benchmark
+-----------------------------------
+N concurrent workers analyse screenshots of the same campaign (same
+entities) at the same moment, against a fake provider server that counts
+upstream requests. Compares request counts with single-flight coalescing
+vs without (flights replaced by pass-throughs), for the async fan-out and
+for blocking lookups from threads.
+
+Run from backend/:
+    python -m benchmarks.bench_osint_single_flight          # 8 workers
+    python -m benchmarks.bench_osint_single_flight 16
+"""
+
+import sys
+import time
+import tempfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import web
+
+from app.pipelines import osint_engine, osint_async
+from app.pipelines.osint_cache import OsintCache
+from app.pipelines.single_flight import flight_stats
+from benchmarks.bench_osint_fanout import _fake_app, point_engine_at, serve_app, synthetic_entities
+
+LATENCY = 0.2
+
+
+class _NoFlight:
+    """Pass-through with the flights' interface: every caller makes its own request."""
+
+    def do(self, group, key, fn):
+        return fn()
+
+
+class _NoAsyncFlight:
+    async def do(self, group, key, factory):
+        return await factory()
+
+
+def _counting_server():
+    upstream = Counter()
+
+    @web.middleware
+    async def count(request, handler):
+        upstream[request.path.split("/")[1]] += 1
+        return await handler(request)
+
+    app = _fake_app(LATENCY)
+    app.middlewares.append(count)
+    return serve_app(app), upstream
+
+
+def _fresh_cache():
+    osint_engine.osint_cache = OsintCache(f"{tempfile.mkdtemp(prefix='osint_sf_bench_')}/cache.sqlite3")
+
+
+def _concurrently(workers: int, fn):
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        list(pool.map(lambda _: fn(), range(workers)))
+    return time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    base, upstream = _counting_server()
+    point_engine_at(base)
+    campaign = synthetic_entities(10)
+    domains = sorted({e["value"].split("@")[-1] for e in campaign if "@" in e["value"]})
+    real_flights, real_aflights = osint_engine._flights, osint_async._runner._flights
+
+    print(f"{workers} concurrent workers, same campaign, {LATENCY * 1000:.0f} ms per request")
+    for label, fanout in (("async fan-out", True), ("blocking threads", False)):
+        for coalesce in (False, True):
+            _fresh_cache()
+            upstream.clear()
+            osint_engine._flights = real_flights if coalesce else _NoFlight()
+            osint_async._runner._flights = real_aflights if coalesce else _NoAsyncFlight()
+            before = flight_stats.snapshot()["coalesced"]
+            if fanout:
+                t = _concurrently(workers, lambda: osint_async.enrich_entities_osint(campaign, deadline=30))
+            else:
+                t = _concurrently(workers, lambda: [osint_engine.vt_domain_report(d) for d in domains])
+            saved = flight_stats.snapshot()["coalesced"] - before
+            print(f"  {label:<17} {'single-flight' if coalesce else 'no coalescing':<14} "
+                  f"{sum(upstream.values()):4d} upstream requests   {t:5.2f} s   {saved} coalesced")
+    osint_engine._flights, osint_async._runner._flights = real_flights, real_aflights
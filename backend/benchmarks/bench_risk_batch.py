@@ -0,0 +1,83 @@
+"""
+Batch risk fusion benchmark
+-----------------------------------
+One assess_risk call per case vs one assess_risk_batch call over all cases,
+with text features precomputed for both (as the pipelines share them), and a
+check that both return identical dicts. Also times the array-only fusion
+(score_factor_matrix) that re-scoring stored factors uses.
+
+Run from backend/:
+    python -m benchmarks.bench_risk_batch
+"""
+
+import sys
+import time
+import random
+import numpy as np
+
+from app.pipelines.document_features import DocumentFeatures
+from app.pipelines.regex_extract import extract_entities
+from app.pipelines.risk_assessor import FUSION_FACTORS, assess_risk, assess_risk_batch, score_factor_matrix
+from benchmarks.bench_regex_extract import synthetic_text
+
+# Stored risk.factors keys, in FUSION_FACTORS order
+_FACTOR_KEYS = ["scam_confidence", "avg_entity_risk", "keyword_toxicity",
+                "tone_score", "sentiment_neutrality", "osint_weight"]
+assert len(_FACTOR_KEYS) == len(FUSION_FACTORS)
+
+_CATEGORIES = [
+    "Fake Bank / Financial Fraud", "Lottery / Prize Scam", "Investment / Crypto Scam",
+    "Tech Support Scam", "Unclassified",
+]
+
+
+def synthetic_cases(n: int, seed: int = 11):
+    rnd = random.Random(seed)
+    cases = []
+    for i in range(n):
+        text = synthetic_text(rnd.randint(200, 2000), entity_rate=0.05, seed=seed + i)
+        entities = extract_entities(text) + [{"value": "Acme Corp", "type": "ORG"}]
+        scam_class = {"category": rnd.choice(_CATEGORIES), "confidence": round(rnd.random(), 2)}
+        osint = [{"aggregate_score": rnd.randint(0, 100)} for _ in range(rnd.randint(0, 3))]
+        cases.append((text, entities, scam_class, osint))
+    return cases
+
+
+def _strip(results):
+    return [{k: v for k, v in r.items() if k != "timestamp"} for r in results]
+
+
+if __name__ == "__main__":
+    ok = True
+    for n in (100, 1000, 5000):
+        cases = synthetic_cases(n)
+        features = [DocumentFeatures(c[0]) for c in cases]
+        for f in features:
+            f.keyword_hits, f.sentiment  # precompute, as the analyze pipelines do
+
+        t0 = time.perf_counter()
+        loop = [assess_risk(t, e, s, o, features=f) for (t, e, s, o), f in zip(cases, features)]
+        t_loop = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        batch = assess_risk_batch(
+            [c[0] for c in cases], [c[1] for c in cases], [c[2] for c in cases],
+            [c[3] for c in cases], features=features,
+        )
+        t_batch = time.perf_counter() - t0
+
+        # Fusion alone, from the factors both paths produced
+        F = np.array([[r["factors"][k] for k in _FACTOR_KEYS] for r in batch], dtype=np.float64)
+        scam_types = [r["scam_type"] for r in batch]
+        with_entities = np.array([bool(c[1]) for c in cases])
+        t0 = time.perf_counter()
+        scores, _ = score_factor_matrix(F, scam_types, with_entities)
+        t_fuse = time.perf_counter() - t0
+
+        same = _strip(loop) == _strip(batch)
+        ok &= same
+        n_entities = sum(len(c[1]) for c in cases)
+        print(f"{n:>6} cases {n_entities:>7} entities  per-case {t_loop * 1000:8.1f} ms  "
+              f"batch {t_batch * 1000:8.1f} ms  x{t_loop / t_batch:4.1f}  "
+              f"array fusion {t_fuse * 1000:6.2f} ms  {'identical' if same else 'MISMATCH'}")
+    sys.exit(0 if ok else 1)
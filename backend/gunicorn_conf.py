@@ -0,0 +1,44 @@
+"""
+Gunicorn config for the preload-and-fork server mode.
+
+    gunicorn -c gunicorn_conf.py app.main:app
+
+The master imports the app and loads every heavy model (XGBoost, EasyOCR,
+spaCy, TF-IDF/LR, Sentence-BERT) once, then forks workers that share those
+pages copy-on-write. N workers cost roughly 1x model memory.
+"""
+
+import os
+import multiprocessing
+
+from app.preload import preload_models, memory_report, format_report
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("WORKER_TIMEOUT", "300"))
+
+# Import app.main in the master, before forking
+preload_app = True
+
+
+def when_ready(server):
+    # Runs in the master after the app is imported and before workers are forked
+    preload_models()
+    server.log.info(f"📦 master {format_report(memory_report())}")
+
+
+def post_fork(server, worker):
+    # Split cores between workers instead of every worker's torch pool using all of them
+    try:
+        import torch
+        torch.set_num_threads(max(1, multiprocessing.cpu_count() // workers))
+    except ImportError:
+        pass
+
+
+def post_worker_init(worker):
+    # Baseline only: right after fork every page is still shared. Unique memory grows as the
+    # worker dirties pages, so each worker logs again after MEMORY_REPORT_AT_REQUESTS requests
+    # (app/preload.py), and /api/system/memory keeps those checkpoints.
+    worker.log.info(f"👷 worker at fork {format_report(memory_report())}")